@@ -7,6 +7,7 @@ import click
 import fied.frs.frs_extraction
 import fied.fied_compilation
 from fied import __version__
+from fied.utils import configure_debug_artifacts
 
 
 @click.command()
@@ -23,7 +24,19 @@ from fied import __version__
     type=click.Choice(["2017", "2020"]),
     help="Edition of FIED to use. Default is 2017.",
 )
-def main(verbose, vintage: int):
+@click.option(
+    "--debug-dir",
+    default=None,
+    type=click.Path(file_okay=False),
+    help="Save intermediate artifacts (Parquet) into this directory. "
+    "Disabled by default.",
+)
+@click.option(
+    "--uncertainty",
+    is_flag=True,
+    help="Include Monte Carlo percentiles of GHGRP unit energy estimates.",
+)
+def main(verbose, vintage: int, debug_dir, uncertainty):
     """FIED's command line interface."""
     if verbose == 1:
         level = logging.WARNING
@@ -44,9 +57,11 @@ def main(verbose, vintage: int):
 
     logger.info(f"FIED CLI version {__version__}")
 
+    configure_debug_artifacts(debug_dir)
+
     fied.frs.frs_extraction.doit()
 
-    fied.fied_compilation.doit(year=int(vintage))
+    fied.fied_compilation.doit(year=int(vintage), calc_uncertainty=uncertainty)
 
 if __name__ == "__main__":
     main()
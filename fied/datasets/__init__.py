@@ -4,6 +4,7 @@ from .mod import (
     fetch_nei_2017,
     fetch_nei_2020,
     fetch_emission,
+    fetch_ghgrp_unit_data,
     fetch_webfirefactors,
     fetch_scc,
     fetch_shapefile_census_block_groups,
@@ -12,8 +13,9 @@ from .mod import (
     fetch_shapefile_NHDP,
     fetch_state_FIPS,
     fetch_QPC,
+    fetch_QPC_workbook,
     fetch_ghgrp_records,
 )
 
-from .cbp import fetch_cbp_county
+from .cbp import fetch_cbp_county, scan_cbp
 from .naics import fetch_naics
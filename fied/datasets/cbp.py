@@ -1,12 +1,28 @@
-"""County Business Patterns data"""
+"""County Business Patterns data
+
+County CBP files are converted once per year into a typed Parquet store,
+partitioned as::
+
+    {store}/year={year}/part-0.parquet
+
+with suppressed ("N") establishment counts as nulls, zero-padded state
+(fipstate), county (fipscty), and combined (county_fips) FIPS codes, and
+NAICS codes as digits only (e.g., "1133//" is "1133"; the all-sectors
+total "------" is null). Use scan_cbp to query several years lazily,
+with filters pushed down to the Parquet files.
+"""
+
+import io
+import os
+import re
+import zipfile
+from pathlib import Path
+from typing import Iterable, Optional, Union
 
 import polars as pl
 import pooch
 import requests
 
-import re
-import tempfile
-
 
 CBP_DATA_URL = "https://www2.census.gov/programs-surveys/cbp/datasets/"
 CBP_API_URL = "https://api.census.gov/data/{year}/cbp"
@@ -24,6 +40,8 @@ Dogbert = pooch.create(
     },
 )
 
+CBP_STORE = Dogbert.abspath / "store"
+
 
 def _fix_null(df: pl.DataFrame) -> pl.DataFrame:
     """Fix null values in CBP data
@@ -32,42 +50,176 @@ def _fix_null(df: pl.DataFrame) -> pl.DataFrame:
     confidentiality reasons. This function replaces "N" with
     nulls and casts the affected columns to integers.
     """
-    columns = (c for c in df.columns if SIZE_HEADER_RULE.match(c))
-    for col in columns:
-        if df[col].dtype == pl.String:
-            df = df.with_columns(
-                pl.when(pl.col(col) == pl.lit("N"))
-                .then(None)
-                .otherwise(pl.col(col))
-                .cast(pl.Int32, strict=True)
-                .alias(col)
-            )
-        elif df[col].dtype == pl.Int64:
-            df = df.with_columns(
-                pl.col(col).cast(pl.Int32, strict=True).alias(col)
-            )
+    df = df.with_columns(
+        [
+            pl.when(pl.col(col) == pl.lit("N"))
+            .then(None)
+            .otherwise(pl.col(col))
+            .cast(pl.Int32, strict=True)
+            .alias(col)
+            if df[col].dtype == pl.String
+            else pl.col(col).cast(pl.Int32, strict=True)
+            for col in df.columns
+            if SIZE_HEADER_RULE.match(col)
+            and df[col].dtype in (pl.String, pl.Int64, pl.Int32)
+        ]
+    )
+
+    return df
+
+
+def _normalize(df: pl.DataFrame) -> pl.DataFrame:
+    """Normalize FIPS and NAICS codes of CBP data"""
+    df = df.rename({c: c.lower() for c in df.columns})
+
+    fipstate = pl.col("fipstate").cast(pl.String).str.zfill(2)
+    fipscty = pl.col("fipscty").cast(pl.String).str.zfill(3)
+
+    naics = pl.col("naics").cast(pl.String).str.replace_all(r"[^\d]", "")
+
+    df = df.with_columns(
+        fipstate.alias("fipstate"),
+        fipscty.alias("fipscty"),
+        (fipstate + fipscty).alias("county_fips"),
+        pl.when(naics == "").then(None).otherwise(naics).alias("naics"),
+    )
+
+    return _fix_null(df)
+
+
+def _read_cbp_zip(year: int) -> pl.DataFrame:
+    """Read the county CBP file of a year, as published
+
+    Files of years in the registry are checked against their hash; files
+    of other years are downloaded from the same location without a check.
+    """
+    artifact = f"{year}/cbp{str(year)[2:]}co.zip"
+
+    if artifact in Dogbert.registry:
+        fname = Dogbert.fetch(artifact)
+    else:
+        fname = pooch.retrieve(
+            url=CBP_DATA_URL + artifact,
+            known_hash=None,
+            fname=artifact.split("/")[-1],
+            path=Dogbert.abspath / str(year),
+        )
+
+    with zipfile.ZipFile(fname) as zf:
+        assert len(zf.namelist()) == 1
+        df = pl.read_csv(
+            io.BytesIO(zf.read(zf.namelist()[0])), infer_schema_length=None
+        )
 
     return df
 
 
+def build_cbp_store(
+    years: Iterable[int], store: Optional[Path] = None, loader=_read_cbp_zip
+) -> None:
+    """Convert CBP years that are not in the store to Parquet
+
+    Parameters
+    ----------
+    years : iterable of int
+        Years of the CBP data.
+    store : pathlib.Path, optional
+        Directory of the store. Defaults to CBP_STORE.
+    loader : callable
+        Function of the year returning the CBP data as published
+        (a polars.DataFrame). Defaults to reading the county CBP zip.
+    """
+    store = Path(CBP_STORE if store is None else store)
+
+    for year in years:
+        filename = store / f"year={year}" / "part-0.parquet"
+
+        if filename.exists():
+            continue
+
+        df = _normalize(loader(year)).with_columns(
+            pl.lit(year, dtype=pl.Int16).alias("year")
+        )
+
+        # Sorted data keeps row group statistics selective for filters
+        df = df.sort(["fipstate", "naics", "fipscty"], nulls_last=True)
+
+        filename.parent.mkdir(parents=True, exist_ok=True)
+        tmpname = filename.with_suffix(f".{os.getpid()}.part")
+        df.write_parquet(tmpname, statistics=True)
+        tmpname.replace(filename)
+
+
+def scan_cbp(
+    years: Union[int, Iterable[int]],
+    naics_prefix: Optional[Union[str, Iterable[str]]] = None,
+    states: Optional[Iterable[Union[int, str]]] = None,
+    store: Optional[Path] = None,
+    loader=_read_cbp_zip,
+) -> pl.LazyFrame:
+    """Lazily scan County Business Patterns data
+
+    Years that are not in the store are converted first (see
+    build_cbp_store). Filters are pushed down to the Parquet files when
+    the query is collected.
+
+    Parameters
+    ----------
+    years : int or iterable of int
+        Years of the CBP data.
+    naics_prefix : str or iterable of str, optional
+        NAICS codes to keep, by prefix (e.g., "311" or ["311", "322"]).
+    states : iterable of int or str, optional
+        State FIPS codes to keep (e.g., [1, "06"]).
+    store : pathlib.Path, optional
+        Directory of the store. Defaults to CBP_STORE.
+    loader : callable
+        See build_cbp_store.
+
+    Returns
+    -------
+    polars.LazyFrame
+        CBP data of all years, with a year column.
+    """
+    if isinstance(years, int):
+        years = [years]
+
+    years = list(years)
+    store = Path(CBP_STORE if store is None else store)
+
+    build_cbp_store(years, store=store, loader=loader)
+
+    lf = pl.scan_parquet(
+        [store / f"year={year}" / "part-0.parquet" for year in years]
+    )
+
+    if naics_prefix is not None:
+        if isinstance(naics_prefix, str):
+            naics_prefix = [naics_prefix]
+
+        lf = lf.filter(
+            pl.any_horizontal(
+                [pl.col("naics").str.starts_with(str(p)) for p in naics_prefix]
+            )
+        )
+
+    if states is not None:
+        lf = lf.filter(
+            pl.col("fipstate").is_in([str(s).zfill(2) for s in states])
+        )
+
+    return lf
+
+
 def fetch_cbp_county(year: int):
     """Fetch County Business Patterns data for a given year.
 
-    Saves locally the zipped file to keep cache smaller and unzips
-    every time it is called.
+    Data are read from the CBP store (see scan_cbp), which is built
+    from the cached zipped file the first time a year is fetched.
 
     Parameters
     ----------
     year : int
         Year of the CBP data to fetch.
     """
-    artifact = f"{year}/cbp{str(year)[2:]}co.zip"
-
-    with tempfile.TemporaryDirectory() as swap:
-        fnames = Dogbert.fetch(
-            artifact, processor=pooch.Unzip(extract_dir=swap)
-        )
-        assert len(fnames) == 1
-        df = pl.read_csv(fnames[0])
-
-    return _fix_null(df)
+    return scan_cbp(year).collect()
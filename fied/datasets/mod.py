@@ -16,15 +16,18 @@ import pandas as pd
 import polars as pl
 import pooch
 from pooch import HTTPDownloader
-from stream_unzip import stream_unzip
 
+from fied.datasets.remote_zip import (
+    fetch_zip_members,
+    fetch_zip_members_parquet,
+)
 from fied.ghgrp import get_GHGRP_data
 
 
 module_logger = logging.getLogger(__name__)
 
 
-def fetch_frs(combined=True):
+def fetch_frs(combined=True, members=None):
     """Fetch the Facility Registry Service (FRS) dataset from EPA
 
     NOTE: This dataset might be updated frequently. The current
@@ -33,36 +36,48 @@ def fetch_frs(combined=True):
     still important for reproducibility).
 
     Combined file was ~732 MB on Dec 2022, and ~1.2 GB on Feb 2025.
+    Only the required members of the combined file are fetched (see
+    remote_zip.fetch_zip_members).
 
     Parameters
     ----------
     combined : bool, optional
         If True, download the combined dataset, by default True.
         Otherwise, download the single dataset.
+    members : list of str, optional
+        Members of the combined dataset to fetch. By default, the
+        files used by FRS.import_format_frs (PROGRAM, NAICS, and
+        FACILITY). Other members are, e.g.,
+        NATIONAL_ALTERNATIVE_NAME_FILE.CSV, NATIONAL_CONTACT_FILE.CSV,
+        NATIONAL_ENVIRONMENTAL_INTEREST_FILE.CSV,
+        NATIONAL_MAILING_ADDRESS_FILE.CSV,
+        NATIONAL_ORGANIZATION_FILE.CSV, NATIONAL_SIC_FILE.CSV, and
+        NATIONAL_SUPP_INTEREST_FILE.CSV.
     """
     if combined:
         url = "https://ordsext.epa.gov/FLA/www3/state_files/national_combined.zip"
         # File changes often, so we need to think in another solution.
         # knwon_hash = "sha256:512455a2d234490f828cab1e4fc85b34f62048513f2ea9473c4b0e9123701538"
-        knwon_hash = None
-        members = [
-            "NATIONAL_ALTERNATIVE_NAME_FILE.CSV",
-            "NATIONAL_CONTACT_FILE.CSV",
-            "NATIONAL_ENVIRONMENTAL_INTEREST_FILE.CSV",
-            "NATIONAL_FACILITY_FILE.CSV",
-            "NATIONAL_MAILING_ADDRESS_FILE.CSV",
-            "NATIONAL_NAICS_FILE.CSV",
-            "NATIONAL_ORGANIZATION_FILE.CSV",
-            "NATIONAL_PROGRAM_FILE.CSV",
-            "NATIONAL_SIC_FILE.CSV",
-            "NATIONAL_SUPP_INTEREST_FILE.CSV",
-        ]
-    else:
-        url = (
-            "https://ordsext.epa.gov/FLA/www3/state_files/national_single.zip"
+        if members is None:
+            members = [
+                "NATIONAL_FACILITY_FILE.CSV",
+                "NATIONAL_NAICS_FILE.CSV",
+                "NATIONAL_PROGRAM_FILE.CSV",
+            ]
+
+        fnames = fetch_zip_members(
+            url,
+            members=members,
+            path=pooch.os_cache("FIED") / "FRS" / "national_combined.zip.unzip",
         )
-        knwon_hash = "sha256:1c41e349dfcf7f4ac4db2eb99b0814eb89cab980bf4880ad427fdfe289eaa979"
-        members = ["NATIONAL_SINGLE.CSV"]
+
+        return fnames
+
+    url = (
+        "https://ordsext.epa.gov/FLA/www3/state_files/national_single.zip"
+    )
+    knwon_hash = "sha256:1c41e349dfcf7f4ac4db2eb99b0814eb89cab980bf4880ad427fdfe289eaa979"
+    members = ["NATIONAL_SINGLE.CSV"]
 
     fnames = pooch.retrieve(
         url=url,
@@ -92,109 +107,120 @@ def fetch_zip_codes():
     return pd.read_excel(fname)
 
 
-def fetch_nei_2017():
+# Types of the numeric columns of the NEI facility process files, by
+# normalized column name. Other columns are read as strings.
+NEI_COLUMN_TYPES = {
+    "epa_region_code": "int64",
+    "region": "int64",
+    "fips_state_code": "int64",
+    "stfips": "int64",
+    "fips_code": "int64",
+    "fips": "int64",
+    "eis_facility_id": "int64",
+    "eis_unit_id": "int64",
+    "eis_process_id": "int64",
+    "primary_naics_code": "int64",
+    "naics_code": "int64",
+    "scc": "int64",
+    "reporting_period": "int64",
+    "site_latitude": "float64",
+    "site_longitude": "float64",
+    "design_capacity": "float64",
+    "total_emissions": "float64",
+    "emission_factor": "float64",
+    "calculation_parameter_value": "float64",
+    "calc_data_year": "int64",
+    "calc_method_code": "int64",
+}
+
+# Identifiers among NEI_COLUMN_TYPES, e.g., of the SCCs joined to
+# scc/iden_scc.csv. Their values are never read as nulls; values that
+# are not numbers raise an error instead.
+NEI_KEY_COLUMNS = [
+    "fips_state_code",
+    "stfips",
+    "fips_code",
+    "fips",
+    "eis_facility_id",
+    "eis_unit_id",
+    "eis_process_id",
+    "primary_naics_code",
+    "naics_code",
+    "scc",
+]
+
+
+def _fetch_nei(url, members, known_hash, parquet=False):
+    """Fetch NEI facility process files from an archive
+
+    See fetch_nei_2017 and fetch_nei_2020.
+    """
+    path = Path(pooch.os_cache("FIED")) / (url.rsplit("/", 1)[1] + ".unzip")
+
+    if parquet:
+        output = fetch_zip_members_parquet(
+            url,
+            members=members,
+            path=path,
+            known_hash=known_hash,
+            verify=False,
+            column_types=NEI_COLUMN_TYPES,
+            key_columns=NEI_KEY_COLUMNS,
+        )
+
+    else:
+        output = fetch_zip_members(
+            url,
+            members=members,
+            path=path,
+            known_hash=known_hash,
+            verify=False,
+        )
+
+    return output
+
+
+def fetch_nei_2017(parquet=False):
     """Fetch the 2017 National Emissions Inventory (NEI)
 
-    Temporary solution to deal with the unconventional compression
-    deflate64.
+    Only the regional point source files are fetched from the archive
+    (compressed with deflate64), skipping point_unknown.csv.
+
+    Parameters
+    ----------
+    parquet : bool, optional
+        If True, the files are decompressed in parallel and saved as
+        typed Parquet files instead of csv (see
+        remote_zip.fetch_zip_members_parquet).
     """
-    fzname = pooch.retrieve(
+    return _fetch_nei(
         url="https://gaftp.epa.gov/air/nei/2017/data_summaries/2017v1/2017neiJan_facility_process_byregions.zip",
+        members=["point_12345.csv", "point_678910.csv"],
         known_hash="sha256:8f015ea29fc82e17c370a316020ad76ebb7df16aaeea3fc24425647b0edcb7c9",
-        path=pooch.os_cache("FIED"),
-        downloader=HTTPDownloader(progressbar=True, verify=False),
+        parquet=parquet,
     )
 
-    members = ["point_unknown.csv", "point_12345.csv", "point_678910.csv"]
-
-    # Temporary solution
-    def zipped_chunks(filename, chunk_size=65536):
-        with open(filename, "rb") as f:
-            while True:
-                chunk = f.read(chunk_size)
-                if not chunk:
-                    break
-                yield chunk
-
-    path = Path(fzname + ".unzip")
-
-    if path.exists():
-        output = [
-            f for f in path.iterdir() if f.is_file() and (f.name in members)
-        ]
-        return [str(f) for f in output]
-
-    path.mkdir()
-    output = []
-    for fname, fsize, chunks in stream_unzip(zipped_chunks(fzname)):
-        print(f"Unzipping {fname.decode()}")
-        outname = path / fname.decode()
-        with open(outname, "wb") as f:
-            for c in chunks:
-                f.write(c)
-        if fname.decode() in members:
-            output.append(str(outname))
 
-    return output
-
-
-def fetch_nei_2020():
+def fetch_nei_2020(parquet=False):
     """Fetch the 2020 National Emissions Inventory (NEI)
 
-    Temporary solution to deal with the unconventional compression
-    deflate64.
+    Only the regional point source files are fetched from the archive
+    (compressed with deflate64), skipping point_unknown.csv.
+
+    Parameters
+    ----------
+    parquet : bool, optional
+        If True, the files are decompressed in parallel and saved as
+        typed Parquet files instead of csv (see
+        remote_zip.fetch_zip_members_parquet).
     """
-    fzname = pooch.retrieve(
+    return _fetch_nei(
         url="https://gaftp.epa.gov/air/nei/2020/data_summaries/2020nei_facility_process_byregions.zip",
+        members=[f"point_{n}.csv" for n in range(1, 11)],
         known_hash="sha256:1264392ef859801fef7349b796937a974bfcbdaee1f6e8f69c0686b8e6bc9b7d",
-        path=pooch.os_cache("FIED"),
-        downloader=HTTPDownloader(progressbar=True, verify=False),
+        parquet=parquet,
     )
 
-    members = [
-        "point_unknown.csv",
-        "point_1.csv",
-        "point_2.csv",
-        "point_3.csv",
-        "point_4.csv",
-        "point_5.csv",
-        "point_6.csv",
-        "point_7.csv",
-        "point_8.csv",
-        "point_9.csv",
-        "point_10.csv",
-    ]
-
-    # Temporary solution
-    def zipped_chunks(filename, chunk_size=65536):
-        with open(filename, "rb") as f:
-            while True:
-                chunk = f.read(chunk_size)
-                if not chunk:
-                    break
-                yield chunk
-
-    path = Path(fzname + ".unzip")
-
-    if path.exists():
-        output = [
-            f for f in path.iterdir() if f.is_file() and (f.name in members)
-        ]
-        return [str(f) for f in output]
-
-    path.mkdir()
-    output = []
-    for fname, fsize, chunks in stream_unzip(zipped_chunks(fzname)):
-        print(f"Unzipping {fname.decode()}")
-        outname = path / fname.decode()
-        with open(outname, "wb") as f:
-            for c in chunks:
-                f.write(c)
-        if fname.decode() in members:
-            output.append(str(outname))
-
-    return output
-
 
 def fetch_emission():
     """Fetch the Emissions by Unit and Fuel Type"""
@@ -215,6 +241,106 @@ def fetch_emission():
     return fnames[0]
 
 
+# Typed columns of the UNIT_DATA sheet (emissions by unit and fuel type)
+GHGRP_UNIT_DATA_INT_COLUMNS = [
+    "Facility Id",
+    "FRS Id",
+    "Reporting Year",
+    "Primary NAICS Code",
+]
+
+
+def _unit_data_frame(rows):
+    """Typed DataFrame from the rows of the UNIT_DATA sheet
+
+    The first rows of the sheet have values only in the first column;
+    the header is the first row without empty cells. Integer columns
+    (GHGRP_UNIT_DATA_INT_COLUMNS) are nullable integers, other columns
+    with only numbers are floats, and the rest are strings (numbers in
+    them, e.g., unit names such as 1.0, are written as in the GHGRP
+    tables, i.e., "1").
+    """
+    n = 0
+    while not all(rows[n]):
+        n += 1
+
+    columns = [str(c).strip() for c in rows[n]]
+    df = pd.DataFrame(rows[n + 1:], columns=columns).replace({"": None})
+    df = df.dropna(how="all").reset_index(drop=True)
+
+    for c in df.columns:
+        numeric = pd.to_numeric(df[c], errors="coerce")
+
+        if c in GHGRP_UNIT_DATA_INT_COLUMNS:
+            df[c] = numeric.round().astype("Int64")
+
+        elif numeric.notnull().sum() == df[c].notnull().sum():
+            df[c] = numeric.astype("float64")
+
+        else:
+            df[c] = df[c].map(
+                lambda v: str(int(v)) if isinstance(v, float) and v.is_integer() else v,
+                na_action="ignore",
+            ).astype("string")
+
+    return df
+
+
+def _read_unit_data_rows(fname):
+    """Values of the rows of the UNIT_DATA sheet of the GHGRP
+    emissions by unit xlsb"""
+    from pyxlsb import open_workbook
+
+    with open_workbook(fname) as wb:
+        with wb.get_sheet("UNIT_DATA") as sheet:
+            rows = [[c.v for c in row] for row in sheet.rows()]
+
+    return rows
+
+
+def _read_unit_data_xlsb(fname):
+    """Parse the UNIT_DATA sheet of the GHGRP emissions by unit xlsb"""
+    return _unit_data_frame(_read_unit_data_rows(fname))
+
+
+def fetch_ghgrp_unit_data(years=None, columns=None):
+    """Fetch the GHGRP unit data (emissions by unit and fuel type)
+
+    The UNIT_DATA sheet of the xlsb file (see fetch_emission) is slow
+    to parse, so it is converted only once per download (identified by
+    its hash) to a typed Parquet table, cached next to the xlsb.
+
+    Parameters
+    ----------
+    years : list of int, optional
+        Reporting years to read. All years by default.
+    columns : list of str, optional
+        Columns to read (stripped names, as in the xlsb). All columns by
+        default.
+
+    Returns
+    -------
+    pd.DataFrame
+        GHGRP unit data.
+    """
+    fname = fetch_emission()
+
+    file_hash = pooch.file_hash(fname)[:16]
+    filename = Path(fname).parent / f"ghgrp_unit_data_{file_hash}.parquet"
+
+    if not filename.exists():
+        module_logger.info(f"Converting GHGRP unit data to {filename}")
+        df = _read_unit_data_xlsb(fname)
+        df.to_parquet(filename.with_suffix(".part"), index=False)
+        filename.with_suffix(".part").replace(filename)
+
+    filters = None
+    if years is not None:
+        filters = [("Reporting Year", "in", [int(y) for y in years])]
+
+    return pd.read_parquet(filename, columns=columns, filters=filters)
+
+
 def fetch_webfirefactors():
     """Load all EPA WebFire emissions factors
 
@@ -237,6 +363,11 @@ def fetch_webfirefactors():
     return pd.read_csv(fnames[0])
 
 
+# Hash of the SCC download; also identifies the SCC unit and fuel types
+# saved by scc.scc_unit_id.SCC_ID
+SCC_KNOWN_HASH = "sha256:1f723ea9b7b4c54418a27f297669df37da24ec9aa34a92c3a835b4f7550aa736"
+
+
 def fetch_scc():
     """Load EPA's Source Classification Codes (SCC)
 
@@ -255,7 +386,7 @@ def fetch_scc():
     """
     fname = pooch.retrieve(
         url="https://sor-scc-api.epa.gov/sccwebservices/v1/SCC?format=CSV&sortFacet=scc+level+one&filename=SCCDownload.csv",
-        known_hash="sha256:1f723ea9b7b4c54418a27f297669df37da24ec9aa34a92c3a835b4f7550aa736",
+        known_hash=SCC_KNOWN_HASH,
         path=pooch.os_cache("FIED"),
         downloader=HTTPDownloader(progressbar=True),
     )
@@ -359,70 +490,90 @@ def fetch_QPC(year):
     2022-qtr-table-final-q3.xlsx: fc630bccf8e91e7d53d2feb8e1cc5b63fc9bbdd46c6d95519a4fd5318badd445
     2022-qtr-table-final-q4.xlsx: ac8bfbb7aa685a8aad0e2433a1a07409eccb946c1c231ac8682e0f36d4767edb
     """
+    qpc_data = pd.concat(
+        [fetch_QPC_workbook(year, "q" + str(n)) for n in range(1, 5)],
+        axis=0,
+        ignore_index=True,
+    )
+
+    return qpc_data
+
+
+def fetch_QPC_workbook(year, quarter):
+    """
+    Fetch and parse the QPC table of one quarter (see fetch_QPC).
+
+    Parameters
+    ----------
+    year : int
+        Survey year.
+
+    quarter : str
+        Quarter ('q1' to 'q4').
+
+    Returns
+    -------
+    data : pandas.DataFrame
+        Utilization rates and weekly operating hours by NAICS, as
+        reported (i.e., including flags such as 'D' and 'S').
+    """
     y = str(year)
+    q = quarter
 
     if year < 2017:
         excel_ex = ".xls"
     else:
         excel_ex = ".xlsx"
 
-    qpc_data = pd.DataFrame()
-
     base_url = "https://www2.census.gov/programs-surveys/qpc/tables/"
 
-    for q in ["q" + str(n) for n in range(1, 5)]:
-        if (year >= 2017) & (year < 2020):
-            y_url = "{!s}/{!s}_qtr_table_final_"
+    if (year >= 2017) & (year < 2020):
+        y_url = "{!s}/{!s}_qtr_table_final_"
 
-        # elif year < 2010:
-        #
-        #     y_url = \
-        #         '{!s}/qpc-quarterly-tables/{!s}_qtr_combined_tables_final_'
+    # elif year < 2010:
+    #
+    #     y_url = \
+    #         '{!s}/qpc-quarterly-tables/{!s}_qtr_combined_tables_final_'
 
-        elif (year == 2020) & (q == "q4"):
-            y_url = "{!s}/{!s}_qtr_table_final_"
+    elif (year == 2020) & (q == "q4"):
+        y_url = "{!s}/{!s}_qtr_table_final_"
 
-        elif year > 2019:
-            y_url = "{!s}/{!s}-qtr-table-final-"
+    elif year > 2019:
+        y_url = "{!s}/{!s}-qtr-table-final-"
 
-        else:
-            y_url = "{!s}/qpc-quarterly-tables/{!s}_qtr_table_final_"
+    else:
+        y_url = "{!s}/qpc-quarterly-tables/{!s}_qtr_table_final_"
 
-        if (year == 2016) & (q == "q4"):
-            url = base_url + y_url.format(y, y) + q + ".xlsx?#"
+    if (year == 2016) & (q == "q4"):
+        url = base_url + y_url.format(y, y) + q + ".xlsx?#"
 
-        else:
-            url = base_url + y_url.format(y, y) + q + excel_ex
+    else:
+        url = base_url + y_url.format(y, y) + q + excel_ex
 
-        fname = pooch.retrieve(
-            url, known_hash=None, path=pooch.os_cache("FIED"), progressbar=True
-        )
+    fname = pooch.retrieve(
+        url, known_hash=None, path=pooch.os_cache("FIED"), progressbar=True
+    )
 
-        # Excel formatting for 2008 is different than all other years.
-        # Will need to revise skiprows and usecols.
-        try:
-            data = pd.read_excel(
-                fname, sheet_name=1, skiprows=4, usecols=range(0, 7), header=0
-            )
-
-        except urllib.error.HTTPError:
-            print(f"Problem with {url}")
-
-        data = data.drop(data.columns[2], axis=1)
-        data.columns = [
-            "NAICS",
-            "Description",
-            "Utilization Rate",
-            "UR_Standard Error",
-            "Weekly_op_hours",
-            "Hours_Standard Error",
-        ]
-        data = data.dropna()
-        data["Q"] = q
-        data["Year"] = year
-        qpc_data = qpc_data.append(data, ignore_index=True)
+    # Excel formatting for 2008 is different than all other years.
+    # Will need to revise skiprows and usecols.
+    data = pd.read_excel(
+        fname, sheet_name=1, skiprows=4, usecols=range(0, 7), header=0
+    )
 
-    return qpc_data
+    data = data.drop(data.columns[2], axis=1)
+    data.columns = [
+        "NAICS",
+        "Description",
+        "Utilization Rate",
+        "UR_Standard Error",
+        "Weekly_op_hours",
+        "Hours_Standard Error",
+    ]
+    data = data.dropna()
+    data["Q"] = q
+    data["Year"] = year
+
+    return data
 
 
 def fetch_ghgrp_records(year: int, table: str):
@@ -0,0 +1,670 @@
+"""Selective extraction of members from remote ZIP archives
+
+Some of the FIED sources are large ZIP archives (e.g., FRS
+national_combined.zip, ~1.2 GB, and the NEI facility process files,
+several GB compressed with deflate64) from which only a few members are
+used. Instead of downloading the full archive, the central directory is
+fetched with HTTP range requests and then only the byte ranges of the
+requested members.
+
+Supported compression methods are stored, deflate, and deflate64.
+If the server does not support range requests, the full archive is
+downloaded with pooch and the members are extracted from the local
+copy.
+
+Example
+-------
+>>> from fied.datasets.remote_zip import fetch_zip_members
+>>> fnames = fetch_zip_members(
+...     "https://ordsext.epa.gov/FLA/www3/state_files/national_combined.zip",
+...     members=["NATIONAL_NAICS_FILE.CSV"],
+...     path=pooch.os_cache("FIED") / "FRS" / "national_combined.zip.unzip",
+... )
+"""
+
+import csv
+import io
+import itertools
+import logging
+import os
+import struct
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+import pandas as pd
+import pooch
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+import requests
+from pooch import HTTPDownloader
+from stream_inflate import stream_inflate64
+
+
+module_logger = logging.getLogger(__name__)
+
+STORED = 0
+DEFLATED = 8
+DEFLATED64 = 9
+
+# Enough to hold the end of central directory record with the longest
+# comment and the zip64 locator.
+_TAIL_SIZE = 22 + 65535 + 20
+
+_EOCD = struct.Struct("<4s4H2LH")
+_ZIP64_LOCATOR = struct.Struct("<4sLQL")
+_ZIP64_EOCD = struct.Struct("<4sQ2H2L4Q")
+_CENTRAL_HEADER = struct.Struct("<4s6H3L5H2L")
+_LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+
+class ZipMember(NamedTuple):
+    """Entry of the central directory of a ZIP archive"""
+
+    name: str
+    method: int
+    flags: int
+    crc: int
+    compressed_size: int
+    file_size: int
+    header_offset: int
+
+
+class RangeNotSupportedError(Exception):
+    """Server does not support HTTP range requests"""
+
+
+class _HTTPSource:
+    """Byte ranges of a remote file, with HTTP range requests"""
+
+    def __init__(self, url, session=None, verify=True, timeout=60):
+        self.url = url
+        self._session = session or requests.Session()
+        self._verify = verify
+        self._timeout = timeout
+
+    def _get(self, byte_range):
+        response = self._session.get(
+            self.url,
+            headers={"Range": f"bytes={byte_range}"},
+            stream=True,
+            verify=self._verify,
+            timeout=self._timeout,
+        )
+        response.raise_for_status()
+
+        if response.status_code != 206:
+            response.close()
+            raise RangeNotSupportedError(self.url)
+
+        return response
+
+    def tail(self, length):
+        """Last bytes of the file and the file size"""
+        response = self._get(f"-{length}")
+        data = response.content
+        size = int(response.headers["Content-Range"].rsplit("/", 1)[1])
+
+        return data, size
+
+    def read(self, start, length):
+        return self._get(f"{start}-{start + length - 1}").content
+
+    def iter_range(self, start, length, chunk_size):
+        if length == 0:
+            return
+
+        with self._get(f"{start}-{start + length - 1}") as response:
+            yield from response.iter_content(chunk_size=chunk_size)
+
+
+class _FileSource:
+    """Byte ranges of a local file, with the same interface as _HTTPSource"""
+
+    def __init__(self, filename):
+        self.filename = filename
+
+    def tail(self, length):
+        size = os.path.getsize(self.filename)
+
+        with open(self.filename, "rb") as f:
+            f.seek(max(size - length, 0))
+            data = f.read()
+
+        return data, size
+
+    def read(self, start, length):
+        with open(self.filename, "rb") as f:
+            f.seek(start)
+            return f.read(length)
+
+    def iter_range(self, start, length, chunk_size):
+        with open(self.filename, "rb") as f:
+            f.seek(start)
+
+            while length > 0:
+                chunk = f.read(min(chunk_size, length))
+                if not chunk:
+                    break
+                length -= len(chunk)
+                yield chunk
+
+
+def _parse_zip64_extra(extra, file_size, compressed_size, header_offset):
+    """Replace the 0xFFFFFFFF placeholders with the zip64 extra field"""
+    i = 0
+    while i + 4 <= len(extra):
+        header_id, size = struct.unpack_from("<2H", extra, i)
+
+        if header_id == 0x0001:
+            values = iter(struct.unpack_from(f"<{size // 8}Q", extra, i + 4))
+
+            if file_size == 0xFFFFFFFF:
+                file_size = next(values)
+            if compressed_size == 0xFFFFFFFF:
+                compressed_size = next(values)
+            if header_offset == 0xFFFFFFFF:
+                header_offset = next(values)
+            break
+
+        i += 4 + size
+
+    return file_size, compressed_size, header_offset
+
+
+def read_central_directory(source):
+    """Read the central directory of a ZIP archive
+
+    Parameters
+    ----------
+    source : _HTTPSource or _FileSource
+        Source of the archive bytes.
+
+    Returns
+    -------
+    dict
+        ZipMember by member name.
+    """
+    tail, size = source.tail(_TAIL_SIZE)
+    tail_start = size - len(tail)
+
+    i = tail.rfind(b"PK\x05\x06")
+    if i < 0:
+        raise zipfile.BadZipFile("End of central directory not found")
+
+    _, _, _, _, n_entries, cd_size, cd_offset, _ = _EOCD.unpack_from(tail, i)
+
+    # zip64 archives keep the actual values in the zip64 EOCD record
+    j = i - _ZIP64_LOCATOR.size
+    if j >= 0 and tail[j:j + 4] == b"PK\x06\x07":
+        _, _, eocd64_offset, _ = _ZIP64_LOCATOR.unpack_from(tail, j)
+
+        if eocd64_offset >= tail_start:
+            record = tail[eocd64_offset - tail_start:]
+        else:
+            record = source.read(eocd64_offset, _ZIP64_EOCD.size)
+
+        (_, _, _, _, _, _, _, n_entries, cd_size,
+         cd_offset) = _ZIP64_EOCD.unpack_from(record)
+
+    if cd_offset >= tail_start:
+        directory = tail[cd_offset - tail_start:cd_offset - tail_start + cd_size]
+    else:
+        directory = source.read(cd_offset, cd_size)
+
+    members = {}
+    i = 0
+    for _ in range(n_entries):
+        (signature, _, _, flags, method, _, _, crc, compressed_size,
+         file_size, name_len, extra_len, comment_len, _, _, _,
+         header_offset) = _CENTRAL_HEADER.unpack_from(directory, i)
+
+        if signature != b"PK\x01\x02":
+            raise zipfile.BadZipFile("Bad central directory entry")
+
+        i += _CENTRAL_HEADER.size
+        name = directory[i:i + name_len]
+        name = name.decode("utf-8" if flags & 0x800 else "cp437")
+        extra = directory[i + name_len:i + name_len + extra_len]
+        i += name_len + extra_len + comment_len
+
+        file_size, compressed_size, header_offset = _parse_zip64_extra(
+            extra, file_size, compressed_size, header_offset
+        )
+
+        members[name] = ZipMember(
+            name, method, flags, crc, compressed_size, file_size,
+            header_offset,
+        )
+
+    return members
+
+
+def _decompress(chunks, method):
+    if method == STORED:
+        yield from chunks
+
+    elif method == DEFLATED:
+        decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        for c in chunks:
+            yield decompressor.decompress(c)
+        yield decompressor.flush()
+
+    elif method == DEFLATED64:
+        uncompressed_chunks, _, _ = stream_inflate64()
+        yield from uncompressed_chunks(chunks)
+
+    else:
+        raise NotImplementedError(f"Compression method {method}")
+
+
+def iter_member(source, member, chunk_size=1 << 20):
+    """Iterate over the uncompressed content of a ZIP member
+
+    Only the bytes of the member (local header and compressed data) are
+    read from the source. The CRC-32 and size are checked at the end.
+
+    Parameters
+    ----------
+    source : _HTTPSource or _FileSource
+        Source of the archive bytes.
+
+    member : ZipMember
+        Member to extract, from read_central_directory.
+
+    chunk_size : int
+        Size of the compressed chunks read at a time.
+
+    Yields
+    ------
+    bytes
+        Uncompressed chunks.
+    """
+    if member.flags & 0x1:
+        raise NotImplementedError(f"Encrypted member {member.name}")
+
+    header = source.read(member.header_offset, _LOCAL_HEADER.size)
+    (signature, _, _, _, _, _, _, _, _, name_len,
+     extra_len) = _LOCAL_HEADER.unpack(header)
+
+    if signature != b"PK\x03\x04":
+        raise zipfile.BadZipFile(f"Bad local header for {member.name}")
+
+    data_offset = (
+        member.header_offset + _LOCAL_HEADER.size + name_len + extra_len
+    )
+    chunks = source.iter_range(
+        data_offset, member.compressed_size, chunk_size
+    )
+
+    crc = 0
+    size = 0
+    for c in _decompress(chunks, member.method):
+        crc = zlib.crc32(c, crc)
+        size += len(c)
+        yield c
+
+    if (crc != member.crc) or (size != member.file_size):
+        raise zipfile.BadZipFile(f"Bad CRC-32 or size for {member.name}")
+
+
+def extract_members(source, members, path, chunk_size=1 << 20,
+                    directory=None):
+    """Extract ZIP members from a source
+
+    Parameters
+    ----------
+    source : _HTTPSource or _FileSource
+        Source of the archive bytes.
+
+    members : list of str
+        Names of the members to extract.
+
+    path : str or pathlib.Path
+        Output directory.
+
+    directory : dict, optional
+        Central directory, from read_central_directory. Read from the
+        source if not given.
+
+    Returns
+    -------
+    list of str
+        Paths of the extracted members.
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+
+    if directory is None:
+        directory = read_central_directory(source)
+
+    missing = [m for m in members if m not in directory]
+    if missing:
+        raise KeyError(f"Members not found in archive: {missing}")
+
+    output = []
+    for name in members:
+        module_logger.info(f"Unzipping {name}")
+        outname = path / name
+        outname.parent.mkdir(parents=True, exist_ok=True)
+
+        # Partial files are never mistaken for cached members
+        tmpname = outname.with_name(outname.name + ".part")
+        with open(tmpname, "wb") as f:
+            for c in iter_member(source, directory[name], chunk_size):
+                f.write(c)
+        tmpname.replace(outname)
+
+        output.append(str(outname))
+
+    return output
+
+
+def _open_archive(url, path, known_hash=None, verify=True):
+    """Source and central directory of a remote archive
+
+    Uses range requests if the server supports them. Otherwise, the
+    full archive is downloaded with pooch to the parent of path.
+    """
+    try:
+        source = _HTTPSource(url, verify=verify)
+        directory = read_central_directory(source)
+
+    except RangeNotSupportedError:
+        module_logger.info(
+            f"No range requests for {url}; downloading full archive"
+        )
+        fzname = pooch.retrieve(
+            url=url,
+            known_hash=known_hash,
+            path=Path(path).parent,
+            downloader=HTTPDownloader(progressbar=True, verify=verify),
+        )
+        source = _FileSource(fzname)
+        directory = read_central_directory(source)
+
+    return source, directory
+
+
+def fetch_zip_members(url, members, path, known_hash=None, verify=True,
+                      chunk_size=1 << 20):
+    """Fetch only some members of a remote ZIP archive
+
+    Members already extracted in path are not fetched again.
+
+    Parameters
+    ----------
+    url : str
+        URL of the ZIP archive.
+
+    members : list of str
+        Names of the members to fetch.
+
+    path : str or pathlib.Path
+        Directory where the members are extracted.
+
+    known_hash : str, optional
+        Hash of the full archive, only checked if the server does not
+        support range requests and the full archive is downloaded.
+        Members are always checked with their CRC-32.
+
+    verify : bool
+        Verify the server's TLS certificate.
+
+    chunk_size : int
+        Size of the chunks read at a time.
+
+    Returns
+    -------
+    list of str
+        Paths of the extracted members, in the order of members.
+    """
+    path = Path(path)
+
+    pending = [m for m in members if not (path / m).exists()]
+
+    if pending:
+        source, directory = _open_archive(url, path, known_hash, verify)
+        extract_members(source, pending, path, chunk_size, directory)
+
+    return [str(path / m) for m in members]
+
+
+class _ChunkStream(io.RawIOBase):
+    """Read-only file object over an iterator of bytes"""
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self._buffer = b""
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._buffer:
+            try:
+                self._buffer = next(self._chunks)
+            except StopIteration:
+                return 0
+
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+
+        return n
+
+
+def _csv_column_types(header, column_types):
+    """Arrow types of the columns of a csv header
+
+    Columns are matched to column_types by their normalized names
+    (stripped, with spaces replaced by underscores). Other columns are
+    read as strings, so that a late value in a large file never breaks
+    type inference.
+    """
+    names = next(csv.reader([header.decode("utf-8-sig")]))
+
+    return {
+        n: pa.type_for_alias(
+            column_types.get(n.strip().replace(" ", "_"), "string")
+        )
+        for n in names
+    }
+
+
+def _cast_column(array, type_):
+    """Cast a string column to type_
+
+    Values that don't match type_ are read as nulls.
+
+    Returns
+    -------
+    array : pyarrow.Array
+        Cast column.
+    invalid : int
+        Number of values read as nulls.
+    """
+    try:
+        return array.cast(type_), 0
+
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        values = pd.to_numeric(array.to_pandas(), errors="coerce")
+
+        if pa.types.is_integer(type_):
+            values = values.where(values % 1 == 0)
+
+        cast = pa.array(values, type=type_, from_pandas=True)
+
+        return cast, cast.null_count - array.null_count
+
+
+def _member_to_parquet(source, member, outname, column_types, chunk_size,
+                       key_columns=()):
+    """Parse a csv member of a ZIP archive into a Parquet file
+
+    The member is decompressed as a stream and parsed into Arrow record
+    batches, written one at a time, without an intermediate csv.
+    Columns are parsed as strings and cast to their types batch by
+    batch, so that values that don't match a type only affect their
+    column. Such values of key columns raise a ValueError.
+    """
+    chunks = iter_member(source, member, chunk_size)
+
+    # Read enough to get the header
+    head = b""
+    for c in chunks:
+        head += c
+        if b"\n" in head:
+            break
+
+    types = _csv_column_types(head.split(b"\n", 1)[0], column_types)
+
+    reader = pacsv.open_csv(
+        io.BufferedReader(
+            _ChunkStream(itertools.chain([head], chunks)),
+            buffer_size=chunk_size,
+        ),
+        read_options=pacsv.ReadOptions(block_size=chunk_size),
+        convert_options=pacsv.ConvertOptions(
+            column_types={n: pa.string() for n in types},
+            strings_can_be_null=True,
+        ),
+    )
+
+    schema = pa.schema([(n, types[n]) for n in reader.schema.names])
+
+    keys = {
+        n for n in schema.names if n.strip().replace(" ", "_") in key_columns
+    }
+
+    invalid = dict.fromkeys(schema.names, 0)
+
+    tmpname = Path(f"{outname}.part")
+    try:
+        with pq.ParquetWriter(tmpname, schema, compression="zstd") as w:
+            for batch in reader:
+                columns = []
+
+                for field, column in zip(schema, batch.columns):
+                    if field.type != pa.string():
+                        cast, n = _cast_column(column, field.type)
+                        invalid[field.name] += n
+
+                        if n > 0 and field.name in keys:
+                            values = column.filter(
+                                pc.and_(cast.is_null(), column.is_valid())
+                            )
+                            raise ValueError(
+                                f"{member.name}: values of key column "
+                                f"{field.name} are not {field.type}, e.g. "
+                                f"{values[:3].to_pylist()}"
+                            )
+
+                        column = cast
+
+                    columns.append(column)
+
+                w.write_batch(
+                    pa.RecordBatch.from_arrays(columns, schema=schema)
+                )
+
+    except ValueError:
+        tmpname.unlink(missing_ok=True)
+        raise
+
+    tmpname.replace(outname)
+
+    for name, n in invalid.items():
+        if n > 0:
+            module_logger.warning(
+                f"{member.name}: {n} values of {name} are not "
+                f"{schema.field(name).type}; read as nulls"
+            )
+
+    return str(outname)
+
+
+def fetch_zip_members_parquet(url, members, path, known_hash=None,
+                              verify=True, column_types=None, key_columns=(),
+                              workers=None, chunk_size=1 << 22):
+    """Fetch csv members of a remote ZIP archive as Parquet files
+
+    Each member is decompressed and parsed directly into Arrow record
+    batches in a worker process, and saved as Parquet (same name, with
+    the .parquet extension). Members already converted in path are not
+    fetched again.
+
+    Parameters
+    ----------
+    url : str
+        URL of the ZIP archive.
+
+    members : list of str
+        Names of the csv members to fetch.
+
+    path : str or pathlib.Path
+        Directory where the Parquet files are saved.
+
+    known_hash : str, optional
+        Hash of the full archive, only checked if the server does not
+        support range requests and the full archive is downloaded.
+
+    verify : bool
+        Verify the server's TLS certificate.
+
+    column_types : dict, optional
+        Arrow type alias (e.g., 'int64', 'float64') by normalized
+        column name (stripped, with spaces replaced by underscores).
+        Other columns are read as strings. Values that don't match the
+        type of their column are read as nulls (and logged).
+
+    key_columns : iterable of str, optional
+        Normalized names of identifier columns of column_types (e.g.,
+        'scc'). Values of these that don't match their type raise a
+        ValueError instead of being read as nulls.
+
+    workers : int, optional
+        Number of worker processes. Defaults to one per member, up to
+        the number of CPUs.
+
+    chunk_size : int
+        Size of the chunks read and parsed at a time.
+
+    Returns
+    -------
+    list of str
+        Paths of the Parquet files, in the order of members.
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+
+    outnames = [path / (Path(m).stem + ".parquet") for m in members]
+
+    pending = [(m, o) for m, o in zip(members, outnames) if not o.exists()]
+
+    if pending:
+        source, directory = _open_archive(url, path, known_hash, verify)
+
+        missing = [m for m, _ in pending if m not in directory]
+        if missing:
+            raise KeyError(f"Members not found in archive: {missing}")
+
+        if workers is None:
+            workers = min(len(pending), os.cpu_count() or 1)
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    _member_to_parquet, source, directory[m], o,
+                    column_types or {}, chunk_size, frozenset(key_columns),
+                )
+                for m, o in pending
+            ]
+
+            for f in futures:
+                module_logger.info(f"Converted {f.result()}")
+
+    return [str(o) for o in outnames]
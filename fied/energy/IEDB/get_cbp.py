@@ -1,9 +1,8 @@
 import requests
 import pandas as pd
-import io
 import os
-import zipfile
-import re
+
+from fied.datasets.cbp import scan_cbp
 
 
 class CBP:
@@ -56,63 +55,18 @@ class CBP:
         self.naics_df = naics_table(self.year)
         self.naics_cbp = {}
 
-        cbp_file = 'cbp' + str(self.year)[2:] + 'co'
-
-        cbp_csv_url = \
-            'https://www2.census.gov/programs-surveys/cbp/' + \
-            'datasets/' + str(self.year) + '/' + cbp_file + '.zip'
-
-        with zipfile.ZipFile(io.BytesIO(
-                    requests.get(cbp_csv_url).content
-                    )) as zip_cbp:
-
-            cbp = pd.read_csv(zip_cbp.open(zip_cbp.namelist()[0]))
-
-        # NAICS codes are a strings that include - and / characters
-        def fix_naics(naics):
-            """
-            Regex to retain only digits in naics strings. Returns
-            integer.
-            """
-            if re.match("\d+", naics) is None:
-                naics = 0
-
-            else:
-                naics = int(re.findall("\d+", naics)[0])
+        # CBP data with normalized NAICS and FIPS codes (see
+        # datasets.cbp.scan_cbp)
+        cbp = scan_cbp(self.year).collect().to_pandas()
 
-            return naics
-        
-        cbp.columns = [x.lower() for x in cbp.columns]
-
-        cbp.naics = cbp.naics.apply(fix_naics)
+        # NAICS codes are digits only; 0 for the all-sectors total
+        cbp['naics'] = cbp.naics.fillna('0').astype(int)
 
         # Create concatentated FIPS field to match GHGRP COUNTY_FIPS
-        def state_fips_str(x):
-
-            if len(str(x)) == 1:
+        cbp['COUNTY_FIPS'] = cbp.county_fips.astype(int)
 
-                fips = '0' + str(x)
-
-            else:
-                fips = str(x)
-
-            return fips
-
-        def county_fips_str(x):
-
-            int_len = len(str(x))
-
-            mult = 3 - int_len
-
-            fips = '0' * mult + str(x)
-
-            return fips
-
-        cbp['COUNTY_FIPS'] = \
-            cbp.fipstate.apply(state_fips_str) + \
-                cbp.fipscty.apply(county_fips_str)
-
-        cbp['COUNTY_FIPS'] = cbp.COUNTY_FIPS.astype(int)
+        cbp['fipstate'] = cbp.fipstate.astype(int)
+        cbp['fipscty'] = cbp.fipscty.astype(int)
 
         census_regions = pd.read_csv(
                 os.path.abspath('./energy/IEDB/US_FIPS_Codes.csv'),
@@ -135,12 +89,11 @@ class CBP:
 
         # Remaining lines of code further format cbp data into cbp_matching
         # for comparison against GHGRP facilities.
-        self.cbp['naics_n'] = self.cbp.naics.apply(lambda x: len(str(x)))
+        self.cbp['naics_n'] = self.cbp.naics.astype(str).str.len()
 
-        self.cbp['industry'] = \
-            self.cbp.loc[self.cbp[self.cbp.naics != 0].index, 'naics'].apply(
-                    lambda x: int(str(x)[0:2]) in [11, 21, 23, 31, 32, 33]
-                    )
+        self.cbp['industry'] = self.cbp.naics.astype(str).str[0:2].astype(
+            int
+            ).isin([11, 21, 23, 31, 32, 33]).where(self.cbp.naics != 0)
 
         self.cbp_matching = pd.DataFrame(
                 self.cbp[(self.cbp.industry == True) &
@@ -8,6 +8,8 @@ Modified on Thur Feb 9 16:09:00 2017 by colin
 import numpy as np
 import os
 import itertools as itools
+import time
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 
 class IPF:
@@ -100,12 +102,128 @@ class IPF:
 
         return seed
 
-    def mecs_ipf(self, seed_df):
+    @staticmethod
+    def calc_ipf3D(seeds, cols, rows, max_iter=3000, tol=1e-15, workers=1):
+        """
+        Batched two-dimensional iterative proportional fitting of a stack
+        of seed matrices (see calc_ipf2D).
+
+        Rows and columns of all seed matrices are scaled in place with
+        broadcasting. Each seed matrix converges independently; converged
+        matrices are set aside and no longer scaled.
+
+        Parameters
+        ----------
+        seeds : numpy.ndarray
+            Seed matrices, with dimensions of (k,m,n).
+
+        cols : numpy.ndarray
+            Row totals of each seed matrix, with dimensions of (k,m) or
+            (k,m,1).
+
+        rows : numpy.ndarray
+            Column totals of each seed matrix, with dimensions of (k,n)
+            or (k,1,n).
+
+        max_iter : int; default is 3000
+            Maximum number of iterations.
+
+        tol : float; default is 1e-15
+            Convergence tolerance of the error of row totals, relative to
+            the sum of row totals of each seed matrix.
+
+        workers : int; default is 1
+            Number of processes. Seed matrices are split across a process
+            pool if workers is more than 1 (e.g., for very large seeds).
+
+        Returns
+        -------
+        seeds : numpy.ndarray
+            Fitted matrices, with dimensions of (k,m,n).
+        """
+
+        seeds = np.array(seeds, dtype=np.float64)
+
+        k = seeds.shape[0]
+
+        cols = np.asarray(cols, dtype=np.float64).reshape(k, -1, 1)
+        rows = np.asarray(rows, dtype=np.float64).reshape(k, 1, -1)
+
+        if (workers > 1) & (k > 1):
+            chunks = [
+                c for c in np.array_split(np.arange(k), workers) if len(c) > 0
+                ]
+
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(
+                    IPF.calc_ipf3D,
+                    [seeds[c] for c in chunks], [cols[c] for c in chunks],
+                    [rows[c] for c in chunks], itools.repeat(max_iter),
+                    itools.repeat(tol)
+                    ))
+
+            return np.concatenate(results, axis=0)
+
+        # Seed matrices that have not converged, and their fitted values
+        active = np.arange(k)
+        work = seeds
+        col = cols
+        row = rows
+        limit = tol * np.abs(cols).sum(axis=(1, 2))
+
+        row_sum = work.sum(axis=2, keepdims=True)
+        row_factor = np.empty_like(row_sum)
+        col_sum = np.empty_like(row)
+        col_factor = np.empty_like(row)
+
+        for n in range(max_iter):
+            row_factor.fill(0.0)
+            np.divide(col, row_sum, out=row_factor, where=row_sum > 0)
+            work *= row_factor
+
+            np.sum(work, axis=1, keepdims=True, out=col_sum)
+            col_factor.fill(0.0)
+            np.divide(row, col_sum, out=col_factor, where=col_sum > 0)
+            work *= col_factor
+
+            # Error of row totals after fitting column totals
+            np.sum(work, axis=2, keepdims=True, out=row_sum)
+            error = np.sqrt(((row_sum - col)**2).sum(axis=(1, 2)))
+
+            done = error <= limit[active]
+
+            if done.any():
+                seeds[active[done]] = work[done]
+
+                active = active[~done]
+
+                if len(active) == 0:
+                    break
+
+                work = work[~done]
+                col = col[~done]
+                row = row[~done]
+                row_sum = row_sum[~done]
+                row_factor = row_factor[~done]
+                col_sum = col_sum[~done]
+                col_factor = col_factor[~done]
+
+        #report error if max iterations reached
+        if len(active) > 0:
+            seeds[active] = work
+            print("Max Iterations ", dict(zip(active, error[~done])))
+
+        return seeds
+
+    def mecs_ipf(self, seed_df, workers=1):
         """
         Set up and run 2-D IPF to estimate MECS fuel use by industry,
         region, fuel type, and employement size class.
         naics_df == MECS table 3.2
         emply_df == MECS table 3.3
+
+        IPF of all fuel types and regions is run as a batch (see
+        calc_ipf3D), across workers processes.
         """
 
         seed_shop = seed_df.copy(deep=True)
@@ -115,55 +233,46 @@ class IPF:
         seed_shop = seed_shop[new_cols]
         seed_shop.set_index(['region', 'index'], inplace=True)
         seed_shop = seed_shop.T
-        seed_shop_dict = {}
 
-        # Iterate through all of the fuel types
-        first = True
-        for r in range(0, len(self.colDict['energy'])):
+        # All fuel types and regions
+        fuel_regions = list(itools.product(
+            range(len(self.colDict['energy'])), self.colDict['regions']
+            ))
+
+        seeds, cols, rows = [], [], []
+
+        for r, reg in fuel_regions:
             counter = 6 * r
             fuel = self.colDict['energy'][r]
-            for reg in self.colDict['regions']:
-                seed_shop_dict[reg] = \
-                    seed_shop[reg].iloc[:, (0+counter):(6+counter)]
-                col = self.naics_df[self.naics_df.region==reg][fuel].values
-                row = self.emply_df[
-                        (self.emply_df.region==reg) &
-                        (self.emply_df.Data_cat=='Employment_size')
-                        ][fuel].values
-                col = np.array([col]).astype(float)
-                row = np.array([row]).astype(float)
-                col = np.transpose(col)
-                seed = np.array(seed_shop_dict[reg].iloc[0:81,:].astype(float))
-
-                if first:
-                    # Something awry with previous method of stacking numpy
-                    # arrays. Just using Dataframes instead.
-#                    naics_emply = self.ipf2D_calc(seed, col, row)
-                    naics_emply = pd.DataFrame.from_records(
-                             IPF.calc_ipf2D(seed, col, row),
-                             columns=self.empsize_dict.values()
-                             )
-
-                    naics_emply['MECS_Region'] = reg
-                    naics_emply['MECS_FT'] = fuel
-                    naics_emply['naics'] = self.naics_df.naics.unique()
-
-                else:
-#                    naics_emply = np.hstack(
-#                            (naics_emply, self.ipf2D_calc(seed, col, row))
-#                            )
-
-                    ipf_results = pd.DataFrame.from_records(
-                             IPF.calc_ipf2D(seed, col, row),
-                             columns=self.empsize_dict.values()
-                             )
-
-                    ipf_results['MECS_Region'] = reg
-                    ipf_results['MECS_FT'] = fuel
-                    ipf_results['naics'] = self.naics_df.naics.unique()
-                    naics_emply = naics_emply.append(ipf_results,
-                                                     ignore_index=True)
-                first = False
+            seeds.append(
+                seed_shop[reg].iloc[0:81, (0+counter):(6+counter)].to_numpy(
+                    dtype=float
+                    )
+                )
+            cols.append(
+                self.naics_df[self.naics_df.region==reg][fuel].to_numpy(
+                    dtype=float
+                    )
+                )
+            rows.append(
+                self.emply_df[
+                    (self.emply_df.region==reg) &
+                    (self.emply_df.Data_cat=='Employment_size')
+                    ][fuel].to_numpy(dtype=float)
+                )
+
+        ipf_results = IPF.calc_ipf3D(
+            np.stack(seeds), np.stack(cols), np.stack(rows), workers=workers
+            )
+
+        naics_emply = pd.concat([
+            pd.DataFrame.from_records(
+                ipf_results[i], columns=list(self.empsize_dict.values())
+                ).assign(
+                    MECS_Region=reg, MECS_FT=self.colDict['energy'][r],
+                    naics=self.naics_df.naics.unique()
+                    ) for i, (r, reg) in enumerate(fuel_regions)
+            ], axis=0, ignore_index=True)
 
         ipf_results_formatted = pd.melt(
                 naics_emply, id_vars=['MECS_Region', 'MECS_FT', 'naics'],
@@ -179,7 +288,7 @@ class IPF:
         ipf_results_formatted = pd.pivot_table(
                 ipf_results_formatted, index=['MECS_Region', 'MECS_FT',
                                               'Emp_Size'],
-                values='value', columns='naics', aggfunc=sum
+                values='value', columns='naics', aggfunc='sum'
                 )
 
         ipf_results_formatted.reset_index(inplace=True)
@@ -219,3 +328,51 @@ class IPF:
 #            '_ipf_results_naics_employment.csv'
 #
 #        ipf_results_formatted.to_csv(self.__location__+filename)
+
+
+def benchmark_ipf(n_seeds=32, shape=(81, 6), workers=1, random_state=0):
+    """
+    Compare run times of calc_ipf2D, called for each seed matrix, and
+    calc_ipf3D for a stack of random seed matrices with consistent
+    totals (e.g., 8 fuel types x 4 regions of MECS).
+
+    Returns
+    -------
+    timing : dict
+        Run times (seconds) of calc_ipf2D and calc_ipf3D, and the
+        maximum absolute difference of their results.
+    """
+
+    rng = np.random.default_rng(random_state)
+
+    target = rng.gamma(1.0, 10.0, size=(n_seeds,) + shape)
+    cols = target.sum(axis=2)
+    rows = target.sum(axis=1)
+    seeds = target * rng.uniform(0.5, 1.5, size=target.shape)
+
+    t_start = time.perf_counter()
+    ipf_2D = np.stack([
+        IPF.calc_ipf2D(seeds[i], cols[i][:, np.newaxis], rows[i][np.newaxis, :])
+        for i in range(n_seeds)
+        ])
+    t_2D = time.perf_counter() - t_start
+
+    t_start = time.perf_counter()
+    ipf_3D = IPF.calc_ipf3D(seeds, cols, rows, workers=workers)
+    t_3D = time.perf_counter() - t_start
+
+    timing = {'calc_ipf2D': t_2D, 'calc_ipf3D': t_3D,
+              'max_difference': np.abs(ipf_2D - ipf_3D).max()}
+
+    return timing
+
+
+if __name__ == '__main__':
+
+    timing = benchmark_ipf()
+
+    print(
+        f"calc_ipf2D: {timing['calc_ipf2D']:0.2f} seconds, "
+        f"calc_ipf3D: {timing['calc_ipf3D']:0.2f} seconds "
+        f"(max. difference {timing['max_difference']:0.2e})"
+        )
@@ -19,6 +19,7 @@ from fied.nei.nei_EF_calculations import NEI
 from fied.frs.frs_extraction import FRS
 from fied.qpc.census_qpc import QPC
 from fied.geocoder.geopandas_tools import FiedGIS
+from fied.utils import save_debug_artifact
 import fied.geocoder.geo_tools
 
 
@@ -215,7 +216,7 @@ def melt_multiple_ids(frs_data, other_data):
 
     else:
         logging.error("registryID missing")
-        frs_mult.to_csv('frs_mult.csv')
+        save_debug_artifact(frs_mult, 'frs_mult')
 
     frs_mult = pd.concat(
         [split_multiple(d, col_names) for i, d in frs_mult.iterrows()],
@@ -475,6 +476,9 @@ def reconcile_shared_nonocs(nei_data_shared_nonocs, ghgrp_data_shared_nonocs, dt
             'energyMJq3': 'sum'
             }
 
+        # Totals only select the rows of each source; selected GHGRP rows
+        # keep their energy percentiles (e.g., energyMJp50), which are
+        # not additive across fuel types and so are not aggregated here.
         ghgrp_agg_dict = {
             'designCapacity': 'sum', 'unitName': 'count',
             'energyMJ': 'sum'
@@ -813,11 +817,22 @@ def allocate_shared_ocs(ghgrp_data_shared_ocs, nei_data_shared_ocs, dt='energy')
         portion_col = 'energyMJPortion'
         # nei_sum_cols = ['energyMJq0', 'energyMJq2','energyMJq3']
 
+        # Monte Carlo percentiles of GHGRP energy (see GHGRP_unit_char), if
+        # calculated. Samples of estimates with the same reporting year and
+        # fuel type share factors, so percentiles of the units of a
+        # (registryID, fuelTypeStd) add up; where a standardized fuel type
+        # combines several GHGRP fuel types, the sum overstates the spread.
+        pctl_cols = [
+            c for c in ghgrp_data_shared_ocs.columns
+            if re.fullmatch(r'energyMJp[\d.]+', c)
+            ]
+
     elif dt == 'ghgs':
         ghgrp_col = 'ghgsTonneCO2e'
         nei_col = 'ghgsTonneCO2eQ2' 
         portion_col = 'ghgsPortion'
         # nei_sum_cols = ['ghgsTonneCO2eQ0', 'ghgsTonneCO2eQ2','ghgsTonneCO2eQ3']
+        pctl_cols = []
 
     nei_dso = nei_data_shared_ocs.copy(deep=True)
     ghgrp_dso = ghgrp_data_shared_ocs.copy(deep=True)
@@ -853,13 +868,15 @@ def allocate_shared_ocs(ghgrp_data_shared_ocs, nei_data_shared_ocs, dt='energy')
     ghgrp_dso.sort_index(inplace=True)
 
     ocs_allocated = pd.merge(
-        nei_dso, ghgrp_dso[[ghgrp_col]].sum(level=[0,1]), 
+        nei_dso, ghgrp_dso[[ghgrp_col] + pctl_cols].sum(level=[0,1]), 
         left_index=True,
         right_index=True,
         how='left'
         )
     
-    ocs_allocated.loc[:, ghgrp_col] = ocs_allocated[portion_col].multiply(ocs_allocated[ghgrp_col])
+    # Percentiles of a fixed portion are the portion of the percentiles
+    for c in [ghgrp_col] + pctl_cols:
+        ocs_allocated.loc[:, c] = ocs_allocated[portion_col].multiply(ocs_allocated[c])
 
     check = pd.concat(
         [ocs_allocated[ghgrp_col].sum(level=[0,1]), 
@@ -1269,7 +1286,20 @@ def save_final_data(final_data, year, fpath=None, fformat='csv', comp='gzip'):
     return
 
 
-def doit(year: int = 2017):
+def doit(year: int = 2017, calc_uncertainty: bool = False):
+    """
+    Compile and save the FIED for a year.
+
+    Parameters
+    ----------
+    year : int; default is 2017
+        Data vintage year.
+
+    calc_uncertainty : bool; default is False
+        If True, GHGRP unit energy estimates include Monte Carlo
+        percentiles (energyMJp5, energyMJp50, energyMJp95; see
+        run_GHGRP.calc_energy and GHGRP_unit_char).
+    """
 
     SCC_ID().main()
     fiedgis = FiedGIS()
@@ -1294,7 +1324,9 @@ def doit(year: int = 2017):
     # GHGRP ID
 
     # ghgrp_energy_file = GHGRP.main(year, year)
-    ghgrp_energy_file = run_GHGRP.main(year, year)
+    ghgrp_energy_file = run_GHGRP.main(
+        year, year, calc_uncertainty=calc_uncertainty
+        )
     # ghgrp_energy_file = "ghgrp_energy_20240110-1837.parquet"
     ghgrp_unit_data = GHGRP_unit_char(ghgrp_energy_file, year).main()  # format ghgrp energy calculations to fit frs_json schema
 
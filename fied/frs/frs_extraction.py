@@ -7,17 +7,65 @@ import os
 import requests
 import urllib
 import itertools
+import uuid
+import numpy as np
 import pandas as pd
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from fied import datasets
 from fied.frs.naics_selection import NAICS_Identification
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 module_logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
 
+def _dumps(record):
+    """Serialize a record as compact JSON (bytes)"""
+    if orjson is not None:
+        return orjson.dumps(
+            record, option=orjson.OPT_SERIALIZE_NUMPY, default=str
+            )
+
+    return json.dumps(record, default=str).encode()
+
+
+def _loads(line):
+    """Deserialize a JSON line"""
+    if orjson is not None:
+        return orjson.loads(line)
+
+    return json.loads(line)
+
+
+def _map(executor, func, items):
+    """Map func over items, in parallel if an executor is given"""
+    if executor is None:
+        return map(func, items)
+
+    return executor.map(func, items)
+
+
+def _as_strings(column):
+    """
+    Values of a column as strings, independent of the inferred dtype
+    (e.g., 1 and 1.0 are both '1'); missing values are ''
+    """
+    strings = column.astype(str)
+
+    if pd.api.types.is_float_dtype(column):
+        whole = (column % 1 == 0) & (column.abs() < 2**63)
+        strings[whole] = column[whole].astype('int64').astype(str)
+
+    return strings.where(column.notna(), '')
+
+
 class FRS:
     """
     Class for extracting relevant facility-level
@@ -68,6 +116,16 @@ class FRS:
             #     ],  #TODO CSV contains useful data, but many ORG_NAME, etc. for a given RegistryID 
             })
 
+        # Program system acronyms (keys) extracted from the PROGRAM file and
+        # the names of their ID columns (values) in the formatted data.
+        # Other programs (e.g., 'CAMDBS') keep the PGM_SYS_ID_{acronym} names.
+        self._program_ids = OrderedDict({
+            'EIS': 'eisFacilityID',
+            'E-GGRT': 'ghgrpID',
+            'TRIS': 'trisID',
+            'ICIS-AIR': 'icisAirID'
+            })
+
         # Dictionary of relevant data categories (keys) and variables (values)
         self._json_format = OrderedDict({
             'site': [
@@ -84,6 +142,11 @@ class FRS:
                 ]
             })
 
+    @property
+    def names_columns(self):
+        """Names of relevant FRS data files (keys) and their columns"""
+        return self._names_columns
+
     def call_all_fips(self):
         """
         Uses Census API to call all state and county fips codes.
@@ -175,63 +238,49 @@ class FRS:
             Formatted FRS data
         """
 
-        data_dict = {}
-        for a in programs:
-            data_dict[a] = pd.DataFrame(data.query("PGM_SYS_ACRNM==@a")[
-                ['REGISTRY_ID', 'PGM_SYS_ID', 'PGM_SYS_ACRNM']
-                ])
-            data_dict[a].loc[:, f'PGM_SYS_ID_{a}'] = \
-                data_dict[a].PGM_SYS_ID
+        # Facilities may have >1 program system ID, which
+        # leads to duplicate entries when indexing by REGISTRY_ID.
+        # Keep the first ID of each (REGISTRY_ID, program) and move the
+        # remaining ones to a comma-separated additional column.
+        pgm_data = data.loc[
+            data.PGM_SYS_ACRNM.isin(programs),
+            ['REGISTRY_ID', 'PGM_SYS_ACRNM', 'PGM_SYS_ID']
+            ]
 
-            # Facilities may have >1 program system ID, which
-            # leads to duplicate entries when indexing by REGISTRY_ID.
-            dups = data_dict[a][data_dict[a].REGISTRY_ID.duplicated()].REGISTRY_ID.unique()
+        n = pgm_data.groupby(['REGISTRY_ID', 'PGM_SYS_ACRNM']).cumcount()
 
-            if len(dups) == 0:
-                continue
+        first_id = pgm_data[n == 0].set_index(
+            ['REGISTRY_ID', 'PGM_SYS_ACRNM']
+            ).PGM_SYS_ID
 
-            else:
-                data_dict[a].loc[:, f'PGM_SYS_ID_{a}_additional'] = None
-
-                for d in dups:
-                    ids = data_dict[a][data_dict[a].REGISTRY_ID == d]
-                    use_index = ids.drop_duplicates(
-                        subset=['REGISTRY_ID'], keep='first'
-                        ).index
-                    # logging.info(f'registry ID: {d}\nLength of IDs: {len(ids)}')
-                    # for i, v in enumerate(ids[1:].index):
-                    data_dict[a].at[use_index, f'PGM_SYS_ID_{a}_additional'] =\
-                            ', '.join(ids[1:][f'PGM_SYS_ID_{a}'].to_list())
-                            # data_dict[a].loc[v, f'PGM_SYS_ID_{a}']
-
-                data_dict[a].drop_duplicates(
-                    subset=['REGISTRY_ID'], keep='first',
-                    inplace=True
-                    )
+        additional_id = pgm_data[n > 0].astype({'PGM_SYS_ID': str}).groupby(
+            ['REGISTRY_ID', 'PGM_SYS_ACRNM']
+            ).PGM_SYS_ID.agg(', '.join)
+
+        pgm_data = pd.concat(
+            [first_id.rename('id'), additional_id.rename('additional')],
+            axis=1
+            ).unstack('PGM_SYS_ACRNM')
 
-            data_dict[a].set_index('REGISTRY_ID', inplace=True)
-            data_dict[a].drop(
-                ['PGM_SYS_ACRNM', 'PGM_SYS_ID'], axis=1, inplace=True
+        # Columns for all programs, even those without (additional) IDs
+        pgm_data = pgm_data.reindex(
+            columns=pd.MultiIndex.from_tuples(
+                [(c, a) for a in programs for c in ['id', 'additional']]
                 )
+            )
 
-            data_dict[a].replace({'N': False, 'Y': True}, inplace=True)
+        pgm_data.columns = [
+            f'PGM_SYS_ID_{a}' if c == 'id' else f'PGM_SYS_ID_{a}_additional'
+            for c, a in pgm_data.columns
+            ]
 
         data.drop(['PGM_SYS_ACRNM', 'PGM_SYS_ID'], axis=1, inplace=True)
         data.drop_duplicates(subset=['REGISTRY_ID'], inplace=True)
         data.replace({'N': False, 'Y': True}, inplace=True)
         data.set_index('REGISTRY_ID', inplace=True)
 
-        pgm_data = pd.concat(
-            [data_dict[k] for k in data_dict.keys()],
-            axis=1
-            )
-
         data = data.join(pgm_data)
 
-        # pgm_data = pgm_data.reindex(index=data.index)
-        # pgm_data.update(data)
-
-        # data = pd.DataFrame(pgm_data)
         data.reset_index(inplace=True)
 
         return data
@@ -272,9 +321,9 @@ class FRS:
 
         return data
 
-    def read_frs_csv(self, name, columns, programs=['EIS', 'E-GGRT']):
+    def read_raw_frs_csv(self, name, columns):
         """
-        Builds dataframe based on FRS datasets.
+        Reads an FRS csv file, without formatting.
 
         Parameters
         ----------
@@ -286,15 +335,10 @@ class FRS:
         columns : list
             List of columns to extract from csv.
 
-        programs : list; ['EIS', 'E-GGRT']
-            List of program system acronyms to extract from
-            NATIONAL_PROGRAM_FILE.CSV.
-
         Returns
         -------
         data : pandas.DataFrame
-            Formatted FRS data, based on FACILITY, ORGANIZATION,
-            NAICS, and PROGRAM datasets.
+            Raw FRS data.
         """
 
         if name == 'single':
@@ -310,8 +354,37 @@ class FRS:
             usecols=columns, low_memory=False
             )
 
+        return data
+
+    def read_frs_csv(self, name, columns, programs=('EIS', 'E-GGRT')):
+        """
+        Builds dataframe based on FRS datasets.
+
+        Parameters
+        ----------
+        name : str
+            String for name of FRS csv file. All csv files
+            extracted from national_combined.zip are named according
+            to "NATIONAL_{name}_FILE.CSV".
+
+        columns : list
+            List of columns to extract from csv.
+
+        programs : list; ('EIS', 'E-GGRT')
+            List of program system acronyms to extract from
+            NATIONAL_PROGRAM_FILE.CSV.
+
+        Returns
+        -------
+        data : pandas.DataFrame
+            Formatted FRS data, based on FACILITY, ORGANIZATION,
+            NAICS, and PROGRAM datasets.
+        """
+
+        data = self.read_raw_frs_csv(name, columns)
+
         if name == 'PROGRAM':
-            data = self.format_program_csv(data, programs)
+            data = self.format_program_csv(data, list(programs))
 
         elif name == 'NAICS':
             data = self.format_naics_csv(data)
@@ -321,82 +394,156 @@ class FRS:
 
         return data
 
-    def build_frs_json(self, frs_data_df, save_path=None, ret=False):
+    def iter_frs_records(self, frs_data_df, chunksize=100000):
         """
+        Iterate over FRS facility records, in chunks, with facility
+        data organized by the categories of self._json_format.
 
         Parameters
         ----------
         frs_data_df : pandas.DataFrame
             Dataframe from formatted FRS csv datasets.
 
-        ret : bool; default == False
-            Returns FRS data in json format.
+        chunksize : int; default == 100000
+            Number of facilities per chunk.
 
-        save_path : str; default == None
-            Directory to save FRS data in json file.
-            Must specify to save.
-
-        Returns
-        -------
-        frs_json : json, optional.
-            Dictionary of facility data extracted from FRS in
-            JSON format.
+        Yields
+        ------
+        records : list of dict
+            One dictionary per REGISTRY_ID, e.g.,
+            {'REGISTRY_ID': 1000, 'site': {...}, 'facility': {...}}.
         """
 
-        # Fix formatting
+        if frs_data_df.index.name != 'REGISTRY_ID':
+            frs_data_df = frs_data_df.set_index('REGISTRY_ID')
+
+        # Fix formatting of codes that should be int, not float or str.
+        # Mapped over unique values only.
         fix_codes = ['NAICS_CODE', 'POSTAL_CODE', 'CONGRESSIONAL_DIST_NUM',
                      'CENSUS_BLOCK_CODE', 'HUC_CODE', 'EPA_REGION_CODE',
                      ]
 
+        fixed = {}
+
         for code in fix_codes:
-            frs_data_df.loc[:, code] = frs_data_df[code].apply(
-                lambda x: FRS.fix_code(x)
-                )
+            if code in frs_data_df.columns:
+                codes = frs_data_df[code]
+                codes_map = {c: FRS.fix_code(c) for c in codes.dropna().unique()}
+                # Keep as object so that fixed codes are not cast back to float
+                fixed[code] = pd.Series(
+                    [codes_map.get(c, c) for c in codes],
+                    index=codes.index, dtype=object
+                    )
 
-        if frs_data_df.index.name == 'REGISTRY_ID':
-            pass
+        frs_data_df = frs_data_df.assign(**fixed)
 
-        else:
-            frs_data_df.set_index('REGISTRY_ID', inplace=True)
-
-        # Must first transpose DF
-        frs_data_df = frs_data_df.T
-        frs_data_df.index.name = 'VARIABLE'
-        frs_data_df.reset_index(inplace=True)
-        frs_data_df.loc[:, 'CATEGORY'] = None
-        for i in frs_data_df.index:
-            for cat, v in self._json_format.items():
-                if frs_data_df.at[i, 'VARIABLE'] in v:
-                    frs_data_df.at[i, 'CATEGORY'] = cat
-                else:
-                    continue
+        categories = {
+            cat: [c for c in v if c in frs_data_df.columns]
+            for cat, v in self._json_format.items()
+            }
 
-        frs_data_df.set_index(['CATEGORY', 'VARIABLE'], inplace=True)
+        for start in range(0, len(frs_data_df), chunksize):
+            chunk = frs_data_df.iloc[start:start + chunksize]
 
-        val_dict = \
-            {k: frs_data_df.xs(k).to_dict() for k in self._json_format.keys()}  # nested dict, e.g., {'site' : {1000: {NAICS_CODE: 2111}}}
+            values = {}
 
-        # Previous approach used dict.fromkeys, which didn't work for setting values from
-        # val_dict
-        frs_dict = {
-            k: [{c: v[k]} for c, v in val_dict.items()] for k in frs_data_df.columns
-            }
+            for cat, cols in categories.items():
+                data = chunk[cols].astype(object)
+                values[cat] = data.where(data.notnull(), None).to_numpy().tolist()
+
+            yield [
+                {'REGISTRY_ID': FRS.fix_code(rid),
+                 **{cat: dict(zip(categories[cat], values[cat][i]))
+                    for cat in categories}}
+                for i, rid in enumerate(chunk.index)
+                ]
+
+    def build_frs_json(self, frs_data_df, save_path=None, ret=False,
+                       chunksize=100000, workers=1):
+        """
+        Export FRS facility data as newline-delimited JSON (one object
+        per REGISTRY_ID), written in chunks into a gzip file.
+
+        Uses orjson for serialization, if installed. With workers > 1,
+        chunks are compressed in parallel and written as consecutive
+        gzip members, which are read as a single gzip stream.
+
+        Parameters
+        ----------
+        frs_data_df : pandas.DataFrame
+            Dataframe from formatted FRS csv datasets.
+
+        ret : bool; default == False
+            Returns FRS data as a list of facility records.
+
+        save_path : str; default == None
+            Directory to save FRS data in found_ind_data.ndjson.gz.
+            Must specify to save.
+
+        chunksize : int; default == 100000
+            Number of facilities serialized at a time.
+
+        workers : int; default == 1
+            Number of threads used for gzip compression.
+
+        Returns
+        -------
+        frs_json : list of dict, optional.
+            Facility data extracted from FRS, one record per
+            REGISTRY_ID.
+        """
+
+        frs_json = [] if ret else None
 
         if save_path:
-            with gzip.open(os.path.join(save_path, 'found_ind_data.json.gz'),
-                           'wt', encoding="ascii") as f:
-                json.dump(frs_dict, f, sort_keys=True, indent=4)
+            fname = os.path.join(save_path, 'found_ind_data.ndjson.gz')
+            f = open(fname, 'wb')
 
         else:
-            pass
+            f = None
 
-        if ret:
-            frs_json = json.dump(frs_dict)
+        def serialize(records):
+            return b''.join(_dumps(r) + b'\n' for r in records)
 
-            return frs_json
+        def compress(data):
+            return gzip.compress(data, compresslevel=6)
 
-        else:
-            pass
+        executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+
+        try:
+            batch = []
+
+            for records in self.iter_frs_records(frs_data_df, chunksize):
+
+                if ret:
+                    frs_json.extend(records)
+
+                if f is None:
+                    continue
+
+                batch.append(serialize(records))
+
+                # Bound memory to one serialized chunk per worker
+                if len(batch) >= workers:
+                    for data in _map(executor, compress, batch):
+                        f.write(data)
+                    batch = []
+
+            if batch:
+                for data in _map(executor, compress, batch):
+                    f.write(data)
+
+        finally:
+            if f is not None:
+                f.close()
+
+            if executor is not None:
+                executor.shutdown()
+
+        if save_path:
+            self.logger.info(f'FRS data saved to {fname}')
+
+        return frs_json
 
     def add_frs_columns_json(self, frs_data_df):
         """
@@ -415,7 +562,7 @@ class FRS:
 
         return
 
-    def import_format_frs(self, combined=True):
+    def import_format_frs(self, combined=True, programs=('EIS', 'E-GGRT')):
         """
         Import and format downloaded frs files
 
@@ -428,6 +575,11 @@ class FRS:
             Indicate whether the data set is constructed using
             the EPA FRS single file or combined files.
 
+        programs : list; ('EIS', 'E-GGRT')
+            Program system acronyms with IDs to extract, e.g., adding
+            'TRIS' and 'ICIS-AIR'. All programs are extracted in a
+            single pass over the PROGRAM file.
+
         Returns
         -------
         final_data : pandas.DataFrame
@@ -443,28 +595,59 @@ class FRS:
 
         # Reminder that self._names_columns is an ordered dict
         pgm_data = self.read_frs_csv(
-            name='PROGRAM', columns=self._names_columns['PROGRAM']
+            name='PROGRAM', columns=self._names_columns['PROGRAM'],
+            programs=programs
             )
 
         naics_data = self.read_frs_csv(
             name='NAICS', columns=self._names_columns['NAICS']
             )
 
-        if combined:
-            fac_data = self.read_frs_csv(
-                name='FACILITY', columns=self._names_columns['FACILITY']
-                )
+        fac_name = 'FACILITY' if combined else 'single'
+
+        fac_data = self.read_frs_csv(
+            name=fac_name, columns=self._names_columns[fac_name]
+            )
+
+        final_data = self.merge_frs_data(
+            pgm_data, naics_data, fac_data, combined=combined
+            )
+
+        return final_data
+
+    def merge_frs_data(self, pgm_data, naics_data, fac_data, combined=True):
+        """
+        Merges formatted PROGRAM and NAICS data with facility data and
+        renames columns to the FIED schema.
+
+        Parameters
+        ----------
+        pgm_data : pandas.DataFrame
+            Formatted PROGRAM data (see format_program_csv).
+
+        naics_data : pandas.DataFrame
+            Formatted NAICS data (see format_naics_csv).
+
+        fac_data : pandas.DataFrame
+            FACILITY data (combined files) or single file data.
 
+        combined : bool; default is True
+            Indicate whether the data set is constructed using
+            the EPA FRS single file or combined files.
+
+        Returns
+        -------
+        final_data : pandas.DataFrame
+            DataFrame indexed by registryID.
+        """
+
+        if combined:
             final_data = pd.merge(
                 pgm_data, fac_data, on='REGISTRY_ID',
                 how='right'
                 )
 
         else:
-            fac_data = self.read_frs_csv(
-                name='single', columns=self._names_columns['single']
-                )
-
             final_data = pd.merge(
                 fac_data, pgm_data, on='REGISTRY_ID',
                 how='left'
@@ -496,15 +679,14 @@ class FRS:
             'SENSITIVE_IND': 'sensitiveInd',
             'SMALL_BUS_IND': 'smallBusInd',
             'ENV_JUSTICE_CODE': 'envJusticeCode',
-            'PGM_SYS_ID_EIS': 'eisFacilityID',
-            'PGM_SYS_ID_EIS_additional': 'eisFacilityIDAdditional',
-            'PGM_SYS_ID_E-GGRT': 'ghgrpID',
-            'PGM_SYS_ID_E-GGRT_additional': 'ghgrpIDAdditional',
             'EPA_REGION_CODE': 'epaRegionCode',
             'LATITUDE83': 'latitude',
             'LONGITUDE83': 'longitude',
             'NAICS_CODE': 'naicsCode',
-            'NAICS_CODE_additional': 'naicsCodeAdditional'
+            'NAICS_CODE_additional': 'naicsCodeAdditional',
+            **{f'PGM_SYS_ID_{a}': v for a, v in self._program_ids.items()},
+            **{f'PGM_SYS_ID_{a}_additional': f'{v}Additional'
+               for a, v in self._program_ids.items()}
             }, inplace=True)
 
 
@@ -534,34 +716,373 @@ class FRS:
         final_data.set_index('registryID', inplace=True)
         return final_data
 
-    # TODO 
     @staticmethod
-    def load_foundational_json(found_json_file):
+    def hash_registry_rows(data):
         """
-        Load json file of foundational energy data.
-    
+        Hash the rows of a raw FRS file by REGISTRY_ID.
+
+        Row hashes of a REGISTRY_ID are summed (modulo 2**64), so the
+        result does not depend on the order of rows in the file. Values
+        are hashed as strings, so rows do not change hash when the
+        inferred dtype of a column does (e.g., int to float when a value
+        is missing).
+
+        Parameters
+        ----------
+        data : pandas.DataFrame
+            Raw FRS data, with a REGISTRY_ID column.
+
+        Returns
+        -------
+        registry_hash : pandas.Series
+            Hash (uint64) indexed by REGISTRY_ID.
         """
 
-        with gzip.open(found_json_file, mode='rb') as gzfile:
-            # with json.load(gfile) as jfile:
-            json_data = pd.DataFrame.from_dict(json.load(gzfile),
-                                               orient='index')
+        row_hash = pd.util.hash_pandas_object(
+            data.apply(_as_strings), index=False
+            )
+
+        registry_hash = row_hash.groupby(data.REGISTRY_ID.to_numpy()).sum()
+        registry_hash.index.name = 'REGISTRY_ID'
+
+        return registry_hash
+
+    @staticmethod
+    def diff_registry_hashes(new_hash, old_hash):
+        """
+        Compare REGISTRY_ID hashes of two FRS snapshots.
+
+        Parameters
+        ----------
+        new_hash : pandas.Series
+            Hashes indexed by REGISTRY_ID of the new FRS data.
+
+        old_hash : pandas.Series
+            Hashes indexed by REGISTRY_ID of the previous snapshot.
+
+        Returns
+        -------
+        diff : dict of pandas.Index
+            REGISTRY_IDs that were 'inserted', 'updated', or 'deleted'.
+        """
+
+        shared = new_hash.index.intersection(old_hash.index)
+
+        updated = shared[
+            new_hash.loc[shared].to_numpy() != old_hash.loc[shared].to_numpy()
+            ]
+
+        diff = {
+            'inserted': new_hash.index.difference(old_hash.index),
+            'updated': updated,
+            'deleted': old_hash.index.difference(new_hash.index)
+            }
+
+        return diff
+
+    def import_format_frs_incremental(self, snapshot_dir, combined=True,
+                                      programs=('EIS', 'E-GGRT')):
+        """
+        Import and format downloaded FRS files, reprocessing only the
+        facilities that changed since the previous snapshot.
+
+        Raw FRS rows are hashed by REGISTRY_ID and compared to the
+        hashes of the snapshot saved in snapshot_dir. Only inserted and
+        updated REGISTRY_IDs are formatted; the snapshot is then updated
+        with the new data. If there is no snapshot (or it was built with
+        other combined/programs arguments), all facilities are processed.
+
+        Parameters
+        ----------
+        snapshot_dir : str or pathlib.Path
+            Directory of the FRS snapshot (formatted data and hashes).
+
+        combined : bool; default is True
+            Indicate whether the data set is constructed using
+            the EPA FRS single file or combined files.
+
+        programs : list; ('EIS', 'E-GGRT')
+            Program system acronyms with IDs to extract.
+
+        Returns
+        -------
+        final_data : pandas.DataFrame
+            DataFrame indexed by registryID, same as import_format_frs.
+
+        changes : dict
+            Change set relative to the previous snapshot: formatted data
+            of 'inserted' and 'updated' facilities (pandas.DataFrame
+            indexed by registryID), and 'deleted' registryIDs
+            (pandas.Index). See apply_frs_changes.
+        """
+
+        snapshot_dir = Path(snapshot_dir)
+        snapshot_dir.mkdir(parents=True, exist_ok=True)
+
+        # The metadata file names the data and hash files of the current
+        # snapshot; it is replaced last, so that snapshots are updated
+        # all at once.
+        meta_file = snapshot_dir / 'frs_snapshot.json'
+
+        meta = {'combined': combined, 'programs': list(programs)}
+
+        fnames = datasets.fetch_frs(combined=combined)
+        self._frs_data_path = os.path.dirname(fnames[0])
+
+        fac_name = 'FACILITY' if combined else 'single'
+
+        raw_data = OrderedDict(
+            (n, self.read_raw_frs_csv(n, self._names_columns[n]))
+            for n in ['PROGRAM', 'NAICS', fac_name]
+            )
 
-        frs_data = pd.DataFrame(index=json_data.index)
+        file_hash = {
+            n: self.hash_registry_rows(d) for n, d in raw_data.items()
+            }
+
+        registry_ids = pd.Index([], name='REGISTRY_ID')
+
+        for h in file_hash.values():
+            registry_ids = registry_ids.union(h.index)
+
+        # Registry IDs missing from a file have a hash of 0 for that file.
+        # Reindex with fill_value to keep uint64 (NaN would cast to float).
+        new_hash = pd.util.hash_pandas_object(
+            pd.DataFrame(
+                {n: h.reindex(registry_ids, fill_value=0)
+                 for n, h in file_hash.items()}
+                ),
+            index=False
+            )
 
-        for c in json_data.columns:
+        try:
+            with open(meta_file, 'r') as f:
+                old_meta = json.load(f)
+
+            if {k: old_meta.get(k) for k in meta} != meta:
+                raise FileNotFoundError(meta_file)
 
-            column_data = pd.concat(
-                [pd.DataFrame.from_dict(json_data.iloc[i, c]).T for i in range(0, len(json_data))],
-                axis=0
+            old_data = self.restore_list_columns(
+                pd.read_parquet(snapshot_dir / old_meta['data'])
+                )
+            old_hash = pd.read_parquet(
+                snapshot_dir / old_meta['hash']
+                ).rowHash
+
+        except (FileNotFoundError, KeyError):
+            self.logger.info(
+                f'No FRS snapshot in {snapshot_dir}; processing all facilities'
+                )
+            old_data = None
+            old_hash = pd.Series(
+                [], index=pd.Index([], name='REGISTRY_ID', dtype=new_hash.index.dtype),
+                dtype='uint64'
                 )
 
-            column_data.index = frs_data.index
+        diff = self.diff_registry_hashes(new_hash, old_hash)
+
+        self.logger.info(
+            'FRS changes: ' +
+            ', '.join(f'{len(v)} {k}' for k, v in diff.items())
+            )
+
+        changed = diff['inserted'].union(diff['updated'])
+
+        raw_data = {
+            n: d[d.REGISTRY_ID.isin(changed)] for n, d in raw_data.items()
+            }
+
+        new_data = self.merge_frs_data(
+            self.format_program_csv(raw_data['PROGRAM'], list(programs)),
+            self.format_naics_csv(raw_data['NAICS']),
+            raw_data[fac_name],
+            combined=combined
+            )
+
+        if old_data is None:
+            old_data = new_data.iloc[0:0]
+
+        removed = old_data.index.isin(diff['updated'].union(diff['deleted']))
+
+        changes = {
+            'inserted': new_data[~new_data.index.isin(old_data.index)],
+            'updated': new_data[new_data.index.isin(old_data.index)],
+            'deleted': old_data.index[
+                removed & ~old_data.index.isin(new_data.index)
+                ].unique()
+            }
+
+        final_data = pd.concat([old_data[~removed], new_data], axis=0)
+
+        version = uuid.uuid4().hex[:12]
+
+        meta['data'] = f'frs_data_formatted.{version}.parquet'
+        meta['hash'] = f'frs_registry_hash.{version}.parquet'
+
+        final_data.to_parquet(snapshot_dir / meta['data'])
+        new_hash.to_frame('rowHash').to_parquet(snapshot_dir / meta['hash'])
+
+        tmp_file = meta_file.with_suffix(f'.{os.getpid()}.part')
+
+        with open(tmp_file, 'w') as f:
+            json.dump(meta, f)
+
+        os.replace(tmp_file, meta_file)
+
+        # Remove files of previous snapshots
+        for f in snapshot_dir.glob('frs_*.parquet'):
+            if f.name not in (meta['data'], meta['hash']):
+                f.unlink()
 
-            frs_data = pd.concat(
-                [frs_data, column_data], axis=1
+        return final_data, changes
+
+    @staticmethod
+    def restore_list_columns(data):
+        """
+        Convert arrays read from Parquet list columns (e.g.,
+        naicsCodeAdditional) back to lists, as in formatted FRS data.
+
+        Parameters
+        ----------
+        data : pandas.DataFrame
+            Data read from Parquet.
+
+        Returns
+        -------
+        data : pandas.DataFrame
+        """
+
+        for c in data.columns[data.dtypes == object]:
+            is_array = data[c].map(lambda x: isinstance(x, np.ndarray))
+
+            if is_array.any():
+                data[c] = data[c].map(
+                    lambda x: x.tolist() if isinstance(x, np.ndarray) else x
+                    )
+
+        return data
+
+    @staticmethod
+    def apply_frs_changes(data, changes, new_data=None, id_col='registryID'):
+        """
+        Update data derived from FRS facilities (e.g., formatted FRS
+        data or the assembled FIED) with an FRS change set.
+
+        Rows of inserted, updated, and deleted facilities are removed from
+        data and replaced by new_data, i.e., the downstream results
+        (e.g., separate_unit_data) recomputed only for the inserted and
+        updated facilities.
+
+        Parameters
+        ----------
+        data : pandas.DataFrame
+            Data with registryIDs as index or column.
+
+        changes : dict
+            Change set returned by import_format_frs_incremental.
+
+        new_data : pandas.DataFrame, optional
+            Data of the changed facilities. Defaults to the formatted FRS
+            data of inserted and updated facilities.
+
+        id_col : str; default is 'registryID'
+            Name of the registryID column (or index).
+
+        Returns
+        -------
+        data : pandas.DataFrame
+            Updated data.
+        """
+
+        if new_data is None:
+            new_data = pd.concat(
+                [changes['inserted'], changes['updated']], axis=0
                 )
 
+        changed = changes['inserted'].index.union(
+            changes['updated'].index
+            ).union(changes['deleted'])
+
+        if id_col in data.columns:
+            ids = data[id_col]
+
+        else:
+            ids = data.index.get_level_values(id_col)
+
+        data = pd.concat([data[~ids.isin(changed)], new_data], axis=0)
+
+        return data
+
+    @staticmethod
+    def iter_foundational_json(found_json_file, chunksize=100000):
+        """
+        Stream a json file of foundational energy data, as written by
+        build_frs_json (newline-delimited, one object per REGISTRY_ID).
+
+        Parameters
+        ----------
+        found_json_file : str
+            Path to the gzipped json file.
+
+        chunksize : int; default == 100000
+            Number of facilities per DataFrame.
+
+        Yields
+        ------
+        frs_data : pandas.DataFrame
+            Facility data, indexed by REGISTRY_ID, with one column per
+            variable.
+        """
+
+        def flatten(record):
+            row = {'REGISTRY_ID': record['REGISTRY_ID']}
+            for k, v in record.items():
+                if isinstance(v, dict):
+                    row.update(v)
+            return row
+
+        with gzip.open(found_json_file, mode='rb') as gzfile:
+            rows = []
+
+            for line in gzfile:
+                if not line.strip():
+                    continue
+
+                rows.append(flatten(_loads(line)))
+
+                if len(rows) == chunksize:
+                    yield pd.DataFrame.from_records(rows, index='REGISTRY_ID')
+                    rows = []
+
+            if rows:
+                yield pd.DataFrame.from_records(rows, index='REGISTRY_ID')
+
+    @staticmethod
+    def load_foundational_json(found_json_file, chunksize=100000):
+        """
+        Load json file of foundational energy data.
+
+        Parameters
+        ----------
+        found_json_file : str
+            Path to the gzipped json file written by build_frs_json.
+
+        chunksize : int; default == 100000
+            Number of facilities parsed at a time.
+
+        Returns
+        -------
+        frs_data : pandas.DataFrame
+            Facility data, indexed by REGISTRY_ID.
+        """
+
+        chunks = list(FRS.iter_foundational_json(found_json_file, chunksize))
+
+        if not chunks:
+            return pd.DataFrame()
+
+        return pd.concat(chunks, axis=0)
+
     @staticmethod
     def find_eis(acrnm):
         """
@@ -588,14 +1109,23 @@ class FRS:
 
         return eis
 
-def doit():
+def doit(incremental=False):
     # t_start = time.perf_counter()
     combined = True
 
     frs_methods = FRS()
 
     os.makedirs(Path(Path(__file__).parents[1], 'data/FRS'), exist_ok=True)
-    frs_data_df = frs_methods.import_format_frs(combined=combined)
+
+    if incremental:
+        frs_data_df, _ = frs_methods.import_format_frs_incremental(
+            Path(Path(__file__).parents[1], 'data/FRS/snapshot'),
+            combined=combined
+            )
+
+    else:
+        frs_data_df = frs_methods.import_format_frs(combined=combined)
+
     frs_data_df.to_csv(Path(Path(__file__).parents[1], 'data/FRS/frs_data_formatted.csv'))
 
     # t_stop = time.perf_counter()
@@ -17,7 +17,9 @@ import sys
 from fied.datasets import fetch_ghgrp_records
 from fied.geocoder.geopandas_tools import FiedGIS
 from fied.ghgrp import get_GHGRP_data
+import fied.ghgrp.corrections as ghgrp_corrections
 from fied.ghgrp.ghg_tiers import TierEnergy
+from fied.ghgrp.ghgrp_store import GHGRPStore, table_schema
 
 module_logger = logging.getLogger(__name__)
 
@@ -42,6 +44,46 @@ class GHGRP(FiedGIS, TierEnergy):
                          'FUEL_TYPE', 'FUEL_TYPE_OTHER',
                          'FUEL_TYPE_BLEND']
 
+    # Columns read for each subpart (all columns if not listed), i.e.,
+    # used by format_emissions, calc_energy_* (incl. tier calculations),
+    # and GHGRP_unit_char.
+    table_columns = {
+        'subpartC': tier_data_columns + [
+            'ANNUAL_HEAT_INPUT', 'PART_75_ANNUAL_HEAT_INPUT',
+            'PART_75_CO2_EMISSIONS_METHOD',
+            'TIER1_CO2_COMBUSTION_EMISSIONS',
+            'TIER1_CH4_EMISSIONS_CO2E', 'TIER1_N2O_EMISSIONS_CO2E',
+            'TIER2_CO2_COMBUSTION_EMISSIONS',
+            'TIER2_CH4_EMISSIONS_CO2E', 'TIER2_N2O_EMISSIONS_CO2E',
+            'TIER2_CH4_COMBUSTION_EMISSIONS',
+            'TIER2_N2O_COMBUSTION_EMISSIONS',
+            'TIER3_CO2_COMBUSTION_EMISSIONS',
+            'TIER3_CH4_EMISSIONS_CO2E', 'TIER3_N2O_EMISSIONS_CO2E',
+            'TIER3_EQ_C5_FUEL_QTY', 'TIER3_EQ_C8_HHV_GAS',
+            'T4CH4COMBUSTIONEMISSIONS', 'T4N2OCOMBUSTIONEMISSIONS',
+            'TIER4_CH4_EMISSIONS_CO2E', 'TIER4_N2O_EMISSIONS_CO2E'
+            ],
+        'subpartD': tier_data_columns + [
+            'TOTAL_ANNUAL_HEAT_INPUT', 'N2O_EMISSIONS_CO2E',
+            'CH4_EMISSIONS_CO2E'
+            ],
+        }
+
+    # Types of the columns read, the same for every reporting year (see
+    # GHGRPStore); other columns of the tables are saved as strings.
+    table_schemas = {
+        'C_FUEL_LEVEL_INFORMATION': table_schema(
+            table_columns['subpartC'],
+            integer=['FACILITY_ID', 'REPORTING_YEAR'],
+            text=tier_data_columns[2:] + ['PART_75_CO2_EMISSIONS_METHOD']
+            ),
+        'D_FUEL_LEVEL_INFORMATION': table_schema(
+            table_columns['subpartD'],
+            integer=['FACILITY_ID', 'REPORTING_YEAR'],
+            text=tier_data_columns[2:]
+            ),
+        }
+
     # Set calculation data directories
     file_dir = os.path.abspath('./data/GHGRP')
 
@@ -54,12 +96,9 @@ class GHGRP(FiedGIS, TierEnergy):
     # Set GHGRP data file directory
     ghgrp_file_dir = file_dir
 
-    # List of facilities for correction of combustion emissions from Wood
-    # and Wood Residuals for using Subpart C Tier 4 calculation methodology.
-    wood_facID = pd.read_csv(
-        files("fied.data.GHGRP").joinpath("WoodRes_correction_facilities.csv"),
-        index_col=['FACILITY_ID']
-        )
+    # Corrections of known reporting errors, by subpart, facility,
+    # reporting year, and (optionally) fuel type. See apply_corrections.
+    corrections = ghgrp_corrections.load_corrections()
 
     std_efs = pd.read_csv(
         files("fied.data.GHGRP").joinpath("EPA_FuelEFs.csv"),
@@ -82,7 +121,10 @@ class GHGRP(FiedGIS, TierEnergy):
 
     gis = FiedGIS()
 
-    def __init__(self, years, calc_uncertainty, fix_county_fips):
+    ghgrp_store = GHGRPStore(schemas=table_schemas)
+
+    def __init__(self, years, calc_uncertainty, fix_county_fips,
+                 workers=None):
         """
         
         Parameters
@@ -96,6 +138,10 @@ class GHGRP(FiedGIS, TierEnergy):
         fix_county_fips : bool
             Indicates whether to fill missing county FIPS codes. Significantly increases
             run time. 
+
+        workers : int, optional
+            Number of processes of uncertainty calculations. Defaults to
+            the number of CPUs.
         """
 
         if type(years) == tuple:
@@ -106,7 +152,10 @@ class GHGRP(FiedGIS, TierEnergy):
 
         self.calc_uncertainty = calc_uncertainty
 
-        self.tier_calcs = TierEnergy(years=self.years, std_efs=self.std_efs)
+        self.tier_calcs = TierEnergy(
+            years=self.years, std_efs=self.std_efs,
+            calc_uncert=calc_uncertainty, workers=workers
+            )
 
         self.fix_county_fips = fix_county_fips
 
@@ -139,51 +188,7 @@ class GHGRP(FiedGIS, TierEnergy):
         GHGs.loc[fuel_fix_index, 'FUEL_TYPE_OTHER'] = np.nan
 
         # Fix errors in reported data.
-        if 2014 in self.years:
-            # This facility CH4 combustion emissions off by factor of 1000
-            GHGs.loc[:, 'T4CH4COMBUSTIONEMISSIONS'] = GHGs['T4CH4COMBUSTIONEMISSIONS'].astype(float)
-
-            i1 = GHGs[(GHGs.FACILITY_ID == 1001143) &
-                      (GHGs.REPORTING_YEAR == 2014)].dropna(
-                        subset=['T4CH4COMBUSTIONEMISSIONS']
-                        ).index
-
-            GHGs.loc[i1, 'T4CH4COMBUSTIONEMISSIONS'] = \
-                GHGs.loc[i1, 'T4CH4COMBUSTIONEMISSIONS']/1000
-
-            GHGs.loc[i1, 'ANNUAL_HEAT_INPUT'] = np.nan
-
-            for i in list(GHGs[(GHGs.FACILITY_ID == 1005675) &
-                               (GHGs.REPORTING_YEAR == 2014)].index):
-
-                GHGs.loc[i, 'TIER2_CH4_EMISSIONS_CO2E'] = \
-                    GHGs.loc[i, 'TIER2_CH4_COMBUSTION_EMISSIONS'] * 25.135135
-
-                GHGs.loc[i, 'TIER2_N2O_EMISSIONS_CO2E'] = \
-                    GHGs.loc[i, 'TIER2_N2O_COMBUSTION_EMISSIONS'] * 300
-
-            for i in GHGs[(GHGs.FACILITY_ID == 1001143) & (GHGs.REPORTING_YEAR == 2014)].index:
-
-                for c in ['T4CH4COMBUSTIONEMISSIONS',
-                          'T4N2OCOMBUSTIONEMISSIONS']:
-
-                    GHGs.loc[i, c] = GHGs.loc[i, c]/1000
-
-        if 2012 in self.years:
-
-            selection = GHGs.loc[
-                (GHGs.FACILITY_ID == 1000415) &
-                (GHGs.FUEL_TYPE == 'Bituminous') &
-                (GHGs.REPORTING_YEAR == 2012)
-                ].index
-
-            GHGs.loc[
-                selection,
-                ('T4CH4COMBUSTIONEMISSIONS'):('TIER4_N2O_EMISSIONS_CO2E')
-                ] = GHGs.loc[
-                        selection,
-                        ('T4CH4COMBUSTIONEMISSIONS'):('TIER4_N2O_EMISSIONS_CO2E')
-                        ] / 10
+        GHGs = self.apply_corrections(GHGs, 'subpartC')
 
         total_co2 = pd.DataFrame()
 
@@ -206,6 +211,31 @@ class GHGRP(FiedGIS, TierEnergy):
 
         return GHGs
     
+    def apply_corrections(self, data, subpart):
+        """
+        Apply corrections of known reporting errors (see
+        GHGRP_corrections.csv and fied.ghgrp.corrections) to GHGRP
+        subpart data.
+
+        Parameters
+        ----------
+        data : pandas.DataFrame
+            DataFrame of GHGRP subpart data, with integer FACILITY_ID
+            and REPORTING_YEAR.
+
+        subpart : str
+            Name of GHGRP subpart (e.g., 'subpartC').
+
+        Returns
+        -------
+        data : pandas.DataFrame
+            DataFrame of corrected GHGRP subpart data.
+        """
+
+        return ghgrp_corrections.apply_corrections(
+            data, self.corrections.query("subpart == @subpart")
+            )
+
     def fac_read_fix(self, ffile):
         """
         Reads and formats facility csv file, fixing NAICS codes in 
@@ -346,10 +376,12 @@ class GHGRP(FiedGIS, TierEnergy):
 
         return all_fac
     
-    def download_or_read_ghgrp_file(self, subpart, filename):
+    def download_or_read_ghgrp_file(self, subpart, filename, columns=None):
         """
-        Method for checking for saved file or calling download method
-        for all years in instantiated class.
+        Method for reading GHGRP subpart data from the Parquet store
+        (see GHGRPStore) for all years in instantiated class. Missing
+        years are imported from locally saved .csv files or downloaded,
+        in parallel.
 
         Paramters
         ---------
@@ -358,7 +390,12 @@ class GHGRP(FiedGIS, TierEnergy):
             Name of GHGRP subpart.
 
         filename : str
-            Name of locally saved GHGRP subpart .csv file. 
+            Name of locally saved GHGRP subpart .csv file (legacy),
+            imported into the store if it exists.
+
+        columns : list of str, optional
+            Columns to read. Defaults to table_columns for the subpart,
+            or all columns.
 
         Returns
         -------
@@ -368,38 +405,33 @@ class GHGRP(FiedGIS, TierEnergy):
         """
         self.logger.info(f"Subpart: {subpart}, Filename: {filename}")
 
-        ghgrp_data = pd.DataFrame()
-
         table = self.table_dict[subpart]
 
         self.logger.info(f'Table: {table}')
 
-        for y in self.years:
+        if columns is None:
+            columns = self.table_columns.get(subpart)
 
-            self.logger.info(f'year: {y}; Table: {table}')
+        def loader(table, y):
 
-            filename_y = f'{filename}{y}.csv'
+            filename_y = os.path.join(self.ghgrp_file_dir, f'{filename}{y}.csv')
 
-            if filename_y in os.listdir(os.path.abspath(self.ghgrp_file_dir)):
-                self.logger.debug(f'Reading {filename_y} from local directory')
+            if os.path.exists(filename_y):
+                self.logger.debug(f'Importing {filename_y} from local directory')
 
                 data_y = pd.read_csv(
-                    os.path.abspath(
-                        os.path.join(self.ghgrp_file_dir, filename_y)
-                        ),
-                    encoding='latin_1', low_memory=False,
+                    filename_y, encoding='latin_1', low_memory=False,
                     index_col=0
                     )
 
             else:
-
                 data_y = get_GHGRP_data.get_GHGRP_records(y, table)
-                data_y.to_csv(
-                    os.path.abspath(
-                        os.path.join(self.ghgrp_file_dir, filename_y))
-                    )
 
-            ghgrp_data = ghgrp_data.append(data_y, ignore_index=True)
+            return data_y
+
+        ghgrp_data = self.ghgrp_store.read(
+            table, self.years, columns=columns, loader=loader
+            )
 
         return ghgrp_data
 
@@ -532,38 +564,9 @@ class GHGRP(FiedGIS, TierEnergy):
             inplace=True
             )
 
-        # Correct for revision in 2013 to Table AA-1 emission factors for kraft
-        # pulping liquor emissions. CH4 changed from 7.2g CH4/MMBtu HHV to
-        # 1.9g CH4/MMBtu HHV.
-        energy_subC.loc[:, 'wood_correction'] = \
-            [x in self.wood_facID.index for x in energy_subC.FACILITY_ID] and \
-            [f == 'Wood and Wood Residuals' for f in energy_subC.FUEL_TYPE] and \
-            [x in [2010, 2011, 2012] for x in energy_subC.REPORTING_YEAR]
-
-        energy_subC.loc[(energy_subC.wood_correction == True),
-            'T4CH4COMBUSTIONEMISSIONS'] =\
-            energy_subC.loc[
-                (energy_subC.wood_correction == True),
-                'T4CH4COMBUSTIONEMISSIONS'
-                ].multiply(1.9 / 7.2)
-
-        # Separate, additional correction for facilities appearing to have
-        # continued reporting with previous CH4 emission factor for kraft
-        # liqour combusion (now reported as Wood and Wood Residuals
-        # (dry basis).
-        wood_fac_add = [1001892, 1005123, 1006366, 1004396]
-
-        energy_subC.loc[:, 'wood_correction_add'] = \
-            [x in wood_fac_add for x in energy_subC.FACILITY_ID] and \
-            [y == 2013 for y in energy_subC.REPORTING_YEAR]
-
-        energy_subC.loc[(energy_subC.wood_correction_add == True) &
-            (energy_subC.FUEL_TYPE == 'Wood and Wood Residuals (dry basis)'),
-                'T4CH4COMBUSTIONEMISSIONS'] =\
-                energy_subC.loc[(energy_subC.wood_correction_add == True) &
-                    (energy_subC.FUEL_TYPE == 'Wood and Wood Residuals (dry basis)'),
-                        'T4CH4COMBUSTIONEMISSIONS'].multiply(1.9 / 7.2)
-
+        # Corrections for the revision in 2013 to Table AA-1 emission
+        # factors for kraft pulping liquor are applied in format_emissions
+        # (see GHGRP_corrections.csv).
 
         # New method for calculating energy based on tier methodology
         energy_subC = self.tier_calcs.calc_all_tiers(energy_subC)
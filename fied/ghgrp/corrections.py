@@ -0,0 +1,140 @@
+"""Corrections of known GHGRP reporting errors
+
+Corrections are listed in fied/data/GHGRP/GHGRP_corrections.csv, one
+per row, with the columns:
+
+    subpart : GHGRP subpart (e.g., 'subpartC')
+    facility_id : GHGRP facility ID
+    reporting_year : Reporting year
+    fuel_type : Fuel type (FUEL_TYPE); all fuel types if blank
+    column : Corrected column, or range of columns (e.g., 'A:B')
+    operation : 'derive' (column = source * factor),
+                'multiply' (column = column * factor), or
+                'set_null' (column = NaN)
+    factor : Factor of 'derive' and 'multiply' operations
+    source : Source column of 'derive' operations
+    note : Description of the reporting error
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+from importlib_resources import files
+
+
+module_logger = logging.getLogger(__name__)
+
+
+def load_corrections():
+    """
+    Load the registry of corrections.
+
+    Returns
+    -------
+    corrections : pandas.DataFrame
+        Corrections of GHGRP reporting errors.
+    """
+
+    corrections = pd.read_csv(
+        files("fied.data.GHGRP").joinpath("GHGRP_corrections.csv"),
+        dtype={'facility_id': 'Int64', 'reporting_year': 'Int64',
+               'factor': float}
+        )
+
+    return corrections
+
+
+def apply_corrections(data, corrections):
+    """
+    Apply corrections to GHGRP data.
+
+    Corrections are matched to data by facility, reporting year, and
+    fuel type (if specified) in a single merge per combination of
+    specified keys, and applied to whole columns at once. 'derive'
+    corrections are applied first, then 'multiply' (factors of multiple
+    matching corrections are combined), then 'set_null'.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+        GHGRP data, with integer FACILITY_ID and REPORTING_YEAR, and
+        FUEL_TYPE.
+
+    corrections : pandas.DataFrame
+        Corrections (see load_corrections).
+
+    Returns
+    -------
+    data : pandas.DataFrame
+        Corrected GHGRP data.
+    """
+
+    corrections = corrections.assign(column=[
+        list(data.loc[:, slice(*c.split(':'))].columns) if ':' in c else c
+        for c in corrections.column
+        ]).explode('column')
+
+    corrections = corrections[corrections.column.isin(data.columns)]
+
+    keys = {'facility_id': 'FACILITY_ID',
+            'reporting_year': 'REPORTING_YEAR',
+            'fuel_type': 'FUEL_TYPE'}
+
+    corrections = corrections.rename(columns=keys)
+
+    key_cols = list(keys.values())
+
+    rows = pd.DataFrame(
+        {k: data[k].to_numpy() for k in key_cols}
+        ).rename_axis('row').reset_index()
+
+    matches = [pd.DataFrame(
+        columns=['row', 'column', 'operation', 'factor', 'source']
+        )]
+
+    # Match by the keys specified for each correction
+    for specified, c in corrections.groupby(
+            [corrections[k].notnull() for k in key_cols]
+            ):
+        on = [k for k, s in zip(key_cols, specified) if s]
+
+        matches.append(pd.merge(
+            rows[['row'] + on],
+            c[on + ['column', 'operation', 'factor', 'source']],
+            on=on
+            ))
+
+    matches = pd.concat(
+        matches, axis=0, ignore_index=True
+        ).astype({'row': int, 'factor': float})
+
+    for (column, source), m in matches.query(
+            "operation == 'derive'"
+            ).groupby(['column', 'source']):
+
+        data[column] = data[column].astype(float)
+        data.iloc[m.row.to_numpy(), data.columns.get_loc(column)] = \
+            data[source].iloc[m.row].astype(float).to_numpy() * \
+            m.factor.to_numpy()
+
+    for column, m in matches.query(
+            "operation == 'multiply'"
+            ).groupby('column'):
+
+        factor = m.groupby('row').factor.prod()
+
+        data[column] = data[column].astype(float)
+        data.iloc[factor.index.to_numpy(), data.columns.get_loc(column)] *= \
+            factor.to_numpy()
+
+    for column, m in matches.query(
+            "operation == 'set_null'"
+            ).groupby('column'):
+
+        data[column] = data[column].astype(float)
+        data.iloc[m.row.unique(), data.columns.get_loc(column)] = np.nan
+
+    module_logger.debug(f'Applied {len(matches)} corrections')
+
+    return data
@@ -0,0 +1,179 @@
+"""Monte Carlo propagation of GHGRP energy estimate uncertainty
+
+Energy estimated from reported emissions scales with the heat content
+(HHV) of fuels and inversely with their emission factor (i.e., carbon
+content and, for gases, molecular weight). The uncertainty of these
+inputs is characterized by the spread of the Tier 2 and Tier 3 data
+(see FuelUncertainty.tier_bootstrap) by reporting year and fuel type,
+i.e., of the values reported by single units, not of their mean.
+
+Each input is represented by a lognormal multiplicative factor with a
+mean of 1 and the relative standard deviation of the input. Factors are
+sampled once per (reporting year, fuel type) and Monte Carlo sample, so
+estimates of the same fuel are correlated, and samples are summed by
+unit before percentiles are taken. Units are processed in chunks, in
+parallel, to bound memory.
+"""
+
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+
+module_logger = logging.getLogger(__name__)
+
+
+def relative_uncertainty(**bootstrap):
+    """
+    Combined relative standard deviation of energy estimates by reporting
+    year and fuel type, i.e., the square root of the sum of the squared
+    relative standard deviations of the inputs.
+
+    Parameters
+    ----------
+    **bootstrap : pandas.DataFrame
+        Bootstrap results ('mean' and 'sample_std' by reporting year and
+        fuel type) by input, e.g., hhv=..., cc=..., mw=....
+
+    Returns
+    -------
+    rel_std : pandas.Series
+        Relative standard deviation by reporting year and fuel type.
+    """
+
+    index = pd.MultiIndex.from_tuples(
+        [], names=['REPORTING_YEAR', 'FUEL_TYPE']
+        )
+
+    sq_std = pd.concat(
+        [pd.DataFrame(index=index)] +
+        [(b['sample_std'] / b['mean'])**2 for b in bootstrap.values()],
+        axis=1
+        )
+
+    rel_std = np.sqrt(sq_std.sum(axis=1, min_count=1)).dropna()
+
+    rel_std.index.names = index.names
+    rel_std.name = 'rel_std'
+
+    return rel_std
+
+
+def _chunk_percentiles(energy, key_index, group_start, factors, percentiles):
+    """Percentiles of the summed samples of groups of rows"""
+
+    samples = energy[:, None] * factors[key_index]
+
+    samples = np.add.reduceat(samples, group_start, axis=0)
+
+    return np.percentile(samples, percentiles, axis=1).T
+
+
+def sample_percentiles(energy, rel_std, keys, groups=None,
+                       percentiles=(5, 50, 95), n_samples=1000, seed=0,
+                       chunk_size=50000, workers=1):
+    """
+    Monte Carlo percentiles of energy estimates.
+
+    Parameters
+    ----------
+    energy : array-like
+        Point estimates of energy.
+
+    rel_std : array-like
+        Relative standard deviation of each estimate.
+
+    keys : array-like
+        Input key (e.g., reporting year and fuel type) of each estimate.
+        Estimates with the same key share sampled factors.
+
+    groups : array-like, optional
+        Group (e.g., unit) of each estimate. Samples are summed by group.
+        Each estimate is its own group by default.
+
+    percentiles : tuple of float; default is (5, 50, 95)
+        Percentiles to calculate.
+
+    n_samples : int; default is 1000
+        Number of Monte Carlo samples.
+
+    seed : int; default is 0
+        Seed of the random number generator.
+
+    chunk_size : int; default is 50000
+        Approximate number of estimates sampled at once.
+
+    workers : int; default is 1
+        Number of processes. Chunks are processed in this process if 1.
+
+    Returns
+    -------
+    result : numpy.ndarray
+        Percentiles (groups x percentiles), with groups in sorted order.
+    """
+
+    energy = np.asarray(energy, dtype=np.float64)
+    rel_std = np.asarray(rel_std, dtype=np.float64)
+
+    key_codes, key_index = np.unique(
+        pd.Series(list(keys)).astype(str).to_numpy(), return_inverse=True
+        )
+
+    if groups is None:
+        groups = np.arange(len(energy))
+
+    _, group_index = np.unique(np.asarray(groups), return_inverse=True)
+
+    # Lognormal factors with a mean of 1; the relative standard deviation
+    # of estimates with the same key is the same.
+    key_rel_std = np.zeros(len(key_codes))
+    key_rel_std[key_index] = np.nan_to_num(rel_std)
+
+    sigma = np.sqrt(np.log1p(key_rel_std**2))
+
+    rng = np.random.default_rng(seed)
+
+    factors = np.exp(
+        sigma[:, None] * rng.standard_normal((len(key_codes), n_samples))
+        - sigma[:, None]**2 / 2
+        )
+
+    order = np.argsort(group_index, kind='stable')
+    group_index = group_index[order]
+
+    # Chunks of complete groups
+    group_start = np.flatnonzero(np.r_[True, np.diff(group_index) != 0])
+
+    chunk_start = group_start[
+        np.unique(np.searchsorted(
+            group_start, np.arange(0, len(order), chunk_size), side='right'
+            ) - 1)
+        ]
+
+    chunk_end = np.r_[chunk_start[1:], len(order)]
+
+    args = [
+        (energy[order[s:e]], key_index[order[s:e]],
+         group_start[(group_start >= s) & (group_start < e)] - s,
+         factors, percentiles) for s, e in zip(chunk_start, chunk_end)
+        ]
+
+    if workers == 1:
+        results = [_chunk_percentiles(*a) for a in args]
+
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_chunk_percentiles, *zip(*args)))
+
+    if not results:
+        return np.empty((0, len(percentiles)))
+
+    return np.concatenate(results, axis=0)
+
+
+def percentile_columns(energy_col, percentiles):
+    """Names of percentile columns, e.g., energyMJp5"""
+
+    return [f'{energy_col}p{p:g}' for p in percentiles]
@@ -10,7 +10,15 @@ import pandas as pd
 import os
 import numpy as np
 
+from fied.datasets import fetch_ghgrp_records
 import fied.ghgrp.heat_rate_uncertainty as hr_uncert
+from fied.ghgrp.ghgrp_store import GHGRPStore, table_schema
+
+
+def _fetch_tier_records(table, year):
+    """Download tier 2 or tier 3 records of a table for a reporting year"""
+    return fetch_ghgrp_records(year=year, table=table).to_pandas()
+
 
 class TierEnergy:
     """
@@ -19,7 +27,34 @@ class TierEnergy:
     """
     logger = logging.getLogger(f"{__name__}.TierEnergy")
 
-    def __init__(self, years=None, std_efs=None, calc_uncert=False):
+    # Types of the numeric columns of tier 2 and tier 3 tables, the same
+    # for every reporting year; other columns are saved as strings.
+    tier_schemas = {
+        t: table_schema(
+            ['FACILITY_ID', 'REPORTING_YEAR'] + c,
+            integer=['FACILITY_ID', 'REPORTING_YEAR']
+            )
+        for t, c in [
+            ('C_T2EQC2AMONTHLYINPUTS', ['FUEL_COMBUSTED', 'HIGH_HEAT_VALUE']),
+            ('C_T2EQC2CMONTHLYINPUTS', ['MASS_OF_STEAM', 'BOILER_RATIO_B']),
+            ('C_T3EQC3C8MONTHLYINPUTS', ['FUEL_COMBUSTED', 'CARBON_CONTENT']),
+            ('C_T3EQC4C8MONTHLYINPUTS', ['FUEL_COMBUSTED', 'CARBON_CONTENT']),
+            ('C_T3EQC5C8MONTHLYINPUTS',
+             ['FUEL_COMBUSTED', 'CARBON_CONTENT', 'MOLECULAR_WEIGHT']),
+            ]
+        }
+
+    # Tier 2 and tier 3 tables are saved in the GHGRP store
+    tier_store = GHGRPStore(schemas=tier_schemas)
+
+    # Annual weighted averages by (tier table, reporting year)
+    _tier_wa_cache = {}
+
+    # Subpart C columns of fuel types, in the order they are matched
+    fuel_type_cats = ['FUEL_TYPE', 'FUEL_TYPE_OTHER', 'FUEL_TYPE_BLEND']
+
+    def __init__(self, years=None, std_efs=None, calc_uncert=False,
+                 workers=None):
 
         # EPA standard emission factors by fuel type
         if std_efs is None:
@@ -47,185 +82,231 @@ class TierEnergy:
         self.years = years
         self.calc_uncert = calc_uncert
 
-        def calc_wa(data, weighting_column, weighted_column):
-            """
-            Method for calculating annual weighted average of monthly
-            reported values for high heat, molecular weight,
-            and carbon content.
-            """
+        # Processes of the bootstrap (see FuelUncertainty.tier_bootstrap)
+        self.workers = workers
 
-            if 'molecular_weight' in data.columns:
-                data.molecular_weight = data.molecular_weight.astype(float)
+        # Bootstrap results by input (e.g., 'hhv') if calc_uncert
+        self.tier_uncertainty = {}
 
-            # Some data being return from API as strings
-            for c in [weighted_column, weighting_column]:
+        self.t2hhv_data_annual = self.tier_table_wa('t2_hhv')
+        self.t2boiler_data_annual = self.tier_table_wa('t2_boiler')
+        self.t3_data_annual = self.tier_table_wa('t3')
 
-                data.loc[:, c] = data[c].astype(float)
+    @staticmethod
+    def calc_wa(data, weighting_column, weighted_column):
+        """
+        Method for calculating annual weighted average of monthly
+        reported values for high heat, molecular weight,
+        and carbon content, as sum(w * x) / sum(w) of monthly means.
+
+        Parameters
+        ----------
+        data : pandas.DataFrame
+            Tier 2 or Tier 3 data (see load_tier_data).
+
+        weighting_column : str
+            Column of weights (e.g., 'fuel_combusted').
+
+        weighted_column : str
+            Column of weighted values (e.g., 'high_heat_value').
+
+        Returns
+        -------
+        data_annual : pandas.DataFrame
+            Annual energy (energy_mmbtu), fuel combusted, and weighted
+            average (e.g., 'high_heat_value_wa') by facility, reporting
+            year, fuel type, and unit.
+        """
 
-            # Correct HHV values that appear to be off by an order of
-            # magnitude for natural gas
-            if weighted_column == 'high_heat_value':
-                hhv_correct = data[
-                    (data.fuel_type == 'Natural Gas (Weighted U.S. Average)') &
-                    (data[weighted_column].between(0, 0.00019,
-                                                    inclusive=False))
-                    ][weighted_column]*10
+        keys = ['facility_id', 'reporting_year', 'fuel_type', 'unit_name']
 
-                if not hhv_correct.empty:
-                    data[weighted_column].update(hhv_correct)
+        w, x = weighting_column, weighted_column
 
-            data['energy_mmbtu'] = \
-                data[weighting_column].dropna().multiply(
-                        data[weighted_column].dropna()
-                        )
+        data = data.astype({w: float, x: float})
 
-            if weighting_column == 'mass_of_steam':
+        # Correct HHV values that appear to be off by an order of
+        # magnitude for natural gas
+        if x == 'high_heat_value':
+            hhv_correct = (
+                data.fuel_type == 'Natural Gas (Weighted U.S. Average)'
+                ) & data[x].between(0, 0.00019, inclusive='neither')
 
-                data_annual = pd.DataFrame(data.groupby(
-                    ['facility_id', 'reporting_year', 'fuel_type',
-                        'unit_name']
-                    )['energy_mmbtu'].sum())
+            data.loc[hhv_correct, x] = data.loc[hhv_correct, x] * 10
 
-            else:
+        data['energy_mmbtu'] = data[w] * data[x]
 
-                data_annual = pd.DataFrame(data.groupby(
-                        ['facility_id', 'reporting_year', 'fuel_type',
-                            'unit_name']
-                        )['energy_mmbtu', 'fuel_combusted'].sum())
+        if w == 'mass_of_steam':
+            sum_columns = ['energy_mmbtu']
 
-            # Some months have more than one entry. Take the mean of
-            # these values
-            tier_wa = data[data[weighting_column] > 0].groupby(
-                    ['facility_id', 'reporting_year', 'fuel_type',
-                        'unit_name', 'month']
-                    )[weighting_column, weighted_column].mean()
+        else:
+            sum_columns = ['energy_mmbtu', 'fuel_combusted']
 
-            tier_wa = tier_wa[weighted_column].multiply(
-                    tier_wa[weighting_column]
-                    ).sum(level=(0, 1, 2, 3)).divide(
-                        tier_wa[weighting_column].sum(level=(0, 1, 2, 3))
-                        )
+        data_annual = data.groupby(keys)[sum_columns].sum()
 
-            data_annual[weighted_column+'_wa'] = tier_wa
-
-            data_annual.index.names = \
-                [x.upper() for x in data_annual.index.names]
-
-            return data_annual
-
-        def tier_table_wa(tier_table):
-            """
-            Format and calculate weighted average for data reported in
-            tier 2 and tier 3 data tables.
-            Tables are 't2_hhv' and 't3'
-            """
-
-            filedir = os.path.abspath('./data/GHGRP/')
-
-            #Check first if data have been downloaded already
-            dl_tables = {'t2_hhv': ['t2_hhv'],
-                         't2_boiler': ['t2_boiler'],
-                         't3': ['t3_solid', 't3_gas', 't3_liquid']}
-
-            tier_data = pd.DataFrame()
-
-            for file in dl_tables[tier_table]:
-
-                for y in self.years:
-
-                    # Reporting began in 2014, therefore no data for 2010-2013
-                    if y > 2013:
-                        file_y = f'{file}_{y}.csv'
-
-                        if file_y in os.listdir(filedir):
-                            df = pd.read_csv(os.path.join(filedir, file_y))
-                            df.columns = \
-                                [x.lower() for x in df.columns]
-                            tier_data = tier_data.append(df, ignore_index=True,
-                                                         sort=True)
-
-                        else:
-                            self.logger.info(
-                                f"No data file for '{file_y}'."
-                                " Downloading from EPA API"
-                            )
-                            tier_data = \
-                                hr_uncert.FuelUncertainty(
-                                    years=y
-                                    ).dl_tier(tier_table)
-                            self.logger.info(f'DL filepath: {os.path.join(filedir, file_y)}')
-                            tier_data.to_csv(
-                                os.path.join(filedir, file_y)
-                                )
-
-                            if '.' in tier_data.columns[0]:
-                                tier_data.columns = \
-                                    [x.split('.')[1].lower() for x in tier_data.columns]
-
-                            else:
-                                tier_data.columns = \
-                                    [x.lower() for x in tier_data.columns]
-
-                    else:
-                        continue
-
-            if not tier_data.empty:
-
-                for c in ['reporting_year', 'facility_id']:
-                    tier_data.dropna(subset=[c], axis=0, inplace=True)
-                    tier_data.loc[:, c] = tier_data[c].astype(int)
-
-                if 'unnamed: 0' in tier_data.columns:
-                    tier_data.drop('unnamed: 0', axis=1, inplace=True)
-
-                if tier_table == 't2_hhv':
-
-                    tier_data_annual = calc_wa(tier_data, 'fuel_combusted',
-                                               'high_heat_value')
-                    
-                    # Includes a cludge for years (e.g., 2016) where facilities have reported incorrect 
-                    # units in t2_hhv tables. Filter value is based on HHV 
-                    # per mass or volume, which should not exceed 40 based on EPA standard
-                    # emissions factors (see "Emission Factors for Greenhouse Gas Inventories";
-                    # max as of 2024 version is 38 MMBtu/short ton for plastics)
-                    tier_data_annual = tier_data_annual[tier_data_annual.high_heat_value_wa < 40]
-
-                    if self.calc_uncert:
-                        hr_uncert.FuelUncertainty.tier_bootstrap(
-                                tier_data, 'high_heat_value', 'hhv'
-                                )
-
-                if tier_table == 't2_boiler':
-                    tier_data_annual = calc_wa(tier_data, 'mass_of_steam',
-                                               'boiler_ratio_b')
-
-                    if self.calc_uncert:
-                        hr_uncert.FuelUncertainty.tier_bootstrap(
-                                tier_data, 'boiler_ratio_b', 'br'
-                                )
-
-                if tier_table == 't3':
-                    tier_data_annual = pd.concat(
-                        [calc_wa(tier_data, 'fuel_combusted',
-                                 'carbon_content'),
-                         calc_wa(tier_data, 'fuel_combusted',
-                                 'molecular_weight')['molecular_weight_wa']],
-                        axis=1
-                        )
+        # Some months have more than one entry. Take the mean of
+        # these values
+        tier_wa = data[data[w] > 0].groupby(keys + ['month'])[[w, x]].mean()
+
+        tier_wa['wx'] = tier_wa[w] * tier_wa[x]
+
+        tier_wa = tier_wa.groupby(level=keys)[['wx', w]].sum()
+
+        data_annual[x + '_wa'] = tier_wa.wx / tier_wa[w]
+
+        data_annual.index.names = [k.upper() for k in keys]
+
+        return data_annual
+
+    def load_tier_data(self, tier_table, years):
+        """
+        Load tier 2 or tier 3 data (see FuelUncertainty.tier_tables) for
+        reporting years from the GHGRP store, downloading missing years.
+
+        Parameters
+        ----------
+        tier_table : str; {'t2_hhv', 't2_boiler', 't3'}
+            Tier table.
+
+        years : list of int
+            Reporting years.
+
+        Returns
+        -------
+        tier_data : pandas.DataFrame
+            Tier data, with lower case columns.
+        """
+
+        tier_data = pd.concat(
+            [self.tier_store.read(t, years, loader=_fetch_tier_records)
+             for t in hr_uncert.FuelUncertainty.tier_tables[tier_table]],
+            axis=0, ignore_index=True
+            )
+
+        tier_data.columns = [c.split('.')[-1].lower() for c in tier_data.columns]
+
+        tier_data = tier_data.dropna(subset=['reporting_year', 'facility_id'])
+
+        tier_data = tier_data.astype(
+            {'reporting_year': int, 'facility_id': int}
+            )
+
+        tier_data = tier_data.drop(columns=['unnamed: 0'], errors='ignore')
+
+        tier_data = hr_uncert.FuelUncertainty.format_tier(tier_data, tier_table)
+
+        return tier_data
+
+    def calc_tier_annual(self, tier_table, tier_data):
+        """
+        Annual weighted averages of a tier table.
+
+        Parameters
+        ----------
+        tier_table : str; {'t2_hhv', 't2_boiler', 't3'}
+            Tier table.
+
+        tier_data : pandas.DataFrame
+            Tier data (see load_tier_data).
 
-                    if self.calc_uncert:
-                        hr_uncert.FuelUncertainty.tier_bootstrap(
-                                tier_data, 'carbon_content', 'cc'
-                                )
-                        hr_uncert.FuelUncertainty.tier_bootstrap(
-                                tier_data, 'molecular_weight', 'mw'
-                                )
+        Returns
+        -------
+        tier_data_annual : pandas.DataFrame
+            Annual weighted averages (see calc_wa).
+        """
+
+        if tier_table == 't2_hhv':
+
+            tier_data_annual = self.calc_wa(tier_data, 'fuel_combusted',
+                                            'high_heat_value')
+
+            # Includes a cludge for years (e.g., 2016) where facilities have reported incorrect
+            # units in t2_hhv tables. Filter value is based on HHV
+            # per mass or volume, which should not exceed 40 based on EPA standard
+            # emissions factors (see "Emission Factors for Greenhouse Gas Inventories";
+            # max as of 2024 version is 38 MMBtu/short ton for plastics)
+            tier_data_annual = tier_data_annual[tier_data_annual.high_heat_value_wa < 40]
+
+        if tier_table == 't2_boiler':
+            tier_data_annual = self.calc_wa(tier_data, 'mass_of_steam',
+                                            'boiler_ratio_b')
+
+        if tier_table == 't3':
+
+            if 'molecular_weight' not in tier_data.columns:
+                tier_data = tier_data.assign(molecular_weight=np.nan)
+
+            tier_data_annual = pd.concat(
+                [self.calc_wa(tier_data, 'fuel_combusted', 'carbon_content'),
+                 self.calc_wa(tier_data, 'fuel_combusted',
+                              'molecular_weight')['molecular_weight_wa']],
+                axis=1
+                )
+
+        return tier_data_annual
+
+    def tier_table_wa(self, tier_table):
+        """
+        Format and calculate weighted average for data reported in
+        tier 2 and tier 3 data tables, for the years of the instance.
+        Annual weighted averages are cached by reporting year.
+        Tables are 't2_hhv', 't2_boiler', and 't3'
+        """
+
+        filedir = os.path.abspath('./data/GHGRP/')
+
+        # Reporting began in 2014, therefore no data for 2010-2013
+        years = [y for y in self.years if y > 2013]
+
+        if not years:
+            return pd.DataFrame()
 
-            return tier_data_annual
+        missing = [y for y in years if (tier_table, y) not in self._tier_wa_cache]
 
-        self.t2hhv_data_annual = tier_table_wa('t2_hhv')
-        self.t2boiler_data_annual = tier_table_wa('t2_boiler')
-        self.t3_data_annual = tier_table_wa('t3')
+        if self.calc_uncert:
+            tier_data = self.load_tier_data(tier_table, years)
+
+        elif missing:
+            tier_data = self.load_tier_data(tier_table, missing)
+
+        if missing:
+            tier_data_annual = self.calc_tier_annual(
+                tier_table, tier_data[tier_data.reporting_year.isin(missing)]
+                )
+
+            reporting_year = \
+                tier_data_annual.index.get_level_values('REPORTING_YEAR')
+
+            for y in missing:
+                self._tier_wa_cache[(tier_table, y)] = \
+                    tier_data_annual[reporting_year == y]
+
+        tier_data_annual = pd.concat(
+            [self._tier_wa_cache[(tier_table, y)] for y in years], axis=0
+            )
+
+        if self.calc_uncert:
+
+            # Bootstrap results are saved by range of years
+            years_label = f'{min(self.years)}-{max(self.years)}'
+
+            bootstrap_columns = {
+                't2_hhv': {'hhv': 'high_heat_value'},
+                't2_boiler': {'br': 'boiler_ratio_b'},
+                't3': {'cc': 'carbon_content', 'mw': 'molecular_weight'}
+                }
+
+            for k, c in bootstrap_columns[tier_table].items():
+
+                if c not in tier_data.columns:
+                    continue
+
+                self.tier_uncertainty[k] = \
+                    hr_uncert.FuelUncertainty.tier_bootstrap(
+                        tier_data.astype({c: float}), c, f'{k}_{years_label}',
+                        workers=self.workers, uncert_dir=filedir
+                        )
+
+        return tier_data_annual
 
     def filter_data(self, subpart_c_df, tier_column):
         """
@@ -315,7 +396,40 @@ class TierEnergy:
 #
 #            print('Error. Energy check results not saved')
 
-    def tier1_calc(self, subpart_c_df):
+    @classmethod
+    def melt_fuel_types(cls, subpart_c_df):
+        """
+        Reshape subpart C data once into long form, with a row for each
+        fuel type category (fuel_category; FUEL_TYPE, FUEL_TYPE_OTHER, or
+        FUEL_TYPE_BLEND) and fuel type (fuel) reported for a record. The
+        row column is the index of the record in subpart_c_df, which must
+        be unique.
+        """
+
+        fuels = subpart_c_df[cls.fuel_type_cats].melt(
+            var_name='fuel_category', value_name='fuel', ignore_index=False
+            )
+
+        fuels = fuels.dropna(subset=['fuel']).rename_axis('row').reset_index()
+
+        return fuels
+
+    def fuel_type_data(self, ghg_data, fuels):
+        """
+        Join tier data with their fuel type categories and fuel types
+        (see melt_fuel_types). Records with several categories are
+        repeated, in the order of the categories.
+        """
+
+        df = ghg_data.join(fuels.set_index('row'), how='inner')
+
+        df['fuel_category'] = pd.Categorical(
+            df.fuel_category, categories=self.fuel_type_cats
+            )
+
+        return df.sort_values('fuel_category', kind='stable')
+
+    def tier1_calc(self, subpart_c_df, fuels=None):
         """
         Estimate energy use for facilities reporting emissions using the
         Tier 1 methodology.
@@ -324,32 +438,29 @@ class TierEnergy:
 
         tier_column = 'TIER1_CO2_COMBUSTION_EMISSIONS'
 
-        ghg_data = self.filter_data(subpart_c_df, tier_column)
-
-        energy = pd.DataFrame()
-
-        for ftc in ['FUEL_TYPE', 'FUEL_TYPE_OTHER', 'FUEL_TYPE_BLEND']:
+        if fuels is None:
+            fuels = self.melt_fuel_types(subpart_c_df)
 
-            df = pd.merge(ghg_data,
-                          pd.DataFrame(
-                                  self.std_efs.loc[:, 'CO2_kgCO2_per_mmBtu']
-                                  ), left_on=ftc, right_index=True,
-                          how='inner')
+        ghg_data = self.filter_data(subpart_c_df, tier_column)
 
-            # Issue: There are some cases where df[tier_columm] is an object,
-            # despite be all valid numbers. Why that? That can be fixed by
-            # calling .astype('float') on the column, but why that happens?
-            df['energy_mmbtu'] = df[tier_column].astype('float').multiply(1000).divide(
-                    df['CO2_kgCO2_per_mmBtu']
-                    )
+        df = self.fuel_type_data(ghg_data, fuels).join(
+            self.std_efs['CO2_kgCO2_per_mmBtu'], on='fuel', how='inner'
+            )
 
-            energy = energy.append(df, sort=True)
+        # Issue: There are some cases where df[tier_columm] is an object,
+        # despite be all valid numbers. Why that? That can be fixed by
+        # calling .astype('float') on the column, but why that happens?
+        df['energy_mmbtu'] = df[tier_column].astype('float').multiply(1000).divide(
+                df['CO2_kgCO2_per_mmBtu']
+                )
 
-        energy.drop(['CO2_kgCO2_per_mmBtu'], axis=1, inplace=True)
+        energy = df.drop(
+            ['fuel_category', 'fuel', 'CO2_kgCO2_per_mmBtu'], axis=1
+            )
 
         return energy
 
-    def tier2_calc(self, subpart_c_df):
+    def tier2_calc(self, subpart_c_df, fuels=None):
         """
         Calculate energy use for facilities reporting emissions using the
         Tier 2 methodology. There are facilities that report Tier 2 emissions
@@ -363,128 +474,89 @@ class TierEnergy:
 
         tier_column = 'TIER2_CO2_COMBUSTION_EMISSIONS'
 
-        ghg_data = self.filter_data(subpart_c_df, tier_column)
-
-        energy = pd.DataFrame()
+        if fuels is None:
+            fuels = self.melt_fuel_types(subpart_c_df)
 
+        ghg_data = self.filter_data(subpart_c_df, tier_column)
 
         t2_data_combined = pd.concat(
-                [self.t2boiler_data_annual, 
+                [self.t2boiler_data_annual,
                  self.t2hhv_data_annual],
                 ignore_index=False, sort=True
                 )
 
-        fuel_type_cats = ['FUEL_TYPE', 'FUEL_TYPE_OTHER', 'FUEL_TYPE_BLEND']
-
-        for ft in fuel_type_cats:
-
-            df = pd.DataFrame(ghg_data.dropna(subset=[ft], axis=0))
-
-            if df.empty:
-                continue
-
-            else:
-                if ft != 'FUEL_TYPE':
-
-                    df.drop(set(fuel_type_cats).difference({ft}), axis=1,
-                            inplace=True)
-
-                    df.rename(columns={ft: 'FUEL_TYPE'}, inplace=True)
-
-                df.set_index(['FACILITY_ID', 'REPORTING_YEAR', 'FUEL_TYPE',
-                              'UNIT_NAME'], inplace=True)
-
-                # Some facilities reporting Tier 2 emissions may be missing
-                # from the tier 2 hhv table.
-                # Appy standard emission factors for
-                # these facilities to estimate energy use.
-                if t2_data_combined.empty:
-
-                    df.reset_index(inplace=True)
-
-                    df = pd.merge(df, self.std_efs.reset_index(),
-                                on='FUEL_TYPE', how='left')
-                    
-                    df.loc[:, 'energy_mmbtu'] = df.TIER2_CO2_COMBUSTION_EMISSIONS.divide(
-                        df.CO2_kgCO2_per_mmBtu/1000
-                        )
-
-                else:
-                    
-                    df = pd.merge(df, t2_data_combined.dropna(
-                            subset=['energy_mmbtu']
-                            )[['energy_mmbtu']], left_index=True,
-                            right_index=True, how='left')
+        df = self.fuel_type_data(ghg_data, fuels)
 
-                    df.reset_index(inplace=True)
+        # Fuel types of other categories are matched as FUEL_TYPE
+        df['FUEL_TYPE'] = df.fuel
 
-                    df = pd.merge(df, self.std_efs.reset_index(),
-                                on='FUEL_TYPE', how='left')
+        df.loc[df.fuel_category != 'FUEL_TYPE',
+               ['FUEL_TYPE_OTHER', 'FUEL_TYPE_BLEND']] = np.nan
 
-                    # Issue: For unknown reason, tier_column is type object,
-                    # thus the sum turns int a contatenation of strings, such as
-                    # 0.2186.876.70.324.226.713.40.00.20.40.019.846 ...
-                    df[tier_column] = df[tier_column].astype('float')
+        # Issue: For unknown reason, tier_column is type object,
+        # thus the sum turns int a contatenation of strings, such as
+        # 0.2186.876.70.324.226.713.40.00.20.40.019.846 ...
+        df[tier_column] = df[tier_column].astype('float')
 
-                    df_no_mmbtu = pd.DataFrame(df[df.energy_mmbtu.isnull()])
+        df = df.join(self.std_efs['CO2_kgCO2_per_mmBtu'], on='FUEL_TYPE')
 
-                    # Calculate emission factors by facility, fuel, and year,
-                    # and apply for facilities missing data in hhv table.
-                    # Tier 2 data weren't reported prior to 2014. Use
-                    # a simple annual average of the emission factors for 2014 onwards
-                    # for remaining facilities.
+        # Some facilities reporting Tier 2 emissions may be missing
+        # from the tier 2 hhv table.
+        # Appy standard emission factors for
+        # these facilities to estimate energy use.
+        if t2_data_combined.empty:
 
-                    custom_efs = {}
-
-                    custom_efs['by_fac'] = df[df.energy_mmbtu.notnull()].groupby(
-                        ['FACILITY_ID', 'REPORTING_YEAR', 'FUEL_TYPE']
-                        )[tier_column].sum().divide(
-                            df[df.energy_mmbtu.notnull()].groupby(
-                                ['FACILITY_ID', 'REPORTING_YEAR', 'FUEL_TYPE']
-                                ).energy_mmbtu.sum()
-                            ).multiply(1000)
-
-                    custom_efs['all'] = \
-                        df[(df.energy_mmbtu.notnull())].groupby(
-                        ['REPORTING_YEAR', 'FUEL_TYPE']
-                        )[tier_column].sum().divide(
-                            df[df.energy_mmbtu.notnull()].groupby(
-                                ['REPORTING_YEAR', 'FUEL_TYPE']
-                                ).energy_mmbtu.sum()
-                            ).multiply(1000)
+            df['energy_mmbtu'] = df[tier_column].divide(
+                df.CO2_kgCO2_per_mmBtu/1000
+                )
 
-                    # Update EPA default emission factors with custom emission
-                    # factors calculated from Tier 2 data.
-                    for k in ['all', 'by_fac']:
-                        custom_efs[k].name = 'CO2_kgCO2_per_mmBtu'
+        else:
 
-                        df_no_mmbtu.set_index(custom_efs[k].index.names,
-                                            inplace=True)
+            df = df.join(
+                t2_data_combined.dropna(subset=['energy_mmbtu'])[
+                    ['energy_mmbtu']
+                    ],
+                on=['FACILITY_ID', 'REPORTING_YEAR', 'FUEL_TYPE', 'UNIT_NAME']
+                )
 
-                        df_no_mmbtu.CO2_kgCO2_per_mmBtu.update(custom_efs[k])
+            # Calculate emission factors by facility, fuel, and year,
+            # and apply for facilities missing data in hhv table.
+            # Tier 2 data weren't reported prior to 2014. Use
+            # a simple annual average of the emission factors for 2014 onwards
+            # for remaining facilities. Emission factors by facility
+            # replace annual averages, which replace EPA default emission
+            # factors.
+            efs = df.CO2_kgCO2_per_mmBtu
 
-                        df_no_mmbtu.reset_index(inplace=True)
+            reported = df[df.energy_mmbtu.notnull()]
 
-                    energy_update = df_no_mmbtu[tier_column].divide(
-                            df_no_mmbtu.CO2_kgCO2_per_mmBtu
-                            )*1000
+            for keys in [['REPORTING_YEAR', 'FUEL_TYPE'],
+                         ['FACILITY_ID', 'REPORTING_YEAR', 'FUEL_TYPE']]:
 
-                    energy_update.name = 'energy_mmbtu'
+                keys = ['fuel_category'] + keys
 
-                    df_no_mmbtu.energy_mmbtu.update(energy_update)
+                custom = reported.groupby(keys, observed=True)[
+                    [tier_column, 'energy_mmbtu']
+                    ].sum()
 
-                    df.dropna(subset=['energy_mmbtu'], axis=0, inplace=True)
+                custom = custom[tier_column].divide(
+                    custom.energy_mmbtu
+                    ).multiply(1000)
 
-                    df = df.append(df_no_mmbtu, sort=True)
+                efs = df.join(custom.rename('custom_ef'), on=keys)\
+                    .custom_ef.fillna(efs)
 
-                df.drop(['CO2_kgCO2_per_mmBtu', 'CH4_gCH4_per_mmBtu'],
-                        axis=1, inplace=True)
+            df['energy_mmbtu'] = df.energy_mmbtu.fillna(
+                df[tier_column].divide(efs)*1000
+                )
 
-            energy = energy.append(df, ignore_index=True, sort=True)
+        energy = df.drop(
+            ['fuel_category', 'fuel', 'CO2_kgCO2_per_mmBtu'], axis=1
+            ).reset_index(drop=True)
 
         return energy
 
-    def tier3_calc(self, subpart_c_df):
+    def tier3_calc(self, subpart_c_df, fuels=None):
 
         """
         Emissions reported using the Tier 3 methodology rely on measurements
@@ -497,6 +569,9 @@ class TierEnergy:
 
         tier_column = 'TIER3_CO2_COMBUSTION_EMISSIONS'
 
+        if fuels is None:
+            fuels = self.melt_fuel_types(subpart_c_df)
+
         ghg_data = self.filter_data(subpart_c_df, tier_column)
         # Issue: For unknonwn reason, tier_column and TIER3_EQ_C5_FUEL_QTY are
         # type object, thus given unexpected result for sum operations.
@@ -504,7 +579,9 @@ class TierEnergy:
         ghg_data["TIER3_EQ_C5_FUEL_QTY"] = ghg_data["TIER3_EQ_C5_FUEL_QTY"].astype(float)
         ghg_data["TIER3_EQ_C8_HHV_GAS"] = ghg_data["TIER3_EQ_C8_HHV_GAS"].astype(float)
 
-        energy = pd.DataFrame()
+        energy_columns = ['FACILITY_ID', 'REPORTING_YEAR', 'UNIT_NAME',
+                          tier_column, 'UNIT_TYPE', 'energy_mmbtu',
+                          'MTCO2e_TOTAL'] + self.fuel_type_cats
 
         # Calculated annual hhv (mass or volumne per mmbtu) by fuel.
         # Note that reporting for these measurements began in 2014.
@@ -519,7 +596,7 @@ class TierEnergy:
                 )
 
             self.logger.info(f'hhv_average columns: {hhv_average.columns}')
-    
+
             hhv_average = hhv_average.groupby(['FUEL_TYPE']).high_heat_value_wa.mean()
 
             # Calculate energy value of combusted fuels
@@ -540,73 +617,48 @@ class TierEnergy:
             t3_mmbtu.set_index(['FACILITY_ID', 'REPORTING_YEAR', 'FUEL_TYPE',
                                'UNIT_NAME'], inplace=True)
 
-            ghg_data.set_index(['FACILITY_ID', 'REPORTING_YEAR', 'FUEL_TYPE',
-                                'UNIT_NAME'], inplace=True)
-
-            ghg_data = ghg_data.join(t3_mmbtu[['energy_mmbtu']])
-
-            ghg_data.reset_index(inplace=True)
-
-            energy = energy.append(
-                    ghg_data[ghg_data.energy_mmbtu.notnull()].copy(deep=True),
-                    ignore_index=True)
+            # Joined on columns to keep the index of records (see
+            # melt_fuel_types)
+            ghg_data = ghg_data.join(
+                t3_mmbtu[['energy_mmbtu']],
+                on=['FACILITY_ID', 'REPORTING_YEAR', 'FUEL_TYPE', 'UNIT_NAME']
+                )
 
         else:
             ghg_data.loc[:, 'energy_mmbtu'] = np.nan
 
-        # Match fuel types for remaining data
-        fuel_type_cats = ['FUEL_TYPE', 'FUEL_TYPE_OTHER', 'FUEL_TYPE_BLEND']
-
-        for ft in fuel_type_cats:
-            df_by_ef = pd.DataFrame(
-                    ghg_data[ghg_data.energy_mmbtu.isnull()].dropna(
-                            subset=[ft], axis=0
-                            )
-                    )
-
-            if df_by_ef.empty:
-                continue
+        energy_hhv = ghg_data[ghg_data.energy_mmbtu.notnull()]
 
-            else:
-                df_by_ef = df_by_ef.set_index(ft).join(
-                        self.std_efs['CO2_kgCO2_per_mmBtu']
-                        )
-                df_by_ef['energy_mmbtu'] = df_by_ef[tier_column].divide(
-                        df_by_ef['CO2_kgCO2_per_mmBtu']
-                        )*1000
-
-                df_by_ef.reset_index(inplace=True)
-                df_by_ef.rename(columns={'index': ft}, inplace=True)
-
-                # Need to account for facilities that report volume and HHV
-                # of blast furnace gas.
-                # Entries in subpart C table began only in 2016
-                if (ft == 'FUEL_TYPE'):
-                    try:
-                        fuel_qty = \
-                            df_by_ef.dropna(subset=['TIER3_EQ_C5_FUEL_QTY'])
+        # Match fuel types for remaining data
+        df_by_ef = self.fuel_type_data(
+            ghg_data[ghg_data.energy_mmbtu.isnull()], fuels
+            ).join(self.std_efs['CO2_kgCO2_per_mmBtu'], on='fuel')
 
-                        fuel_qty.energy_mmbtu = \
-                            fuel_qty.TIER3_EQ_C5_FUEL_QTY.multiply(
-                                fuel_qty.TIER3_EQ_C8_HHV_GAS
-                                )
+        df_by_ef['energy_mmbtu'] = df_by_ef[tier_column].divide(
+                df_by_ef['CO2_kgCO2_per_mmBtu']
+                )*1000
 
-                        df_by_ef.energy_mmbtu.update(fuel_qty.energy_mmbtu)
+        # Need to account for facilities that report volume and HHV
+        # of blast furnace gas.
+        # Entries in subpart C table began only in 2016
+        fuel_qty = df_by_ef.TIER3_EQ_C5_FUEL_QTY.multiply(
+            df_by_ef.TIER3_EQ_C8_HHV_GAS
+            ).where(df_by_ef.fuel_category == 'FUEL_TYPE')
 
-                    except KeyError:
-                        print('No Tier 3 reporting of gas HHV')
+        df_by_ef['energy_mmbtu'] = fuel_qty.fillna(df_by_ef.energy_mmbtu)
 
-                energy = energy.append(
-                    df_by_ef[['FACILITY_ID', 'REPORTING_YEAR', ft, 'UNIT_NAME',
-                              tier_column, 'UNIT_TYPE', 'energy_mmbtu',
-                              'MTCO2e_TOTAL']], ignore_index=True, sort=True
-                    )
+        # Only the matched fuel type category is kept
+        for ft in self.fuel_type_cats:
+            df_by_ef[ft] = df_by_ef.fuel.where(df_by_ef.fuel_category == ft)
 
-        energy.sort_index(inplace=True)
+        energy = pd.concat(
+            [energy_hhv, df_by_ef[energy_columns]], axis=0,
+            ignore_index=True, sort=True
+            )
 
         return energy
 
-    def tier4_calc(self, subpart_c_df):
+    def tier4_calc(self, subpart_c_df, fuels=None):
         """
         Annual heat input and fuel quantity are not consistently reported
         by facilities using the Tier 4 approach. As a result, energy values
@@ -619,9 +671,10 @@ class TierEnergy:
         #CH4 emissions in metric tons
         tier_column = 'T4CH4COMBUSTIONEMISSIONS'
 
-        ghg_data = self.filter_data(subpart_c_df, tier_column)
+        if fuels is None:
+            fuels = self.melt_fuel_types(subpart_c_df)
 
-        energy = pd.DataFrame()
+        ghg_data = self.filter_data(subpart_c_df, tier_column)
 
         reported_energy = pd.DataFrame(
                 ghg_data[ghg_data.ANNUAL_HEAT_INPUT.notnull()]
@@ -630,43 +683,45 @@ class TierEnergy:
         reported_energy.rename(columns={'ANNUAL_HEAT_INPUT': 'energy_mmbtu'},
                                inplace=True)
 
-        for ftc in ['FUEL_TYPE', 'FUEL_TYPE_OTHER', 'FUEL_TYPE_BLEND']:
-
-            df = pd.merge(
-                    ghg_data[~ghg_data.index.isin(reported_energy.index)],
-                          pd.DataFrame(
-                                  self.std_efs.loc[:, 'CH4_gCH4_per_mmBtu']
-                                  ), left_on=ftc, right_index=True,
-                          how='inner'
-                    )
-
-            # multiply by 10**6 because emission factor in grams and not
-            # kilograms
-            # Issue: For unknown reason, tier_column is type object,
-            # thus given unexpected result for sum operations. Temporary
-            # fix is to convert it to float.
-            df['energy_mmbtu'] = df[tier_column].astype('float').multiply(10**6).divide(
-                    df['CH4_gCH4_per_mmBtu']
-                    )
-
-            energy = energy.append(df, sort=True)
+        df = self.fuel_type_data(
+            ghg_data[ghg_data.ANNUAL_HEAT_INPUT.isnull()], fuels
+            ).join(
+                self.std_efs['CH4_gCH4_per_mmBtu'], on='fuel', how='inner'
+                )
 
-        energy.drop(['CH4_gCH4_per_mmBtu'], axis=1, inplace=True)
+        # multiply by 10**6 because emission factor in grams and not
+        # kilograms
+        # Issue: For unknown reason, tier_column is type object,
+        # thus given unexpected result for sum operations. Temporary
+        # fix is to convert it to float.
+        df['energy_mmbtu'] = df[tier_column].astype('float').multiply(10**6).divide(
+                df['CH4_gCH4_per_mmBtu']
+                )
 
-        energy = energy.append(reported_energy, sort=True)
+        energy = pd.concat(
+            [df.drop(['fuel_category', 'fuel', 'CH4_gCH4_per_mmBtu'], axis=1),
+             reported_energy], axis=0, sort=True
+            )
 
         return energy
 
     def calc_all_tiers(self, subpart_c_df):
         """
         Assemble all the calculations and their results into a single
-        dataframe.
+        dataframe. Fuel types of subpart C data are reshaped once for all
+        tiers (see melt_fuel_types).
         """
         self.logger.debug("Calculating all tiers")
 
+        subpart_c_df = subpart_c_df.reset_index(drop=True)
+
+        fuels = self.melt_fuel_types(subpart_c_df)
+
         energy = pd.concat(
-            [self.tier1_calc(subpart_c_df), self.tier2_calc(subpart_c_df),
-             self.tier3_calc(subpart_c_df), self.tier4_calc(subpart_c_df)],
+            [self.tier1_calc(subpart_c_df, fuels),
+             self.tier2_calc(subpart_c_df, fuels),
+             self.tier3_calc(subpart_c_df, fuels),
+             self.tier4_calc(subpart_c_df, fuels)],
              axis=0, ignore_index=True
              )
 
@@ -1,20 +1,50 @@
 
 import logging
-from pathlib import Path
+import re
 
 import pandas as pd
 import os
-import yaml
 import json
-from pyxlsb import open_workbook
 
 from fied import datasets
+from fied.ghgrp import energy_uncertainty
+from fied.tools import fuel_types
+from fied.utils import save_debug_artifact
 
 module_logger = logging.getLogger(__name__)
 
 class GHGRP_unit_char():
     logger = logging.getLogger(f"{__name__}.GHGRP_unit_char")
 
+    # Unit types searched in the names of OCS units (lower case)
+    _ocs_types = [
+        'furnace', 'kiln', 'dryer', 'heater',
+        'oven', 'calciner', 'stove', 'htr', 'furn',
+        'cupola', 'boiler', 'turbine', 'building heat', 'space heater',
+        'engine', 'compressor', 'pump', 'rice', 'generator',
+        'hot water', 'crane', 'water heater',
+        'comfort heater', 'RTO', 'TODF', 'oxidizer', 'RCO'
+        ]
+
+    _ocs_synonyms = {
+        'furn': 'furnace', 'htr': 'heater',
+        'hot water': 'water heater',
+        'rice': 'engine', 'comfort heater': 'space heater'
+        }
+
+    # Order of preference for unit names that match multiple types
+    _ocs_priority = [
+        'boiler', 'furnace', 'kiln', 'calciner', 'dryer', 'stove',
+        'space heater', 'water heater', 'turbine', 'generator',
+        'engine', 'cupola', 'compressor', 'pump', 'building heat',
+        'oxidizer'
+        ]
+
+    # Percentiles of energy estimates from Monte Carlo samples, for
+    # energy data with uncertainty (ENERGY_REL_STD; see run_GHGRP.main)
+    energy_percentiles = (5, 50, 95)
+    n_samples = 1000
+
     def __init__(self, ghgrp_energy_file, reporting_year):
         self.logger.debug(
             "Initializing GHGRP_unit_char class with "
@@ -42,21 +72,12 @@ class GHGRP_unit_char():
             generic fuel types that have been applied to NEI data.
         """
 
-        with open(Path(__file__).parents[1] / 'tools' / 'type_standardization.yml', 'r') as file:
-            docs = yaml.safe_load_all(file)
-
-            for i, d in enumerate(docs):
-                if i == 0:
-                    fuel_dict = d
-                else:
-                    continue
-
-        return fuel_dict
+        return fuel_types.load_fueltype_dict()
 
-    # #TODO make into a tools method
     def harmonize_fuel_type(self, ghgrp_unit_data, fuel_type_column):
         """
         Applies fuel type mapping to fuel types reported under GHGRP.
+        See fied.tools.fuel_types.harmonize_fuel_type.
 
         Parameters
         ----------
@@ -71,17 +92,7 @@ class GHGRP_unit_char():
 
         """
 
-        fuel_dict = self.load_fueltype_dict()
-
-        ghgrp_unit_data.loc[:, 'fuelTypeStd'] = ghgrp_unit_data[fuel_type_column].map(fuel_dict)
-
-        # drop any fuelTypes that are null
-        ghgrp_unit_data = ghgrp_unit_data.where(
-            ghgrp_unit_data[fuel_type_column] != 'None'
-            ).dropna(how='all')
-
-        return ghgrp_unit_data
-
+        return fuel_types.harmonize_fuel_type(ghgrp_unit_data, fuel_type_column)
 
     # TODO fix up code for getting capacity data
     def get_unit_capacity(self, ghgrp_df):
@@ -102,61 +113,18 @@ class GHGRP_unit_char():
             unit name.
 
         """
-        unit_data_file_path = datasets.fetch_emission()
-
-        # engine='pyxlsb' not working with python 3.6.5.final.0 and pandas 0.24.2
-        # XLRDError: Excel 2007 xlsb file; not supported
-        try:
-            ghgrp_ind = pd.read_excel(
-                unit_data_file_path,
-                engine='pyxlsb', sheet_name='UNIT_DATA',
-                skiprows=6
-                )
-            
-        except XLRDError as e:
-            self.logger.error(f"{e}")
-
-        else:
-
-            df = []
-            with open_workbook(unit_data_file_path) as wb:
-                with wb.get_sheet('UNIT_DATA') as sheet:
-                    for row in sheet.rows():
-                        df.append([item.v for item in row])
-
-            # Make sure to catch column row (first few rows of spreadsheet has
-            # values only in first column)
-            n = 0
-            while all(df[n]) is False:
-                n+=1
-
-            ghgrp_ind = pd.DataFrame(df[n+1:], columns=df[n])
-
-
-        ghgrp_ind.columns = [x.strip() for x in ghgrp_ind.columns]
-
-        ghgrp_ind.update(
-            ghgrp_ind['Primary NAICS Code'].astype(int),
-            overwrite=True
-            )
-
-        # Industrial facilities aleady selected in FRS data.
-        ghgrp_ind = ghgrp_ind.where(
-            ghgrp_ind['Reporting Year'].isin(ghgrp_df.REPORTING_YEAR)
-            ).dropna(how='all')
-
-        ghgrp_ind.update(
-            ghgrp_ind['Unit Maximum Rated Heat Input (mmBTU/hr)'].replace(
-                {'': None}
-                )
+        ghgrp_ind = datasets.fetch_ghgrp_unit_data(
+            years=ghgrp_df.REPORTING_YEAR.dropna().unique(),
+            columns=[
+                'Reporting Year', 'Facility Id',
+                'Unit Maximum Rated Heat Input (mmBTU/hr)', 'Unit Name',
+                'FRS Id'
+                ]
             )
 
         ghgrp_df = pd.merge(
             ghgrp_df,
-            ghgrp_ind[[
-                'Reporting Year', 'Facility Id',
-                'Unit Maximum Rated Heat Input (mmBTU/hr)', 'Unit Name',
-                'FRS Id']],
+            ghgrp_ind,
             left_on=['REPORTING_YEAR', 'FACILITY_ID', 'UNIT_NAME'],
             right_on=['Reporting Year', 'Facility Id', 'Unit Name'],
             how='left', indicator=True
@@ -198,7 +166,7 @@ class GHGRP_unit_char():
         # Harmonize fuel types for GHGRP data
         ghgrp_df = self.harmonize_fuel_type(ghgrp_df, 'FUEL_TYPE_FINAL')
 
-        ghgrp_df.to_csv('ghgrp_emissions.csv')
+        save_debug_artifact(ghgrp_df, 'ghgrp_emissions')
 
         # Aggregate. Units may combust multiple types of 
         # fuels and have multiple observations (estimates)
@@ -206,29 +174,30 @@ class GHGRP_unit_char():
         # NOTE that the GHG emissions total here when summed to
         # unit type may not match the GHG emissions by unit type 
         # found in the GHGRP unit data xlsb file.
-        ghgrp_df = ghgrp_df.groupby(
-            ['FACILITY_ID', 'FRS_REGISTRY_ID', 'REPORTING_YEAR',
-             'FUEL_TYPE_FINAL', 'fuelTypeStd', 'UNIT_NAME',
-             'UNIT_TYPE', 'MAX_CAP_MMBTU_per_HOUR'], as_index=False
-             )[['TJ_TOTAL', 'MTCO2e_TOTAL']].sum()
+        group_cols = ['FACILITY_ID', 'FRS_REGISTRY_ID', 'REPORTING_YEAR',
+                      'FUEL_TYPE_FINAL', 'fuelTypeStd', 'UNIT_NAME',
+                      'UNIT_TYPE', 'MAX_CAP_MMBTU_per_HOUR']
 
-        ghgrp_df.loc[:, "energyMJ"] = ghgrp_df.TJ_TOTAL * 10**6
+        if 'ENERGY_REL_STD' in ghgrp_df.columns:
+            energy_pctl = self.calc_energy_percentiles(ghgrp_df, group_cols)
 
-        ghgrp_df.loc[:, 'designCapacity'] = None
+        else:
+            energy_pctl = None
 
-        for item in ghgrp_df.MAX_CAP_MMBTU_per_HOUR.iteritems():
+        ghgrp_df = ghgrp_df.groupby(
+            group_cols, as_index=False
+            )[['TJ_TOTAL', 'MTCO2e_TOTAL']].sum()
 
-            try:
-                ghgrp_df.loc[item[0], 'designCapacity'] = item[1]*0.2931  # Convert to MW
+        ghgrp_df.loc[:, "energyMJ"] = ghgrp_df.TJ_TOTAL * 10**6
 
-            except TypeError:
-                ghgrp_df.loc[item[0], 'designCapacity'] = None
+        if energy_pctl is not None:
+            ghgrp_df[energy_pctl.columns] = energy_pctl.values
 
-            else:
-                continue
+        # Convert to MW; missing or non-numeric capacities are NaN
+        ghgrp_df.loc[:, 'designCapacity'] = pd.to_numeric(
+            ghgrp_df.MAX_CAP_MMBTU_per_HOUR, errors='coerce'
+            ) * 0.2931
 
-        # ghgrp_df.loc[:, 'designCapacity'] = \
-        #     ghgrp_df.MAX_CAP_MMBTU_per_HOUR * 0.2931  # Convert to MW
         ghgrp_df = pd.concat(
             [ghgrp_df, pd.Series('MW', index=ghgrp_df.index, name='designCapacityUOM')],
             axis=1, ignore_index=False
@@ -250,6 +219,118 @@ class GHGRP_unit_char():
 
         return ghgrp_df
 
+    def calc_energy_percentiles(self, ghgrp_df, group_cols):
+        """
+        Monte Carlo percentiles of energy use (MJ) by group of GHGRP
+        energy estimates, based on their relative standard deviation
+        (ENERGY_REL_STD). See fied.ghgrp.energy_uncertainty.
+
+        Parameters
+        ----------
+        ghgrp_df : pandas.DataFrame
+            GHGRP energy estimates.
+
+        group_cols : list of str
+            Columns by which estimates are aggregated.
+
+        Returns
+        -------
+        energy_pctl : pandas.DataFrame
+            Percentiles (e.g., energyMJp50) by group, in sorted order.
+        """
+
+        groups = ghgrp_df.groupby(group_cols).ngroup()
+
+        data = ghgrp_df[groups >= 0]
+
+        energy_pctl = pd.DataFrame(
+            energy_uncertainty.sample_percentiles(
+                data.TJ_TOTAL.fillna(0) * 10**6, data.ENERGY_REL_STD,
+                keys=pd.MultiIndex.from_frame(
+                    data[['REPORTING_YEAR', 'FUEL_TYPE']]
+                    ),
+                groups=groups[groups >= 0],
+                percentiles=self.energy_percentiles,
+                n_samples=self.n_samples, workers=os.cpu_count()
+                ),
+            columns=energy_uncertainty.percentile_columns(
+                'energyMJ', self.energy_percentiles
+                )
+            )
+
+        return energy_pctl
+
+    @classmethod
+    def identify_unit_type(cls, unit_names):
+        """
+        Identify unit types from unit names, e.g., for units
+        labelled as OCS (Other combustion source).
+
+        Each unique (lower case) name is searched once for all unit
+        types with a single compiled expression. Names with a single
+        match take that type (or its synonym); names with multiple
+        matches take the first type of _ocs_priority they contain.
+        Not perfect, as approach assigns "boiler" to units that are
+        aggregations, e.g., "GP-1 Boilers / Afterburners".
+
+        Parameters
+        ----------
+        unit_names : pandas.Series
+            Unit names.
+
+        Returns
+        -------
+        unit_types : pandas.Series
+            Identified unit types, with the same index as unit_names.
+            Null where no type is identified.
+        """
+
+        # Types can overlap (e.g., 'heater' in 'water heater') so types
+        # are matched at every position with a lookahead. The longest
+        # type starting at a position is captured, and all types that
+        # are its prefixes (e.g., 'furn' for 'furnace') also match.
+        types = sorted(cls._ocs_types, key=len, reverse=True)
+        type_regex = re.compile(
+            '(?=(' + '|'.join(re.escape(t) for t in types) + '))'
+            )
+        prefixes = {
+            t: [p for p in types if t.startswith(p)] for t in types
+            }
+
+        def resolve(name):
+            found = {p for m in type_regex.findall(name) for p in prefixes[m]}
+
+            if not found:
+                return None
+
+            if len(found) == 1:
+                t = found.pop()
+                return cls._ocs_synonyms.get(t, t)
+
+            for t in cls._ocs_priority:
+                if t in found:
+                    return t
+
+            # Multiple matches only through synonyms (e.g., 'comfort heater')
+            found = {cls._ocs_synonyms.get(t, t) for t in found}
+
+            if len(found) == 1:
+                return found.pop()
+
+            for t in cls._ocs_priority:
+                if t in found:
+                    return t
+
+            return None
+
+        names = unit_names.str.lower()
+
+        unit_types = names.map(
+            {n: resolve(n) for n in names.dropna().unique()}
+            )
+
+        return unit_types
+
     def get_unit_type(self):
         """
         Use unit name to deterimine unit type for
@@ -268,95 +349,18 @@ class GHGRP_unit_char():
 
         ghgrp_df = pd.read_parquet(filename)
 
-        types = [
-            'furnace', 'kiln', 'dryer', 'heater',
-            'oven', 'calciner', 'stove', 'htr', 'furn',
-            'cupola', 'boiler', 'turbine', 'building heat', 'space heater',
-            'engine', 'compressor', 'pump', 'rice', 'generator',
-            'hot water', 'crane', 'water heater',
-            'comfort heater', 'RTO', 'TODF', 'oxidizer', 'RCO'
-            ]
-
         ocs_units = ghgrp_df.query(
             "UNIT_TYPE == 'OCS (Other combustion source)'"
             ).UNIT_NAME
 
-        ocs_units = ocs_units.str.lower()
-
         self.logger.info(
             f'There are {len(ocs_units)} units '
             f'or {len(ocs_units)/len(ghgrp_df):.1%} labelled as OCS'
             )
 
-        # Assume boilers will be the most typical combustion unit type
-        # pd.Series.str.find returns -1 where a string is not found
-        # Not perfect, as approach assigns "boiler" to units that are 
-        # aggregations, e.g., "GP-1 Boilers / Afterburners"
-        named_units = pd.concat(
-            [pd.Series(ocs_units.str.find(t), name=t) for t in types],
-            axis=1, ignore_index=False
-            )
-
-        # Matched will show as NaN
-        named_units = named_units.where(named_units == -1)
-
-        for c in named_units.columns:
-            named_units[c].fillna(c, inplace=True)
-
-        named_units.replace(
-            {
-                'furn': 'furnace', 'htr': 'heater',
-                'hot water': 'water heater',
-                'rice': 'engine', 'comfort heater': 'space heater'
-            }, inplace=True
-            )
-
-        named_units = named_units.where(named_units != -1)
-        named_units = named_units.apply(lambda x: x.dropna(), axis=0)
+        ocs_units = self.identify_unit_type(ocs_units).dropna()
 
-        sing_types = named_units.count(axis=1)
-        sing_types = sing_types.where(sing_types == 1).dropna()
-        sing_types = pd.DataFrame(
-            named_units.loc[sing_types.index, :]
-            )
-
-        mult_types = named_units.count(axis=1)
-        mult_types = mult_types.where(mult_types > 1).dropna()
-        mult_types = pd.DataFrame(
-            named_units.loc[mult_types.index, :]
-            )
-        mult_types['unit_type_iden'] = False
-
-        ocs_units = pd.concat(
-            [ocs_units,
-             pd.Series(index=ocs_units.index, name='unit_type_iden')],
-            axis=1
-            )
-
-        # TODO why isn't sing_types.apply(lambda x: x.dropna()), result_type='reduce')
-        # returning a series? Should be a faster approach than this loop
-        for i in sing_types.index:
-            ocs_units.loc[i, 'unit_type_iden'] = \
-                sing_types.loc[i, :].dropna().values[0]
-
-        for t in ['boiler', 'furnace', 'kiln', 'calciner', 'dryer', 'stove',
-                  'space heater', 'water heater', 'turbine', 'generator',
-                  'engine', 'cupola', 'compressor', 'pump', 'building heat',
-                  'space heater', 'oxidizer']:
-
-            mult_types.unit_type_iden.update(
-                mult_types[t]
-                )
-
-            ocs_units.unit_type_iden.update(
-                mult_types.unit_type_iden
-                )
-
-            mult_types = mult_types.where(
-                mult_types.unit_type_iden != t
-                ).dropna(subset=['unit_type_iden'])
-
-        ghgrp_df.UNIT_TYPE.update(ocs_units.unit_type_iden)
+        ghgrp_df.loc[ocs_units.index, 'UNIT_TYPE'] = ocs_units
 
         return ghgrp_df
 
@@ -366,10 +370,9 @@ class GHGRP_unit_char():
         ghgrp_df = self.get_unit_capacity(ghgrp_df)
         ghgrp_df = self.format_ghgrp_df(ghgrp_df)
 
-        ghgrp_df.to_csv(
-            os.path.join(self._data_dir,
-                         self._ghgrp_energy_file.split('.')[0]
-                         )+'_unittype_final.csv'
+        save_debug_artifact(
+            ghgrp_df,
+            self._ghgrp_energy_file.split('.')[0] + '_unittype_final'
             )
 
         return ghgrp_df
@@ -0,0 +1,364 @@
+"""Typed, partitioned Parquet store of GHGRP tables
+
+GHGRP tables are downloaded from the EPA Envirofacts API one reporting
+year at a time (see get_GHGRP_data). Each (table, year) is saved once
+as a typed Parquet file, partitioned as::
+
+    {path}/{table}/year={year}/part-0.parquet
+
+with a manifest (manifest.json) that records, for each partition, the
+number of rows, the column types, and when it was created. Columns of
+tables with a schema (see table_schema) have the same types in every
+year. Reads of multi-year ranges (including the download of missing
+years) run in parallel, and only the requested columns are loaded.
+"""
+
+import contextlib
+import datetime as dt
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import pooch
+import pyarrow.parquet as pq
+
+from fied.ghgrp import get_GHGRP_data
+
+
+module_logger = logging.getLogger(__name__)
+
+
+def download_records(table, year):
+    """Download GHGRP records of a table for a reporting year"""
+    return get_GHGRP_data.get_GHGRP_records(year, table)
+
+
+def table_schema(columns, integer=(), text=()):
+    """
+    Schema of a GHGRP table, as the type of each column.
+
+    Parameters
+    ----------
+    columns : list of str
+        Columns of the table.
+
+    integer : list of str, optional
+        Integer columns (e.g., FACILITY_ID), saved as 'Int64'.
+
+    text : list of str, optional
+        Text columns, saved as 'string'. Other columns are 'float64'.
+
+    Returns
+    -------
+    schema : dict
+        Type by column.
+    """
+
+    return {
+        c: "Int64" if c in integer else "string" if c in text else "float64"
+        for c in columns
+        }
+
+
+class GHGRPStore:
+    """
+    Parquet store of GHGRP tables, partitioned by table and year.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path, optional
+        Root directory of the store. Defaults to the FIED cache.
+
+    workers : int; default is 4
+        Number of years read (or downloaded) in parallel.
+
+    schemas : dict, optional
+        Schema (see table_schema) by table name. Columns of a table with
+        a schema are typed from it, whatever the year; types of tables
+        without a schema are inferred from each year's records.
+    """
+    logger = logging.getLogger(f"{__name__}.GHGRPStore")
+
+    def __init__(self, path=None, workers=4, schemas=None):
+
+        if path is None:
+            path = Path(pooch.os_cache("FIED")) / "GHGRP" / "store"
+
+        self.path = Path(path)
+        self.workers = workers
+        self.schemas = {} if schemas is None else schemas
+        self._manifest_file = self.path / "manifest.json"
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def _manifest_lock(self, timeout=60):
+        """
+        Lock of the manifest across threads and processes (e.g., years
+        processed in parallel), as an exclusively created lock file. Locks
+        older than timeout seconds are considered stale.
+        """
+
+        lockfile = self.path / "manifest.lock"
+
+        with self._lock:
+
+            while True:
+                try:
+                    fd = os.open(
+                        lockfile, os.O_CREAT | os.O_EXCL | os.O_WRONLY
+                        )
+                    break
+
+                except FileExistsError:
+                    try:
+                        if time.time() - os.path.getmtime(lockfile) > timeout:
+                            os.remove(lockfile)
+
+                    except FileNotFoundError:
+                        pass
+
+                    time.sleep(0.05)
+
+            try:
+                yield
+
+            finally:
+                os.close(fd)
+                os.remove(lockfile)
+
+    def load_manifest(self):
+        """
+        Manifest of the store.
+
+        Returns
+        -------
+        manifest : dict
+            Partition information ('file', 'rows', 'columns',
+            'created') by table and year (str).
+        """
+
+        try:
+            with open(self._manifest_file, "r") as f:
+                return json.load(f)
+
+        except FileNotFoundError:
+            return {}
+
+    def _partition_file(self, table, year):
+        return Path(table) / f"year={year}" / "part-0.parquet"
+
+    def has(self, table, year):
+        """Check if a (table, year) partition is in the store"""
+
+        entry = self.load_manifest().get(table, {}).get(str(year))
+
+        return (entry is not None) and (self.path / entry["file"]).exists()
+
+    def _outdated(self, table, year):
+        """
+        Check if the column types of a stored partition differ from the
+        schema of its table (e.g., partitions saved before the schema
+        was set).
+        """
+
+        schema = self.schemas.get(table)
+
+        if schema is None:
+            return False
+
+        columns = self.load_manifest()[table][str(year)]["columns"]
+
+        return any(columns.get(c) != t for c, t in schema.items())
+
+    @staticmethod
+    def type_records(data, schema=None):
+        """
+        Assign types to GHGRP records.
+
+        With a schema, columns of the schema are converted to its types
+        (values that are not numbers are null in numeric columns) and
+        added as nulls if missing; other columns are strings. Without a
+        schema, object columns with only numeric values (e.g., numbers
+        read as text) are converted to numbers; other object columns
+        are strings.
+
+        Parameters
+        ----------
+        data : pandas.DataFrame
+            GHGRP records.
+
+        schema : dict, optional
+            Type by column (see table_schema).
+
+        Returns
+        -------
+        data : pandas.DataFrame
+            Typed GHGRP records.
+        """
+
+        data = data.reset_index(drop=True)
+
+        if schema is not None:
+            data = data.reindex(
+                columns=list(data.columns) +
+                [c for c in schema if c not in data.columns]
+                )
+
+            for c in data.columns:
+
+                if schema.get(c, "string") == "string":
+                    data[c] = data[c].where(
+                        data[c].isnull(), data[c].astype(str)
+                        ).astype("string")
+
+                else:
+                    data[c] = pd.to_numeric(
+                        data[c], errors="coerce"
+                        ).astype(schema[c])
+
+            return data
+
+        for c in data.select_dtypes(include=["object", "string"]).columns:
+
+            numeric = pd.to_numeric(data[c], errors="coerce")
+
+            if numeric.notnull().sum() == data[c].notnull().sum():
+                data[c] = numeric
+
+            else:
+                data[c] = data[c].where(
+                    data[c].isnull(), data[c].astype(str)
+                    ).astype("string")
+
+        return data
+
+    def write(self, table, year, data):
+        """
+        Save the records of a table for a reporting year.
+
+        Parameters
+        ----------
+        table : str
+            GHGRP table name.
+
+        year : int
+            Reporting year.
+
+        data : pandas.DataFrame
+            GHGRP records.
+        """
+
+        data = self.type_records(data, self.schemas.get(table))
+
+        file = self._partition_file(table, year)
+        filename = self.path / file
+        filename.parent.mkdir(parents=True, exist_ok=True)
+
+        tmpname = filename.with_suffix(f".{os.getpid()}.part")
+        data.to_parquet(tmpname, index=False)
+        tmpname.replace(filename)
+
+        with self._manifest_lock():
+            manifest = self.load_manifest()
+
+            manifest.setdefault(table, {})[str(year)] = {
+                "file": file.as_posix(),
+                "rows": len(data),
+                "columns": {c: str(t) for c, t in data.dtypes.items()},
+                "created": dt.datetime.now().isoformat(timespec="seconds"),
+                }
+
+            tmpname = self._manifest_file.with_suffix(".part")
+            with open(tmpname, "w") as f:
+                json.dump(manifest, f, indent=2, sort_keys=True)
+            tmpname.replace(self._manifest_file)
+
+        self.logger.debug(f"Saved {table} {year} to {filename}")
+
+    def read_year(self, table, year, columns=None, loader=download_records):
+        """
+        Read the records of a table for a reporting year, loading and
+        saving them first if they are not in the store.
+
+        Parameters
+        ----------
+        table : str
+            GHGRP table name.
+
+        year : int
+            Reporting year.
+
+        columns : list of str, optional
+            Columns to read. Columns missing from the table are ignored.
+            All columns by default.
+
+        loader : callable; default is download_records
+            Function of (table, year) returning the records as a
+            pandas.DataFrame, for partitions not in the store.
+
+        Returns
+        -------
+        data : pandas.DataFrame
+            GHGRP records.
+        """
+
+        filename = self.path / self._partition_file(table, year)
+
+        if not self.has(table, year):
+            self.logger.info(f"Loading {table} for {year}")
+            self.write(table, year, loader(table, year))
+
+        elif self._outdated(table, year):
+            self.logger.info(f"Typing {table} for {year} from its schema")
+            self.write(table, year, pd.read_parquet(filename))
+
+        if columns is not None:
+            # Keep the order of the table; some formatting relies on it
+            columns = [
+                c for c in pq.read_schema(filename).names if c in columns
+                ]
+
+        return pd.read_parquet(filename, columns=columns)
+
+    def read(self, table, years, columns=None, loader=download_records):
+        """
+        Read the records of a table for several reporting years.
+
+        Years are read (and loaded, if needed) in parallel.
+
+        Parameters
+        ----------
+        table : str
+            GHGRP table name.
+
+        years : iterable of int
+            Reporting years.
+
+        columns : list of str, optional
+            Columns to read. All columns by default.
+
+        loader : callable; default is download_records
+            Function of (table, year) returning the records as a
+            pandas.DataFrame, for partitions not in the store.
+
+        Returns
+        -------
+        data : pandas.DataFrame
+            GHGRP records of all years.
+        """
+
+        years = list(years)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            data = list(executor.map(
+                lambda y: self.read_year(table, y, columns, loader), years
+                ))
+
+        data = pd.concat(data, axis=0, ignore_index=True)
+
+        return data
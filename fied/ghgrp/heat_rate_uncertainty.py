@@ -5,11 +5,11 @@ Created on Wed Dec  5 21:50:55 2018
 @author: cmcmilla
 """
 
+from concurrent.futures import ProcessPoolExecutor
 from importlib_resources import files
 import pandas as pd
 import os
 import numpy as np
-from sklearn.utils import resample
 
 from fied.datasets import fetch_ghgrp_records
 from fied.ghgrp.get_GHGRP_data import get_GHGRP_records
@@ -58,13 +58,13 @@ class FuelUncertainty:
 
     """
 
-    def __init__(self, agr=None, years=None, std_efs=None):
+    tier_tables = {'t2_hhv': ['C_T2EQC2AMONTHLYINPUTS'],
+                   't2_boiler': ['C_T2EQC2CMONTHLYINPUTS'],
+                   't3': ['C_T3EQC3C8MONTHLYINPUTS',
+                          'C_T3EQC4C8MONTHLYINPUTS',
+                          'C_T3EQC5C8MONTHLYINPUTS']}
 
-        self.tier_tables = {'t2_hhv': ['C_T2EQC2AMONTHLYINPUTS'],
-                            't2_boiler': ['C_T2EQC2CMONTHLYINPUTS'],
-                            't3': ['C_T3EQC3C8MONTHLYINPUTS',
-                                   'C_T3EQC4C8MONTHLYINPUTS',
-                                   'C_T3EQC5C8MONTHLYINPUTS']}
+    def __init__(self, agr=None, years=None, std_efs=None):
 
         self.ef_file_path = files("fied.data.GHGRP").joinpath("EPA_FuelEFs.csv")
 
@@ -99,17 +99,36 @@ class FuelUncertainty:
 
         """
 
-        tier_df = pd.DataFrame()
+        tier_df = pd.concat(
+            [fetch_ghgrp_records(year=y, table=t).to_pandas()
+             for t in self.tier_tables[tier] for y in self.years],
+            axis=0, ignore_index=True, sort=True
+            )
 
-        for t in self.tier_tables[tier]:
+        tier_df.columns = [x.lower() for x in tier_df.columns]
 
-            for y in self.years:
+        tier_df = self.format_tier(tier_df, tier)
 
-                df = fetch_ghgrp_records(year=y, table=t).to_pandas()
+        return tier_df
 
-                tier_df = tier_df.append(df, sort=True, ignore_index=True)
+    @staticmethod
+    def format_tier(tier_df, tier):
+        """
+        Fix known issues of reported tier data.
 
-        tier_df.columns = [x.lower() for x in tier_df.columns]
+        Parameters
+        ----------
+        tier_df : pandas.DataFrame
+            Tier data, with lower case columns.
+
+        tier : str; {'t2_hhv', 't2_boiler', 't3'}
+            Tier table.
+
+        Returns
+        -------
+        tier_df : pandas.DataFrame
+            Formatted tier data.
+        """
 
         # Fix issues with natural gas HHV reporting
         # Other fuel HHVs were exammined manually. There's a wide range for
@@ -119,28 +138,21 @@ class FuelUncertainty:
             tier_df['high_heat_value'] = \
                 tier_df.high_heat_value.astype('float32')
 
-            natgas_st_index = tier_df[
-                (tier_df.fuel_type == 'Natural Gas (Weighted U.S. Average)') &
-                (tier_df.high_heat_value_uom == 'mmBtu/short ton')
-                ].index
+            natgas = tier_df.fuel_type == 'Natural Gas (Weighted U.S. Average)'
 
-            tier_df.loc[natgas_st_index, 'high_heat_value_uom'] = 'mmBtu/scf'
+            tier_df.loc[
+                natgas & (tier_df.high_heat_value_uom == 'mmBtu/short ton'),
+                'high_heat_value_uom'
+                ] = 'mmBtu/scf'
 
-            m_index = tier_df[
-                (tier_df.fuel_type == 'Natural Gas (Weighted U.S. Average)') &
-                (tier_df.high_heat_value.between(1, 1.2))
-                ].index
+            m_index = natgas & tier_df.high_heat_value.between(1, 1.2)
 
-            tier_df.high_heat_value.update(
-                    tier_df.loc[m_index, 'high_heat_value'].divide(1000)
-                    )
+            tier_df.loc[m_index, 'high_heat_value'] = \
+                tier_df.loc[m_index, 'high_heat_value'] / 1000
 
-            drop_index = tier_df[
-                (tier_df.fuel_type == 'Natural Gas (Weighted U.S. Average)') &
-                (tier_df.high_heat_value.between(0.0012, 0.0014))
-                ].index
+            drop_index = natgas & tier_df.high_heat_value.between(0.0012, 0.0014)
 
-            tier_df = tier_df[~tier_df.index.isin(drop_index)]
+            tier_df = tier_df[~drop_index]
 
         return tier_df
 
@@ -207,19 +219,57 @@ class FuelUncertainty:
         return results_dict
 
     @staticmethod
-    def bootstrap(data, iterations=10000):
+    def bootstrap(data, iterations=10000, seed=None, max_samples=2**22):
         """
         Nonparametric bootstrapping for mean and standard deviation of data.
+
+        Resamples are drawn as a matrix of indices (iterations x n) with a
+        NumPy Generator and their means are calculated at once, in chunks of
+        iterations of at most max_samples values to bound memory.
+
+        Parameters
+        ----------
+        data : array-like
+            Data to resample.
+
+        iterations : int; default is 10000
+            Number of resamples.
+
+        seed : int, numpy.random.SeedSequence, or numpy.random.Generator, optional
+            Seed of the random number generator.
+
+        max_samples : int; default is 2**22
+            Maximum number of values drawn per chunk.
+
+        Returns
+        -------
+        final_mean : float
+            Mean of the resampled means.
+
+        final_std : float
+            Standard deviation of the resampled means.
         """
 
-        boot_mean = []
+        values = np.asarray(data, dtype=np.float64)
+
+        n = len(values)
+
+        if n == 0:
+            return np.nan, np.nan
+
+        rng = np.random.default_rng(seed)
 
-        for n in range(0, iterations):
+        chunk = max(1, min(iterations, max_samples // n))
 
-            boot = resample(data, replace=True, n_samples=None,
-                            random_state=None)
+        boot_mean = np.empty(iterations, dtype=np.float64)
 
-            boot_mean.append(np.mean(boot))
+        for start in range(0, iterations, chunk):
+
+            size = min(chunk, iterations - start)
+
+            boot_index = rng.integers(0, n, size=(size, n))
+
+            boot_mean[start:start + size] = values[boot_index].mean(axis=1)
 
         final_mean = np.mean(boot_mean)
 
@@ -228,27 +278,98 @@ class FuelUncertainty:
         return final_mean, final_std
 
     @classmethod
-    def tier_bootstrap(cls, data, value_col, data_abbrev):
-        
-        uncert_csv = f'{data_abbrev}_uncertainty.csv'
+    def tier_bootstrap(cls, data, value_col, data_abbrev, iterations=10000,
+                       seed=0, workers=None, uncert_dir='../data/GHGRP'):
+        """
+        Bootstrap mean and standard deviation of a tier data field by
+        reporting year and fuel type, with the standard deviation of the
+        values themselves. Groups are distributed across a process pool. Results are saved as {data_abbrev}_uncertainty.csv
+        and read from there if the file already exists.
+
+        Parameters
+        ----------
+        data : pandas.DataFrame
+            Tier 2 or Tier 3 data.
+
+        value_col : str
+            Column to bootstrap.
+
+        data_abbrev : str
+            Abbreviation of the data field (e.g., 'hhv').
+
+        iterations : int; default is 10000
+            Number of resamples per group.
+
+        seed : int; default is 0
+            Seed from which the random number generators of each group
+            are spawned; results do not depend on the number of workers.
+
+        workers : int, optional
+            Number of processes. Defaults to the number of CPUs; groups
+            are bootstrapped in this process if 1.
+
+        uncert_dir : str; default is '../data/GHGRP'
+            Directory of the saved results.
+
+        Returns
+        -------
+        uncert : pandas.DataFrame
+            Bootstrapped mean and standard deviation of the mean ('mean',
+            'std'), and sample standard deviation of the values
+            ('sample_std'), by reporting year and fuel type.
+        """
 
-        if uncert_csv not in os.listdir(
-                os.path.abspath('../data/GHGRP')
-                ):
+        uncert_csv = os.path.abspath(
+            os.path.join(uncert_dir, f'{data_abbrev}_uncertainty.csv')
+            )
 
-            uncert = data[data[value_col] >0].groupby(
-                    ['reporting_year', 'fuel_type']
-                    )[value_col].apply(lambda x: cls.bootstrap(x))
+        if os.path.exists(uncert_csv):
 
-            uncert = pd.DataFrame.from_records(
-                    list(uncert.values),index=uncert.index,
-                    columns=['mean', 'std']
-                    )
+            uncert = pd.read_csv(uncert_csv, index_col=[0, 1])
+
+            # Results saved without the sample standard deviation are
+            # calculated again
+            if 'sample_std' in uncert.columns:
+                return uncert
+
+        grouped = data[data[value_col] > 0].groupby(
+                ['reporting_year', 'fuel_type']
+                )[value_col]
+
+        keys = list(grouped.groups.keys())
+
+        values = [grouped.get_group(k).to_numpy(dtype=np.float64) for k in keys]
 
-            uncert.to_csv(
-                os.path.abspath(os.path.join('../data/GHGRP', uncert_csv))
+        seeds = np.random.SeedSequence(seed).spawn(len(keys))
+
+        iterations = [iterations] * len(keys)
+
+        if workers == 1:
+
+            results = list(map(cls.bootstrap, values, iterations, seeds))
+
+        else:
+
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(
+                    cls.bootstrap, values, iterations, seeds
+                    ))
+
+        uncert = pd.DataFrame.from_records(
+                results, columns=['mean', 'std'],
+                index=pd.MultiIndex.from_tuples(
+                    keys, names=['reporting_year', 'fuel_type']
+                    )
                 )
 
+        # Spread of the values of single facilities and units
+        uncert['sample_std'] = [
+            np.std(v, ddof=1) if len(v) > 1 else np.nan for v in values
+            ]
+
+        uncert.to_csv(uncert_csv)
+
+        return uncert
 
     def calc_error_prop_ef(self, tier2_hhv, tier3):
         """
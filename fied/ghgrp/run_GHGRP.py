@@ -7,23 +7,53 @@ Created on Wed Mar  6 14:26:54 2019
 import os
 import datetime as dt
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+import click
+
 from fied.ghgrp import ghgrp_fac_unit
 from fied.ghgrp.calc_GHGRP_energy import GHGRP
 from fied.ghgrp.calc_GHGRP_AA import subpartAA
+from fied.ghgrp.energy_uncertainty import relative_uncertainty
 
 module_logger = logging.getLogger(__name__)
 
 
-def main(start_year, end_year):
+def calc_energy(start_year, end_year, calc_uncertainty=False, workers=None):
     """
+    Estimate energy use of GHGRP facilities.
+
+    Parameters
+    ----------
+    start_year : int
+        First reporting year.
+
+    end_year : int
+        Last reporting year.
+
+    calc_uncertainty : bool; default is False
+        If True, the relative standard deviation of energy estimates
+        (ENERGY_REL_STD), from the spread of reported HHV, carbon
+        content, and molecular weight data, is included for Monte Carlo
+        percentiles (see GHGRP_unit_char).
+
+    workers : int, optional
+        Number of processes of uncertainty calculations. Defaults to the
+        number of CPUs.
+
+    Returns
+    -------
+    energy_ghgrp : pandas.DataFrame
+        Energy estimates.
     """
     module_logger.info("Starting GHGRP energy calculations")
     module_logger.debug(f"Start year: {start_year}, End year: {end_year}")
 
-    # Uncertainty calculations are not fully operational
-    ghgrp = GHGRP((start_year, end_year), calc_uncertainty=False, fix_county_fips=False)
+    ghgrp = GHGRP(
+        (start_year, end_year), calc_uncertainty=calc_uncertainty,
+        fix_county_fips=False, workers=workers
+        )
 
     ghgrp_data = {}
 
@@ -45,16 +75,155 @@ def main(start_year, end_year):
     energy_ghgrp = ghgrp.energy_merge(energy_subC, energy_subD, energy_subAA,
                                       ghgrp_data['subpartV_fac'])
 
+    if calc_uncertainty:
+        tier_uncertainty = ghgrp.tier_calcs.tier_uncertainty
+
+        rel_std = relative_uncertainty(
+            **{k: tier_uncertainty[k] for k in ['hhv', 'cc', 'mw']
+               if k in tier_uncertainty}
+            )
+
+        energy_ghgrp = energy_ghgrp.join(
+            rel_std.rename('ENERGY_REL_STD'), on=['REPORTING_YEAR', 'FUEL_TYPE']
+            )
+
+        # Fuels without Tier 2 or Tier 3 data
+        energy_ghgrp['ENERGY_REL_STD'] = \
+            energy_ghgrp.ENERGY_REL_STD.fillna(rel_std.median())
+
+    return energy_ghgrp.astype(
+        {"COUNTY_FIPS": "f", "SECONDARY_NAICS_CODE": "f"}
+        )
+
+
+def main(start_year, end_year, calc_uncertainty=False):
+    """
+    Estimate energy use of GHGRP facilities and save the results.
+
+    Parameters
+    ----------
+    start_year : int
+        First reporting year.
+
+    end_year : int
+        Last reporting year.
+
+    calc_uncertainty : bool; default is False
+        See calc_energy.
+
+    Returns
+    -------
+    ghgrp_file : pathlib.Path
+        Saved energy estimates.
+    """
+
+    energy_ghgrp = calc_energy(start_year, end_year, calc_uncertainty)
+
     time = dt.datetime.today().strftime("%Y%m%d-%H%M")
 
     ghgrp_file = Path("data/GHGRP") / f'ghgrp_energy_{time}.parquet'
 
     # Save results
-    energy_ghgrp.astype({"COUNTY_FIPS": "f", "SECONDARY_NAICS_CODE": "f"}).to_parquet(ghgrp_file)
+    energy_ghgrp.to_parquet(ghgrp_file)
 
     return ghgrp_file
 
 
+def _save_year(year, ghgrp_dir, calc_uncertainty):
+    """Estimate energy use for a reporting year and save the partition"""
+
+    # Years already run in parallel; one process each
+    energy_ghgrp = calc_energy(year, year, calc_uncertainty, workers=1)
+
+    year_file = ghgrp_dir / f'year={year}' / 'part-0.parquet'
+
+    year_file.parent.mkdir(parents=True, exist_ok=True)
+
+    energy_ghgrp.to_parquet(year_file)
+
+    return year_file
+
+
+def main_time_series(start_year=2010, end_year=None, calc_uncertainty=False,
+                     workers=None):
+    """
+    Estimate energy use of GHGRP facilities for a range of reporting
+    years, with years processed in parallel, and save the results as
+    Parquet partitioned by year.
+
+    Downloaded GHGRP data are saved in the GHGRP store (see
+    fied.ghgrp.ghgrp_store) and reused across years and runs.
+
+    Parameters
+    ----------
+    start_year : int; default is 2010
+        First reporting year. GHGRP reporting began in 2010.
+
+    end_year : int, optional
+        Last reporting year. Defaults to two years before the current
+        year, the latest year with complete GHGRP data.
+
+    calc_uncertainty : bool; default is False
+        See calc_energy.
+
+    workers : int, optional
+        Number of processes, i.e., of years processed at a time. Defaults
+        to the number of CPUs. The calculations of each year run in a
+        single process.
+
+    Returns
+    -------
+    ghgrp_dir : pathlib.Path
+        Directory of saved energy estimates, with one partition
+        (year=YYYY/part-0.parquet) per reporting year. Can be read with
+        pandas.read_parquet.
+    """
+
+    if end_year is None:
+        end_year = dt.date.today().year - 2
+
+    years = range(start_year, end_year + 1)
+
+    module_logger.info(
+        f"Starting GHGRP energy calculations for {start_year}-{end_year}"
+        )
+
+    time = dt.datetime.today().strftime("%Y%m%d-%H%M")
+
+    ghgrp_dir = Path("data/GHGRP") / f'ghgrp_energy_{time}'
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        year_files = list(executor.map(
+            _save_year, years, [ghgrp_dir] * len(years),
+            [calc_uncertainty] * len(years)
+            ))
+
+    module_logger.info(
+        f"Saved {len(year_files)} years of GHGRP energy data to {ghgrp_dir}"
+        )
+
+    return ghgrp_dir
+
+
+@click.command()
+@click.option("--start-year", default=2010, type=int,
+              help="First reporting year. Default is 2010.")
+@click.option("--end-year", default=None, type=int,
+              help="Last reporting year. Default is two years ago.")
+@click.option("--uncertainty", is_flag=True,
+              help="Include the uncertainty of energy estimates.")
+@click.option("--workers", default=None, type=int,
+              help="Number of processes. Default is the number of CPUs.")
+def time_series(start_year, end_year, uncertainty, workers):
+    """Estimate GHGRP energy use for a range of reporting years."""
+
+    ghgrp_dir = main_time_series(
+        start_year, end_year, calc_uncertainty=uncertainty, workers=workers
+        )
+
+    click.echo(ghgrp_dir)
+
+
 if __name__ == '__main__':
 
     reporting_year = 2017
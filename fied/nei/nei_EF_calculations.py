@@ -12,8 +12,12 @@ from pathlib import Path
 toolspath = str(Path(__file__).parents[1]/"tools")
 sys.path.append(toolspath)
 from fied.tools.misc_tools import Tools
+from fied.tools.group_quantiles import group_quantiles
+from fied.tools import fuel_types
+from fied.tools.fuel_types import get_nei_fuel_harmonizer
 
 from fied.datasets import fetch_nei_2017, fetch_nei_2020, fetch_webfirefactors
+from fied.utils import save_debug_artifact
 
 
 logging.basicConfig(level=logging.INFO)
@@ -62,15 +66,21 @@ class NEI ():
                 }
             }
         
-        # from https://www.epa.gov/system/files/documents/2023-03/ghg_emission_factors_hub.pdf
-        self._gwp = {
-            '100' : {
-                'N2O': 298,
-                'CH4': 25,
-                'CO2': 1
-                }
-            }
-        
+        # 100-year global warming potentials by IPCC assessment report.
+        # AR4 values are the ones used by the GHGRP and the EPA Emission Factors Hub
+        # (https://www.epa.gov/system/files/documents/2023-03/ghg_emission_factors_hub.pdf).
+        # AR6 uses the fossil CH4 value.
+        self._gwp = pd.DataFrame({
+            'AR4': {'N2O': 298, 'CH4': 25, 'CO2': 1},
+            'AR5': {'N2O': 265, 'CH4': 28, 'CO2': 1},
+            'AR6': {'N2O': 273, 'CH4': 29.8, 'CO2': 1}
+            })
+
+        # Fuel combustion emission factors (kg CO2e/MJ) by standard fuel type
+        self._fuel_co2e_ef = pd.Series({
+            k: v.get('MJ_to_KGCO2e') for k, v in self._unit_conv['energy_units'].items()
+            }, dtype=float)
+
         self.unit_regex = Tools().unit_regex
 
     def find_missing_cap(self, df):
@@ -359,13 +369,11 @@ class NEI ():
 
     def load_nei_data(self,year):
         """
-        Load 2017 NEI data. Zip file needs to be downloaded and
-        unzipped manually from https://gaftp.epa.gov/air/nei/2017/data_summaries/2017v1/2017neiJan_facility_process_byregions.zip
-        due to error in zipfile library.
-
-        Load 2020 NEI data. Zip file needs to be downloaded and
-        unzipped manually from https://gaftp.epa.gov/air/nei/2020/data_summaries/2020nei_facility_process_byregions.zip
-        due to error in zipfile library.
+        Load 2017 or 2020 NEI data. Point source files are extracted
+        from https://gaftp.epa.gov/air/nei/2017/data_summaries/2017v1/2017neiJan_facility_process_byregions.zip
+        or https://gaftp.epa.gov/air/nei/2020/data_summaries/2020nei_facility_process_byregions.zip
+        (deflate64) and cached as Parquet files (see datasets.fetch_nei_2017
+        and datasets.fetch_nei_2020).
 
         Returns
         -------
@@ -391,15 +399,15 @@ class NEI ():
             nei_data = pd.DataFrame()
 
             if year == '2017':
-                for f in fetch_nei_2017():
+                for f in fetch_nei_2017(parquet=True):
 
-                    if '.csv' in f:
+                    if '.parquet' in f:
 
-                        if os.path.basename(f) == 'point_unknown.csv':
+                        if os.path.basename(f) == 'point_unknown.parquet':
                             continue
 
                         else:
-                            data = pd.read_csv(f, low_memory=False)
+                            data = pd.read_parquet(f)
 
                             data.columns = data.columns.str.strip()
                             data.columns = data.columns.str.replace(' ', '_')
@@ -451,15 +459,15 @@ class NEI ():
                     nei_data = nei_data.append(data, sort=False)
 
             elif year == '2020':
-                for f in fetch_nei_2020():
+                for f in fetch_nei_2020(parquet=True):
 
-                    if '.csv' in f:
+                    if '.parquet' in f:
 
-                        if os.path.basename(f) == 'point_unknown.csv':
+                        if os.path.basename(f) == 'point_unknown.parquet':
                             continue
 
                         else:
-                            data = pd.read_csv(f, low_memory=False)
+                            data = pd.read_parquet(f)
 
                             data.columns = data.columns.str.strip()
                             data.columns = data.columns.str.replace(' ', '_')
@@ -530,7 +538,38 @@ class NEI ():
 
         return iden_scc
     
-    def extract_ghg_emissions(self, nei_data):
+    def calc_co2e(self, ghgs, gwp_sets=('AR4',)):
+        """
+        Convert GHG emissions reported in short tons to metric tonnes
+        CO2 equivalent for one or more sets of global warming
+        potentials (GWPs).
+
+        Parameters
+        ----------
+        ghgs : pandas.DataFrame
+            NEI GHG emissions, with pollutant_code and total_emissions
+            (short tons) columns.
+
+        gwp_sets : sequence of str; default is ('AR4',)
+            GWP sets to use, from the columns of self._gwp
+            (i.e., 'AR4', 'AR5', 'AR6').
+
+        Returns
+        -------
+        co2e : pandas.DataFrame
+            Emissions in tonnes CO2e, with one column per GWP set and
+            the same index as ghgs.
+        """
+
+        gwp = self._gwp[list(gwp_sets)].reindex(ghgs.pollutant_code)
+
+        co2e = gwp.multiply(ghgs.total_emissions.values * 0.907, axis=0)
+
+        co2e.index = ghgs.index
+
+        return co2e
+
+    def extract_ghg_emissions(self, nei_data, gwp='AR4', alt_gwp=None):
         """
         Capture GHG emissions (i.e., CO2, CH4, N2O)
         reported under NEI. Convert to tonnes CO2 equivalent (tonnesCO2e)
@@ -541,6 +580,14 @@ class NEI ():
         nei_data : pandas.DataFrame
             Formatted NEI data.
 
+        gwp : str; default is 'AR4'
+            Set of global warming potentials used for ghgsTonneCO2e.
+
+        alt_gwp : list of str, optional
+            Alternative sets of global warming potentials (e.g.,
+            ['AR5', 'AR6']) calculated in the same pass, returned as
+            ghgsTonneCO2e_{set} columns for scenario analysis.
+
         Returns
         -------
         ghgs : pandas.DataFrame
@@ -563,14 +610,17 @@ class NEI ():
         # to systematically correct these emissions. 
         ghgs = ghgs.query("process_description!='epaghg facility reported emissions'").copy(deep=True)
 
+        alt_gwp = [g for g in (alt_gwp or []) if g != gwp]
+        alt_cols = [f'ghgsTonneCO2e_{g}' for g in alt_gwp]
+
         # convert short tons to metric tonnes
         # Method currently only works if all units of emissions are in short tons
         if (len(ghgs.emissions_uom.unique())==1) & (ghgs.emissions_uom.unique()[0]=='TON') is True:
-    
-            ghgs.loc[:, 'ghgsTonneCO2e'] = ghgs.apply(
-                lambda x: x.total_emissions * self._gwp['100'][x.pollutant_code] * 0.907,
-                axis=1
-                )
+
+            co2e = self.calc_co2e(ghgs, [gwp] + alt_gwp)
+            co2e.columns = ['ghgsTonneCO2e'] + alt_cols
+
+            ghgs = pd.concat([ghgs, co2e], axis=1)
             
         else:
             raise IndexError("Reported emissions have additional units of measurement")
@@ -579,7 +629,7 @@ class NEI ():
         ghgs = ghgs.groupby(
             ['eis_facility_id', 'eis_unit_id', 'unit_type_final', 'fuel_type'],
             as_index=False
-            ).ghgsTonneCO2e.sum()
+            )[['ghgsTonneCO2e'] + alt_cols].sum()
         
         # Drop values that are >25,000 metric tons. If these values are not
         # errors, then they will be picked up by the inclusion of GHGRP unit emissions
@@ -603,7 +653,9 @@ class NEI ():
         Parameters
         ----------
         ghgs : pandas.DataFrame
-            Emissions reported directly by NEI
+            Emissions reported directly by NEI, including any
+            ghgsTonneCO2e_{set} columns of alternative GWP sets, which
+            are also filled.
 
         nei_data : pandas.DataFrame
             Formatted NEI data with energy calculations.
@@ -621,23 +673,19 @@ class NEI ():
             how='left'
             )
 
-        efs = pd.concat(
-            [nei_data.fuel_type.dropna(), 
-             nei_data.fuel_type.dropna().map(self._unit_conv['energy_units'])],
-            axis=1, ignore_index=True
-            )
-        
-        efs.iloc[:, 1].update(efs.iloc[:, 1].dropna().apply(lambda x: x['MJ_to_KGCO2e']))
-        
-        efs = dict(efs.drop_duplicates().values)
-
-        nei_data.loc[:, 'ef'] = nei_data.fuel_type.map(efs)
+        nei_data.loc[:, 'ef'] = nei_data.fuel_type.map(self._fuel_co2e_ef)
 
         emissions = \
             nei_data[nei_data.ghgsTonneCO2eQ2.isnull()][['energy_MJ_q0','energy_MJ_q2', 'energy_MJ_q3']].multiply(nei_data.ef, axis=0)/1000
 
         emissions.columns = ['ghgsTonneCO2eQ0', 'ghgsTonneCO2eQ2', 'ghgsTonneCO2eQ3']
 
+        # Alternative GWP estimates (see extract_ghg_emissions). Fuel
+        # emission factors are CO2e with AR4 GWPs, of which CO2 is nearly
+        # all, so the same factors are used for alternative GWP sets.
+        for c in [c for c in ghgs.columns if c.startswith('ghgsTonneCO2e_')]:
+            emissions.loc[:, c] = emissions.ghgsTonneCO2eQ2
+
         # Drop values that are >25,000 metric tons. If these values are not
         # errors, then they will be picked up by the inclusion of GHGRP unit emissions
         # emissions = emissions.query("ghgsTonneCO2eQ3 < 25000 ")
@@ -1238,37 +1286,7 @@ class NEI ():
         # #TODO too many fuel type standardizations happening SCC -> NEI -> std fuel types
         # Should streamline this process to avoid errors.
         # clean up identified fuel types
-        fuels = {k:None for k in nei.fuel_type.dropna().unique()}
-
-        for f in fuels.keys():
-
-            if f.find('(') != -1:
-    
-                fre = f.replace(r'(', r'\(').replace(r')', r'\)')
-
-                n = {k: re.search(fre, k) for k in self._unit_conv['fuel_dict'].keys()}
-
-            else:
-
-                n = {k: re.search(k, f) for k in self._unit_conv['fuel_dict'].keys()}
-
-            if any(n.values()):
-
-                fk = [k for k in n.keys() if n[k] is not None]
-
-                # There may be multiple matches
-                if len(fk) > 1:
-
-                    mask = [f in x for x in fk]
-
-                    fuels[f] = self._unit_conv['fuel_dict'][np.array(fk)[mask][0]]
-
-                else:
-
-                    fuels[f] = self._unit_conv['fuel_dict'][fk[0]] 
-
-            else:
-                fuels[f] = f
+        fuels = get_nei_fuel_harmonizer().build_map(nei.fuel_type)
 
         nei.loc[:, 'fuel_type'] = nei.fuel_type.map(fuels, na_action='ignore')
 
@@ -1511,74 +1529,37 @@ class NEI ():
         
         nei.energy_MJ_nei.update(med_ef.energy_MJ_webfr_med)
 
-        nei.to_csv('nei_check_med_update.csv')
-
-        med_unit = pd.concat(
-            [pd.melt(
-                nei[['eis_facility_id',
-                    #  'eis_process_id',
-                     'eis_unit_id',
-                     'unit_type_final',
-                     'fuel_type',
-                     f'{v}_nei',
-                     f'{v}_web']],
-                id_vars=['eis_facility_id',
-                        #  'eis_process_id',
-                         'eis_unit_id',
-                         'unit_type_final',
-                         'fuel_type'],
-                value_vars=[f'{v}_nei',
-                            f'{v}_web'],
-                var_name='EF_source',
-                value_name=f'{v}'
-                ) for v in ['energy_MJ', 'throughput_TON']], axis=0, sort=True
-            )
-
-        # Groupby was not including entries that were missing a unit type or fuel type.
-        med_unit.fillna({'fuel_type': 'unknown', 'unit_type_final': 'unknown'}, inplace=True)
+        save_debug_artifact(nei, 'nei_check_med_update')
 
-        med_unit = med_unit.query(
-                "throughput_TON > 0 | energy_MJ > 0"
-                ).groupby(
-                    ['eis_facility_id',
+        unit_cols = ['eis_facility_id',
                     #  'eis_process_id',
                      'eis_unit_id',
                      'unit_type_final',
                      'fuel_type']
-                    )[['throughput_TON', 'energy_MJ']].quantile([0, 0.5, 0.75])
 
-        med_unit.reset_index(inplace=True)
-        med_unit.level_4.replace({0: 'q0', 0.5: 'q2', 0.75: 'q3'}, 
-                                 inplace=True)
-        med_unit = med_unit.pivot_table(
-            index=['eis_facility_id',
-                #    'eis_process_id',
-                   'eis_unit_id',
-                   'unit_type_final',
-                   'fuel_type'],
-            columns='level_4', values=['energy_MJ', 'throughput_TON'])
-
-        m = med_unit.columns.map('_'.join)
-        med_unit.columns = m  
+        value_cols = {
+            v: [f'{v}_nei', f'{v}_web'] for v in ['energy_MJ', 'throughput_TON']
+            }
+
+        # Groupby was not including entries that were missing a unit type or fuel type.
+        med_unit = nei[
+            unit_cols + [c for v in value_cols.values() for c in v]
+            ].fillna({'fuel_type': 'unknown', 'unit_type_final': 'unknown'})
+
+        # Quantiles of the NEI- and WebFire-based estimates pooled together
+        # by unit and fuel, calculated directly from the wide columns.
+        med_unit = group_quantiles(
+            med_unit, by=unit_cols, columns=value_cols,
+            q=[0, 0.5, 0.75], labels=['q0', 'q2', 'q3'],
+            positive_only=True
+            )
 
         other_cols = nei.columns
         other_cols = set(other_cols).difference(set(med_unit.columns))
 
-        other = nei.drop_duplicates(
-            ['eis_facility_id', 
-            #  'eis_process_id',
-             'eis_unit_id', 'unit_type_final',
-             'fuel_type']
-            )[other_cols]
-
-        med_unit = med_unit.join(
-            other.set_index(
-                ['eis_facility_id', 
-                #  'eis_process_id',
-                 'eis_unit_id', 'unit_type_final',
-                 'fuel_type']
-                )
-            )
+        other = nei.drop_duplicates(unit_cols)[list(other_cols)]
+
+        med_unit = med_unit.join(other.set_index(unit_cols))
 
         med_unit.reset_index(inplace=True)
 
@@ -1653,16 +1634,7 @@ class NEI ():
             generic fuel types that have been applied to NEI data.
         """
 
-        with open(Path(self._FIEDPATH, "tools/type_standardization.yml"),'r') as file:
-            docs = yaml.safe_load_all(file)
-
-            for i, d in enumerate(docs):
-                if i == 0:
-                    fuel_dict = d
-                else:
-                    continue
-
-        return fuel_dict
+        return fuel_types.load_fueltype_dict()
 
     def remove_unit_types(self, df):
         """
@@ -1695,10 +1667,10 @@ class NEI ():
 
         return df
 
-    #TODO make tools method
     def harmonize_fuel_type(self, ghgrp_unit_data, fuel_type_column):
         """
-        Applies fuel type mapping to fuel types reported under GHGRP
+        Applies fuel type mapping to fuel types reported under GHGRP.
+        See fied.tools.fuel_types.harmonize_fuel_type.
 
         Parameters
         ----------
@@ -1715,17 +1687,7 @@ class NEI ():
             have a standardized fuel type.
         """
 
-        fuel_dict = self.load_fueltype_dict()
-
-        ghgrp_unit_data.loc[:, 'fuelTypeStd'] = ghgrp_unit_data[fuel_type_column].map(fuel_dict)
-
-
-        # drop any fuelTypes that are null
-        ghgrp_unit_data = ghgrp_unit_data.where(
-            ghgrp_unit_data[fuel_type_column] != 'None'
-            ).dropna(how='all')
-
-        return ghgrp_unit_data
+        return fuel_types.harmonize_fuel_type(ghgrp_unit_data, fuel_type_column)
 
     def format_nei_char(self, df):
         """"
@@ -1778,6 +1740,9 @@ class NEI ():
             'ghgsTonneCO2eQ0', 'ghgsTonneCO2eQ2', 'ghgsTonneCO2eQ3', 
             ]
 
+        # Keep any alternative GWP estimates (see extract_ghg_emissions)
+        keep_cols += [c for c in df.columns if c.startswith('ghgsTonneCO2e_')]
+
         df = df[keep_cols]
 
         df.rename(columns=rename_dict, inplace=True)
@@ -1842,7 +1807,20 @@ class NEI ():
 
         return nei_char
 
-    def main(self, vintage: str = '2017'):
+    def main(self, vintage: str = '2017', alt_gwp=None):
+        """
+        Estimate NEI unit energy use and GHG emissions.
+
+        Parameters
+        ----------
+        vintage : str; default is '2017'
+            NEI year.
+
+        alt_gwp : list of str, optional
+            Alternative sets of global warming potentials (e.g.,
+            ['AR5', 'AR6']), returned as ghgsTonneCO2e_{set} columns
+            (see extract_ghg_emissions).
+        """
 
         nei = NEI()
         self.logger.info("Getting NEI data...")
@@ -1865,13 +1843,13 @@ class NEI ():
         # Use median EF from WebFires as alt approach to estimating energy
         nei_char = nei.apply_median_webfr_ef(nei_char, webfr, cutoff=0.75)  
         self.logger.info("Extracting and aggregating GHG emissions")
-        nei_char.to_pickle('nei_char_pre_med.pkl')
+        save_debug_artifact(nei_char, 'nei_char_pre_med')
         self.logger.info("Final NEI data assembly...")
         med_unit = nei.get_median_throughput_and_energy(nei_char)
         missing_unit = nei.separate_missing_units(nei_char)
 
         nei_char = nei.merge_med_missing(med_unit, missing_unit)
-        ghgs = nei.extract_ghg_emissions(nei_char)
+        ghgs = nei.extract_ghg_emissions(nei_char, alt_gwp=alt_gwp)
 
         self.logger.info("Merging and filling GHG emissions")
         nei_char = nei.merge_fill_ghg_emissions(ghgs, nei_char)
@@ -5,15 +5,22 @@ import urllib
 import sys
 sys.path.append(os.path.abspath(""))
 from fied.tools.naics_matcher import naics_matcher
+from fied.tools.naics_ranges import expand_naics_rows
 
-from fied.datasets import fetch_QPC
+from fied.qpc.qpc_store import QPCStore
 
 class QPC:
 
-    def __init__(self):
+    def __init__(self, store=None):
 
         self._data_path = os.path.abspath('./data/QPC/')
 
+        # Parsed QPC workbooks (see qpc_store)
+        if store is None:
+            store = QPCStore()
+
+        self.store = store
+
     @staticmethod
     def force_format(naics):
         """
@@ -34,73 +41,11 @@ class QPC:
     @staticmethod
     def format_naics(df):
         """
-        Formats results that aggregate NAICS codes (e.g., "3113, 4")
+        Formats results that aggregate NAICS codes (e.g., "3113, 4"),
+        with a row for each NAICS code (see tools.naics_ranges).
         """
 
-        for naics in df.NAICS.unique():
-
-            all_naics = []
-
-            if naics == '31-33':
-
-                continue
-
-            if type(naics) != str:
-
-                continue
-
-            elif ',' in naics:
-
-                all_naics.append(int(naics.split(',')[0]))
-
-                for n in naics.split(',')[1:]:
-
-                    n = n.strip()
-
-                    if '-' in n:
-
-                        for m in range(
-                            int(naics.split('-')[0][-1])+1,
-                                int(naics.split('-')[1])+1
-                                ):
-
-                            all_naics.append(
-                                int(naics.split(',')[0][:-1]+str(m))
-                                )
-
-                    else:
-
-                        all_naics.append(
-                            int(naics.split(',')[0][:-1]+n)
-                            )
-
-            elif (',' not in naics) & ('-' in naics):
-
-                all_naics.append(int(naics.split('-')[0]))
-
-                for m in range(
-                    int(naics.split('-')[0][-1])+1,
-                        int(naics.split('-')[1])+1
-                    ):
-
-                    all_naics.append(
-                        int(naics.split('-')[0][:-1]+str(m))
-                        )
-
-            new_rows = pd.DataFrame(
-                np.tile(df[df.NAICS == naics].values,
-                (len(all_naics), 1)), columns=df.columns
-                )
-
-            new_rows['NAICS'] = np.repeat(
-                all_naics,
-                len(new_rows)/len(all_naics)
-                )
-
-            # Delete original data
-            df = df[df.NAICS != naics]
-
-            df = df.append(new_rows, ignore_index=True)
+        df = expand_naics_rows(df, 'NAICS', exclude=['31-33'])
 
         return df
 
@@ -109,39 +54,51 @@ class QPC:
         Quarterly survey began 2008; start with 2010 due to  2007-2009
         recession.
         """
-        qpc_data = fetch_QPC(year)
+        qpc_data = self.store.read(year)
 
         if not include_all:
             # Don't use the aggregate manufacturing NAICS
             qpc_data = qpc_data.query("NAICS != '31-33'")
 
-        qpc_data.NAICS.update(
-            qpc_data.NAICS.apply(lambda x: QPC.force_format(x))
+        qpc_data['NAICS'] = qpc_data.NAICS.astype(object).apply(
+            lambda x: QPC.force_format(x)
             )
 
         qpc_data = QPC.format_naics(qpc_data)
 
         # Drop withheld estimates
-        qpc_data = qpc_data[qpc_data.Weekly_op_hours != 'D']
-
-        #Interpolate for single value == 'S'
-        qpc_data.replace({'S': np.nan, 'Z': np.nan}, inplace=True)
+        qpc_data = qpc_data[~qpc_data.Weekly_op_hours_flag.isin(['D'])]
 
-        qpc_data.Weekly_op_hours.update(
-            qpc_data.Weekly_op_hours.interpolate()
-            )
+        qpc_data = qpc_data.drop(['Weekly_op_hours_flag'], axis=1)
 
-        qpc_data['Hours_Standard Error'].update(
-            qpc_data['Hours_Standard Error'].interpolate()
-            )
+        #Interpolate for single value == 'S' (and 'Z')
+        for c in ['Weekly_op_hours', 'Hours_Standard Error']:
+            qpc_data[c] = qpc_data[c].interpolate()
 
-        qpc_data.fillna(0, inplace=True)
+        qpc_data = qpc_data.fillna(0)
 
         qpc_data['Weekly_op_hours'] = \
             qpc_data.Weekly_op_hours.astype(np.float32)
 
         return qpc_data
 
+    def get_qpc_years(self, years, include_all=False):
+        """
+        QPC data of several years (see get_qpc_data). Workbooks of years
+        that are not in the store are parsed in parallel.
+        """
+
+        years = list(years)
+
+        self.store.build(years)
+
+        qpc_data = pd.concat(
+            [self.get_qpc_data(y, include_all) for y in years],
+            axis=0, ignore_index=True
+            )
+
+        return qpc_data
+
     def calc_hours_CI(self, selected_qpc_data, CI=95):
         """
         Calculates confidence interval of average weekly operating hours using
@@ -1,7 +1,6 @@
 
 
 from census_qpc import QPC
-import pandas as pd
 import sys
 sys.path.append(r'c:/users/cmcmilla/foundational-industry-energy-data')
 
@@ -11,10 +10,7 @@ end_year = 2022
 
 qpc_meth = QPC()
 
-qpc_data = pd.concat(
-    [qpc_meth.get_qpc_data(y) for y in range(start_year, end_year+1)],
-    axis=0, ignore_index=True
-    )
+qpc_data = qpc_meth.get_qpc_years(range(start_year, end_year+1))
 
 qpc_data.loc[:, 'n3'] = qpc_data.NAICS.apply(
     lambda x: int(str(x)[0:3])
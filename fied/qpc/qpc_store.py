@@ -0,0 +1,207 @@
+"""Typed Parquet store of Quarterly Survey of Plant Capacity tables
+
+QPC tables are published as one Excel workbook per quarter (see
+datasets.fetch_QPC). Workbooks are parsed once, in parallel across a
+process pool, and saved as a typed long-format table (one row per year,
+quarter, and NAICS code) partitioned by year::
+
+    {path}/year={year}/part-0.parquet
+
+Reported flags of weekly operating hours (e.g., 'D' for withheld and
+'S' for not meeting publication standards) are kept in a separate
+column, so that all values are numeric.
+"""
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import pooch
+
+from fied.datasets import fetch_QPC_workbook
+
+
+module_logger = logging.getLogger(__name__)
+
+
+class QPCStore:
+    """
+    Parquet store of QPC tables, partitioned by year.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path, optional
+        Root directory of the store. Defaults to the FIED cache.
+
+    workers : int; default is 4
+        Number of workbooks parsed in parallel. Workbooks are parsed
+        in the calling process if workers is 1.
+    """
+    logger = logging.getLogger(f"{__name__}.QPCStore")
+
+    quarters = ['q1', 'q2', 'q3', 'q4']
+
+    value_columns = ['Utilization Rate', 'UR_Standard Error',
+                     'Weekly_op_hours', 'Hours_Standard Error']
+
+    def __init__(self, path=None, workers=4):
+
+        if path is None:
+            path = Path(pooch.os_cache("FIED")) / "QPC" / "store"
+
+        self.path = Path(path)
+        self.workers = workers
+
+    def _partition_file(self, year):
+        return self.path / f"year={year}" / "part-0.parquet"
+
+    def has(self, year):
+        """Check if a year is in the store"""
+        return self._partition_file(year).exists()
+
+    @classmethod
+    def type_records(cls, data):
+        """
+        Assign types to QPC records.
+
+        Parameters
+        ----------
+        data : pandas.DataFrame
+            QPC records of one or more quarters, as reported.
+
+        Returns
+        -------
+        data : pandas.DataFrame
+            QPC records with numeric values and a Weekly_op_hours_flag
+            column of reported flags (null for reported values).
+        """
+
+        data = data.reset_index(drop=True)
+
+        hours = data.Weekly_op_hours.astype(str).str.strip()
+
+        flagged = pd.to_numeric(data.Weekly_op_hours, errors='coerce').isnull()
+
+        data = data.assign(
+            Year=data.Year.astype('int16'),
+            Q=data.Q.astype('string'),
+            NAICS=data.NAICS.astype(str).str.strip().astype('string'),
+            Description=data.Description.astype(str).str.strip().astype(
+                'string'
+                ),
+            Weekly_op_hours_flag=hours.where(flagged).astype('string')
+            )
+
+        for c in cls.value_columns:
+            data[c] = pd.to_numeric(data[c], errors='coerce').astype('float64')
+
+        data = data[['Year', 'Q', 'NAICS', 'Description'] +
+                    cls.value_columns + ['Weekly_op_hours_flag']]
+
+        return data
+
+    def write(self, year, data):
+        """
+        Save the QPC records of a year.
+
+        Parameters
+        ----------
+        year : int
+            Survey year.
+
+        data : pandas.DataFrame
+            QPC records of all quarters of the year, as reported.
+        """
+
+        data = self.type_records(data)
+
+        filename = self._partition_file(year)
+        filename.parent.mkdir(parents=True, exist_ok=True)
+
+        tmpname = filename.with_suffix(f".{os.getpid()}.part")
+        data.to_parquet(tmpname, index=False)
+        tmpname.replace(filename)
+
+        self.logger.debug(f"Saved QPC {year} to {filename}")
+
+    def build(self, years, loader=fetch_QPC_workbook):
+        """
+        Parse the workbooks of years that are not in the store.
+
+        Parameters
+        ----------
+        years : iterable of int
+            Survey years.
+
+        loader : callable; default is datasets.fetch_QPC_workbook
+            Function of (year, quarter) returning the records of a
+            quarter as a pandas.DataFrame. Must be picklable if workers
+            is more than 1.
+        """
+
+        missing = sorted({int(y) for y in years if not self.has(y)})
+
+        if not missing:
+            return
+
+        self.logger.info(f"Parsing QPC workbooks for {missing}")
+
+        tasks = [(y, q) for y in missing for q in self.quarters]
+
+        if self.workers == 1:
+            workbooks = list(map(loader, *zip(*tasks)))
+
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                workbooks = list(executor.map(loader, *zip(*tasks)))
+
+        for n, year in enumerate(missing):
+            n_q = len(self.quarters)
+
+            self.write(year, pd.concat(
+                workbooks[n * n_q:(n + 1) * n_q], axis=0, ignore_index=True
+                ))
+
+    def read(self, years, naics=None, loader=fetch_QPC_workbook):
+        """
+        Read the QPC records of several years, parsing the workbooks of
+        years that are not in the store first.
+
+        Parameters
+        ----------
+        years : int or iterable of int
+            Survey years.
+
+        naics : str, optional
+            NAICS prefix of records to read (e.g., '311'). All records
+            by default.
+
+        loader : callable; default is datasets.fetch_QPC_workbook
+            See build.
+
+        Returns
+        -------
+        data : pandas.DataFrame
+            Typed QPC records (see type_records).
+        """
+
+        if isinstance(years, int):
+            years = [years]
+
+        years = list(years)
+
+        self.build(years, loader=loader)
+
+        data = pd.concat(
+            [pd.read_parquet(self._partition_file(y)) for y in years],
+            axis=0, ignore_index=True
+            )
+
+        if naics is not None:
+            data = data[data.NAICS.str.startswith(str(naics))]
+
+            data.reset_index(drop=True, inplace=True)
+
+        return data
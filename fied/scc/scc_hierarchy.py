@@ -0,0 +1,143 @@
+"""Level descriptions of SCCs from the SCC download
+
+The complete list of SCCs (see datasets.fetch_scc) includes the
+descriptions of the four levels of each SCC, so levels are looked up
+locally instead of querying EPA SCC Web Services for each SCC.
+"""
+
+import functools
+import logging
+
+import numpy as np
+import pandas as pd
+
+from fied import datasets
+
+
+module_logger = logging.getLogger(__name__)
+
+
+class SCCHierarchy:
+    """
+    Index of the level one to four descriptions of SCCs, for single and
+    bulk lookups.
+
+    Parameters
+    ----------
+    all_scc : pandas.DataFrame
+        Complete list of SCCs, with SCC and scc_level_one ...
+        scc_level_four columns (see SCC_ID.load_complete_scc).
+    """
+
+    levels = ['scc_level_one', 'scc_level_two', 'scc_level_three',
+              'scc_level_four']
+
+    def __init__(self, all_scc):
+
+        hierarchy = all_scc.assign(
+            SCC=pd.to_numeric(all_scc.SCC, errors='coerce')
+            ).dropna(subset=['SCC'])
+
+        hierarchy = hierarchy.astype({'SCC': 'int64'}).drop_duplicates(
+            subset=['SCC']
+            ).sort_values('SCC')
+
+        self.codes = hierarchy.SCC.to_numpy()
+
+        self.descriptions = hierarchy[self.levels].to_numpy(dtype=object)
+
+        self._rows = dict(zip(self.codes.tolist(), range(len(self.codes))))
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __contains__(self, scc):
+        return self.get(scc) is not None
+
+    def get(self, scc):
+        """
+        Levels of an SCC.
+
+        Parameters
+        ----------
+        scc : int or str
+            Eight or 10-digit Source Classification Code.
+
+        Returns
+        -------
+        scc_levels : dict or None
+            Descriptions by level (e.g., 'scc_level_one'), or None if
+            the SCC cannot be found.
+        """
+
+        try:
+            row = self._rows.get(int(scc))
+
+        except (TypeError, ValueError):
+            row = None
+
+        if row is None:
+            return None
+
+        return dict(zip(self.levels, self.descriptions[row]))
+
+    def lookup(self, sccs):
+        """
+        Levels of an array of SCCs.
+
+        Parameters
+        ----------
+        sccs : array-like
+            Source Classification Codes.
+
+        Returns
+        -------
+        scc_levels : pandas.DataFrame
+            Descriptions by level, in the order of sccs. Levels are null
+            for SCCs that cannot be found.
+        """
+
+        codes = pd.to_numeric(pd.Series(np.asarray(sccs)), errors='coerce')
+
+        valid = codes.notnull().to_numpy()
+
+        codes = codes.fillna(-1).astype('int64').to_numpy()
+
+        rows = np.searchsorted(self.codes, codes).clip(0, len(self.codes) - 1)
+
+        found = valid & (len(self.codes) > 0)
+
+        found[found] = self.codes[rows[found]] == codes[found]
+
+        descriptions = np.full(
+            (len(codes), len(self.levels)), None, dtype=object
+            )
+
+        descriptions[found] = self.descriptions[rows[found]]
+
+        scc_levels = pd.DataFrame(descriptions, columns=self.levels)
+
+        scc_levels.insert(0, 'SCC', np.asarray(sccs))
+
+        return scc_levels
+
+
+@functools.lru_cache(maxsize=None)
+def load_scc_hierarchy():
+    """
+    SCC hierarchy of the SCC download, built once per session.
+
+    Returns
+    -------
+    hierarchy : SCCHierarchy
+    """
+
+    all_scc = datasets.fetch_scc()
+
+    all_scc.columns = [c.replace(' ', '_') for c in all_scc.columns]
+
+    hierarchy = SCCHierarchy(all_scc)
+
+    module_logger.debug(f'Indexed levels of {len(hierarchy)} SCCs')
+
+    return hierarchy
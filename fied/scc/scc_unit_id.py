@@ -1,13 +1,31 @@
 
 import os
+import functools
+import hashlib
+from pathlib import Path
 
 import pandas as pd
-import numpy as np
+import pooch
 import re
 import logging
-import requests
+import yaml
 
 from fied import datasets
+from fied.datasets.mod import SCC_KNOWN_HASH
+from fied.scc import scc_hierarchy
+
+
+SCC_RULES_FILE = Path(__file__).parent / "scc_unit_rules.yml"
+
+
+@functools.lru_cache(maxsize=None)
+def _load_scc_rules():
+    """Parse the rules of scc_unit_rules.yml"""
+
+    with open(SCC_RULES_FILE, "r") as file:
+        rules = yaml.safe_load(file)["rules"]
+
+    return rules
 
 
 class SCC_ID:
@@ -34,10 +52,16 @@ class SCC_ID:
 
     """
 
-    def __init__(self):
+    def __init__(self, cache_dir=None):
 
         logging.basicConfig(level=logging.INFO)
 
+        # Identified SCCs are saved here (see build_id)
+        if cache_dir is None:
+            cache_dir = pooch.os_cache("FIED")
+
+        self.cache_dir = Path(cache_dir)
+
 
     def load_complete_scc(self):
         """
@@ -60,8 +84,12 @@ class SCC_ID:
     @staticmethod
     def scc_query_split(scc):
         """
-        Uses EPA SCC Web Services to get level information for an 8- or
-        10-digit SCC.
+        Get level information for an 8- or 10-digit SCC.
+
+        Levels are looked up in the SCC download (see
+        scc_hierarchy.SCCHierarchy) rather than queried from EPA SCC Web
+        Services. Use scc_hierarchy.load_scc_hierarchy().lookup for
+        arrays of SCCs.
 
         Parameters
         ----------
@@ -74,564 +102,249 @@ class SCC_ID:
             Dictionary of all four level names
         """
 
-        base_url = 'http://sor-scc-api.epa.gov:80/sccwebservices/v1/SCC/'
+        levels = scc_hierarchy.load_scc_hierarchy().get(scc)
 
-        try:
-            r = requests.get(base_url+f'{scc}')
-            r.raise_for_status()
-
-        except requests.exceptions.HTTPError as err:
-            logging.error(f'{err}')
-
-        levels = [f'scc level {n}' for n in ['one', 'two', 'three', 'four']]
-
-        scc_levels = {}
+        if levels is None:
+            logging.error(f'SCC {scc} cannot be found')
 
-        try:
-            for k in levels:
-                scc_levels[k] = r.json()['attributes'][k]['text']
+            return None
 
-        except TypeError:
-            logging.error(f'SCC {scc} cannot be found')
-            scc_levels = None
+        scc_levels = {k.replace('_', ' '): v for k, v in levels.items()}
 
         return scc_levels
 
-    def build_id(self):
+    def cache_path(self):
         """
-        Identify all relevant unit types and fuel
-        types in SCCs.
+        Path of saved unit types and fuel types of SCCs, keyed by the hash
+        of the SCC download and the identification rules.
 
         Returns
         -------
-        all_scc : pandas.DataFrame
-            Complete SCC codes with added columns
-            of unit types and fuel types.
+        cache_file : pathlib.Path
         """
 
-        all_scc = self.load_complete_scc()
-        all_scc.loc[:, 'unit_type'] = np.nan
-        all_scc.loc[:, 'fuel_type'] = np.nan
-
-        id_meth = [
-             self.id_external_combustion,
-             self.id_stationary_fuel_combustion,
-             self.id_ice,
-             self.id_chemical_evaporation,
-             self.id_industrial_processes,
-            ]
-
-        ids = pd.concat(
-            [f(all_scc) for f in id_meth],
-            axis=0, ignore_index=False,
-            sort=True
-            )
-
-        all_scc.update(ids)
+        key = hashlib.sha256(
+            SCC_KNOWN_HASH.encode() + SCC_RULES_FILE.read_bytes()
+            ).hexdigest()[:16]
 
-        all_scc.dropna(subset=['unit_type', 'fuel_type'],
-                       how='all', inplace=True)
-
-        # all_scc = self.ft_clean_up(all_scc)
-
-        return all_scc
+        return self.cache_dir / f'iden_scc_{key}.csv'
 
-    def id_external_combustion(self, all_scc):
+    def build_id(self, use_cache=True):
         """
-        Method for identifying relevant unit and fuel types under
-        SCC Level 1 External Combustion (1)
+        Identify all relevant unit types and fuel
+        types in SCCs.
 
         Parameters
         ----------
-        all_scc : pandas.DataFrame
-            Complete list of SCCs.
+        use_cache : bool; default is True
+            Read results saved for the same SCC download and rules, if
+            any, and save new results.
 
         Returns
         -------
-        scc_exc : pandas.DataFrame
-            SCC for external combustion (SCC Level 1 == 1) with
-            unit type and fuel type descriptions.
-        """
-
-        scc_exc = all_scc.query("scc_level_one=='External Combustion'")
-
-        unit_types_detail = []
-        fuel_types = []
-
-        other_fuels = [
-            'Shredded', 'Specify Percent Butane in Comments',
-            'Specify in Comments', 'Specify Waste Material in Comments',
-            'Refuse Derived Fuel', 'Sewage Grease Skimmings', 'Waste Oil',
-            'Sludge Waste', 'Digester Gas',
-            'Agricultural Byproducts (rice or peanut hulls, shells, cow manure, etc)',
-            'Paper Pellets', 'Black Liquor', 'Red Liquor',
-            'Spent Sulfite Liquor', 'Tall Oil',
-            'Wood/Wood Waste Liquid', 'Off-gas Ejectors', 'Pulverized Coal',
-            'Salable Animal Fat', 'Natural Gas', 'Process Gas',
-            'Wet Slurry', 'Distillate Oil', 'Residual Oil', 'Petroleum Refinery Gas',
-            'Grade 4 Oil', 'Grade 5 Oil', 'Grade 6 Oil', 'Blast Furnace Gas',
-            'Coke Oven Gas', 'Landfill Gas', 'Biomass i[2]Solids'
-            ]
-
-        for i, r in scc_exc.iterrows():
-
-            if r['scc_level_two'] == 'Space Heaters':
-
-                if ':' in r['scc_level_three']:
-                    unit_types_detail.append(r['scc_level_four'].split(': ')[-1])
-                    fuel_types.append(r['scc_level_four'].split(': ')[0])
-
-                else:
-                    unit_types_detail.append('Space heater')
-                    fuel_types.append(r['scc_level_four'].split(': ')[0])
-
-            elif 'boiler' in r['scc_level_two'].lower():
-
-                fuel_types.append(r['scc_level_three'])
-
-                if 'boiler' in r['scc_level_four'].lower():
-                    ut = r['scc_level_four']
-
-                else:
-                    ut = f'Boiler, {r.scc_level_four}'
-
-                unit_types_detail.append(ut)
-
-                # split_ut = r['scc_level_four'].split(': ')
-
-                # if len(split_ut) == 2:
-                #     ut = split_ut[-1]
-
-                #     if ut in other_fuels:
-                #         unit_types_detail.append('Boiler')
-
-                #     else:
-                #         unit_types_detail.append(ut)
-
-                # elif len(split_ut) > 2:
-                #     unit_types_detail.append((' '.join(split_ut[1:])))
-
-                # else:
-                #     if 'boiler' in r['scc_level_four'].lower():
-                #         unit_types_detail.append(r['scc_level_four'])
-
-                #     else:
-                #         unit_types_detail.append('Boiler')
-
-        scc_exc.loc[:, 'unit_type'] = unit_types_detail
-        scc_exc.loc[:, 'fuel_type'] = fuel_types
-
-        return scc_exc
-
-    def id_ice(self, all_scc):
-        """
-        Method for identifying relevant unit and fuel types under 
-        SCC Level 1 Internal Combustion Engines (2)
-
-        Parameters
-        ----------
         all_scc : pandas.DataFrame
-            Complete list of SCCs.
-
-        Returns
-        -------
-        scc_ice : pandas.DataFrame
-            SCC for external combustion (SCC Level 1 == 2) with
-            unit type and fuel type descriptions.
+            Complete SCC codes with added columns
+            of unit types and fuel types.
         """
 
-        scc_ice = all_scc.query("scc_level_one=='Internal Combustion Engines'")
-        scc_ice = scc_ice[scc_ice.scc_level_two.isin(
-            ['Electric Generation', 'Industrial', 'Commercial/Institutional']
-            )]
+        cache_file = self.cache_path()
 
-        unit_types_detail = []
-        fuel_types = []
+        if use_cache and cache_file.exists():
+            logging.info(f'Reading identified SCCs from {cache_file}')
 
-        other = ['Geysers/Geothermal', 'Equipment Leaks',
-                 'Wastewater, Aggregate',
-                 'Wastewater, Points of Generation', 'Flares']
+            return pd.read_csv(cache_file, index_col=0)
 
-        types = [
-            'Turbine',
-            'Reciprocating',
-            'Turbine: Cogeneration',
-            'Reciprocating: Cogeneration',
-            'Refinery Gas: Turbine',
-            'Refinery Gas: Reciprocating Engine',
-            'Propane: Reciprocating',
-            'Butane: Reciprocating',
-            'Reciprocating Engine',
-            'Reciprocating Engine: Cogeneration'
-            ]
+        all_scc = self.identify(self.load_complete_scc())
 
-        for i, r in scc_ice.iterrows():
-
-            if r['scc_level_three'] in other:
-                ut = None
-                ft = None
+        all_scc.dropna(subset=['unit_type', 'fuel_type'],
+                       how='all', inplace=True)
 
-            elif r['scc_level_four'] in types:
-                ft = r['scc_level_three']
-                ut = r['scc_level_four']
+        # all_scc = self.ft_clean_up(all_scc)
 
-            unit_types_detail.append(ut)
-            fuel_types.append(ft)
+        if use_cache:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
 
-        scc_ice.loc[:, 'unit_type'] = unit_types_detail
-        scc_ice.loc[:, 'fuel_type'] = fuel_types
+            tmp_file = cache_file.with_suffix(f'.{os.getpid()}.part')
+            all_scc.to_csv(tmp_file)
+            os.replace(tmp_file, cache_file)
 
-        return scc_ice
+        return all_scc
 
-    def id_stationary_fuel_combustion(self, all_scc):
+    @staticmethod
+    def fired_fuel_type(descriptions):
         """
-        Method for identifying relevant unit and fuel types under 
-        SCC Level 1 Stationary Source Fuel Combustion (21; note this is
-        a 10-digit SCC code)
+        Fuel type of '-fired' unit descriptions (e.g., 'Natural Gas-fired
+        Dryer'), or else the first fuel named in the description.
 
         Parameters
         ----------
-        all_scc : pandas.DataFrame
-            Complete list of SCCs.
+        descriptions : pandas.Series
+            SCC level four descriptions.
 
         Returns
         -------
-        scc_ice : pandas.DataFrame
-            SCC for external combustion (SCC Level 1 == 2) with
-            unit type and fuel type descriptions
+        fuel_type : pandas.Series
         """
 
-        scc_sta = all_scc.query("scc_level_one == 'Stationary Source Fuel Combustion'")
-        scc_sta = scc_sta[~scc_sta.scc_level_two.isin(
-            ['Residential']
-            )]
-
-        unit_types_detail = []
-        fuel_types = []
-
-        for i, r in scc_sta.iterrows():
-            fuel_types.append(r['scc_level_three'])
-
-            if 'All Boiler Types' in r['scc_level_four']:
-                unit_types_detail.append('Boiler')
+        fuel = descriptions.str.extract(
+            r'(\w+ \w+)(?=-fired)|(\w+)(?=-fired)|(\w+ \w+ \w+)(?=-fired)'
+            )
 
-            elif 'Boilers and IC Engines' in r['scc_level_four']:
-                unit_types_detail.append('Boilers and IC Engines')
+        fuel = fuel[0].fillna(fuel[1]).fillna(fuel[2])
 
-            elif 'All IC Engine Types' in r['scc_level_four']:
-                unit_types_detail.append('IC Engine')
+        fired = fuel.notnull()
 
-            elif 'All Heater Types' in r['scc_level_four']:
-                unit_types_detail.append('Heater')
+        lower = fuel.str.lower()
 
-            else:
-                unit_types_detail.append(r['scc_level_four'])
+        # Conditions are applied in reverse order of precedence
+        fuel = fuel.mask(lower == 'oil', 'Residual Fuel Oil')
 
-        scc_sta.loc[:, 'unit_type'] = unit_types_detail
-        scc_sta.loc[:, 'fuel_type'] = fuel_types
+        # Assume that "...Gas-Fired..." equipment refers to natural gas.
+        fuel = fuel.mask(lower == 'gas', 'Natural Gas')
 
-        return scc_sta
+        fuel = fuel.mask(
+            lower.str.contains('and|or', na=False), fuel.str.split(' ').str[1]
+            )
 
-    def id_chemical_evaporation(self, all_scc):
-        """
-        Method for identifying relevant unit and fuel types under 
-        SCC Level 1 Chemical Evaporation (4)
+        fuel = fuel.mask(
+            lower.str.contains('direct', na=False),
+            lower.str.split('direct ').str[1].replace({'ng': 'Natural Gas'})
+            )
 
-        Parameters
-        ----------
-        all_scc : pandas.DataFrame
-            Complete list of SCCs.
+        fuel = fuel.mask(
+            lower.str.contains('fired', na=False),
+            lower.str.split(' fired').str[0]
+            )
 
-        Returns
-        -------
-        scc_chee : pandas.DataFrame
-            SCC for Chemical Evaporation (SCC Level 1 == 4) with
-            unit type and fuel type descriptions
-        """
+        named_fuel = descriptions.str.lower().str.extract(
+            r'(cbm|nat gas|natural gas|distillate oil|residual oil|#2 oil|#6 oil|propane|coal|process gas)'
+            )[0].replace({
+                'cbm': 'Natural Gas', 'nat gas': 'Natural Gas',
+                'natural gas': 'Natural Gas', '#2 oil': 'Diesel',
+                '#6 oil': 'Residual Fuel Oil'
+                })
 
-        scc_chee = all_scc.query("scc_level_one == 'Chemical Evaporation'")
+        return fuel.where(fired, named_fuel)
 
-        fuel_types = []
-        unit_types_detail = []
+    @staticmethod
+    def rule_mask(data, rule):
+        """Records of data that match the predicates of a rule"""
 
-        for i, r in scc_chee.iterrows():
+        mask = pd.Series(True, index=data.index)
 
-            if (r['scc_level_two'] == 'Surface Coating Operations') & \
-                (('dryer' in r['scc_level_four'].lower()) | \
-                 ('drying' in r['scc_level_four'].lower())):
+        for column, patterns in rule.items():
 
-                unit_types_detail.append(r['scc_level_four'])
-                fuel_types.append(None)
+            if column in ['unit_type', 'fuel_type']:
+                continue
 
-            elif r['scc_level_three'] == 'Coating Oven - General':
+            if isinstance(patterns, str):
+                patterns = [patterns]
 
-                if ('<' in r['scc_level_four']) | ('>' in r['scc_level_four']):
-                    unit_types_detail.append('Coating Oven')
+            for p in patterns:
+                if p.startswith('!'):
+                    mask &= ~data[column].str.contains(p[1:], na=False)
 
                 else:
-                    unit_types_detail.append(r['scc_level_four'])
+                    mask &= data[column].str.contains(p, na=False)
 
-                fuel_types.append(None)
+        return mask
 
-            elif r['scc_level_three'] == 'Coating Oven Heater':
-
-                unit_types_detail.append('Coating Oven Heater')
-                fuel_types.append(r['scc_level_four'])
-
-            elif (r['scc_level_three'] == 'Fuel Fired Equipment') & \
-                    (r['scc_level_two'] == 'Surface Coating Operations'):
-
-                unit_types_detail.append(r['scc_level_four'].split(': ')[1])
-                fuel_types.append(r['scc_level_four'].split(': ')[0])
-
-            elif (r['scc_level_three'] == 'Fuel Fired Equipment') & \
-                    (r['scc_level_two']=='Organic Solvent Evaporation'):
+    @staticmethod
+    def fill_template(data, template):
+        """
+        Values of a unit type or fuel type template (see
+        scc_unit_rules.yml) for records of data.
+        """
 
-                unit_types_detail.append(r['scc_level_four'].split(': ')[0])
-                fuel_types.append(r['scc_level_four'].split(': ')[1])
+        if template is None:
+            return pd.Series(None, index=data.index, dtype=object)
 
-            elif r['scc_level_three'] == 'Drying':
+        # Literal text, followed by column and part of placeholders
+        pieces = re.split(r'\{(\w+)(?:\[(-?\d+)\])?\}', template)
 
-                unit_types_detail.append(r['scc_level_four'])
-                fuel_types.append(None)
+        value = pd.Series('', index=data.index, dtype=object)
 
-            elif (r['scc_level_three'] != 'Drying') & \
-                    (r['scc_level_four'] in ['Dryer', 'Drying', 'Drying/Curing']):
+        for i in range(0, len(pieces), 3):
+            value = value + pieces[i]
 
-                unit_types_detail.append(r['scc_level_four'])
-                fuel_types.append(None)
+            if i + 1 < len(pieces):
+                column, part = pieces[i + 1:i + 3]
 
-            # Skipping dry cleaning operations. Unsure whether "drying"
-            # includes application of heat
+                values = data[column]
 
-            else:
-                unit_types_detail.append(None)
-                fuel_types.append(None)
+                if part is not None:
+                    values = values.str.split(': ').str[int(part)]
 
-        scc_chee.loc[:, 'unit_type'] = unit_types_detail
-        scc_chee.loc[:, 'fuel_type'] = fuel_types
+                value = value + values.astype(object)
 
-        return scc_chee
+        return value
 
-    def id_industrial_processes(self, all_scc):
+    def identify(self, all_scc, rules=None):
         """
-        Method for identifying relevant unit and fuel types under 
-        SCC Level 1 Industrial Processes (3)
+        Identify unit types and fuel types of SCCs by evaluating the rules
+        of scc_unit_rules.yml with vectorized string operations.
 
         Parameters
         ----------
         all_scc : pandas.DataFrame
             Complete list of SCCs.
 
+        rules : dict, optional
+            Rules by SCC level one. Defaults to scc_unit_rules.yml.
+
         Returns
         -------
-        scc_ind : pandas.DataFrame
-            SCC for Industrial Processes (SCC Level 1 == 3) with
-            unit type and fuel type descriptions
+        all_scc : pandas.DataFrame
+            SCCs with unit_type and fuel_type columns, which are null
+            for SCCs that match no rule.
         """
 
-        scc_ind = all_scc.query("scc_level_one == 'Industrial Processes'")
-
-        unit_types_detail = []
-        fuel_types = []
-
-        other_counter = []
-
-        for i, r in scc_ind.iterrows():
-
-            ft = None
-            ut = None
-
-            if 'Commercial Cooking' in r['scc_level_three']:
-                ut = r['scc_level_four']
-                ft = None
-
-            elif (r['scc_level_two'] == 'In-process Fuel Use') & \
-                (r['scc_level_four'] != 'Total') & \
-                ('Fuel Storage' not in r['scc_level_three']):
-
-                ut = r['scc_level_four']
-                ft = r['scc_level_three']
-                other_counter.append(i)
-
-            elif r['scc_level_three'] == 'Ammonia Production':
-
-                if ':' in r['scc_level_four']:
-                    ut = r['scc_level_four'].split(': ')[0]
-                    ft = r['scc_level_four'].split(': ')[1]
+        if rules is None:
+            rules = _load_scc_rules()
 
-                    if ft == 'Natural Gas Fired':
-                        ft = 'natural gas'
+        parts = all_scc.scc_level_four.str.split(': ')
 
-                    else:
-                        pass
-
-                else:
-                    ut = r['scc_level_four']
-                    ft = None
-
-            elif (r['scc_level_two'] != 'In-process Fuel Use') & \
-                (any([x in r['scc_level_four'].lower() for x in [
-                    'calciner', 'evaporator', 'furnace', 'dryer', 'kiln',
-                    'oven', 'flares', 'incinerators', 'turbines', 'turbine',
-                    'engines', 'engine',
-                    'incinerator', 'distillation', 'heater', 'broil', 'flare',
-                    'stove', 'steam'
-                    ]])):
-
-                if r['scc_level_three'] == 'Fuel Fired Equipment':
-                    x, y = r['scc_level_four'].split(': ')
-
-                    if any([z in x for z in ['Distillate', 'Residual', 'Gas',
-                                             'Liquid', 'Propane']]):
-                        ft = x
-                        ut = y
-
-                    else:
-                        ft = y
-                        ut = x
-
-                else:
-                    ut = r['scc_level_four']
-
-                    if 'fired' in ut.lower():
-                        try:
-                            ft = re.search(
-                                r'(\w+ \w+)(?=-fired)|(\w+)(?=-fired)|(\w+ \w+ \w+)(?=-fired)', 
-                                ut
-                                ).group()
-
-                        except AttributeError:
-
-                            try:
-                                ft = re.search(
-                                    r'cbm|nat gas|natural gas|distillate oil|residual oil|#2 oil|#6 oil|propane|coal|process gas', 
-                                    ut.lower()
-                                    ).group()
-
-                            except AttributeError:
-                                ft = None
-
-                            else:
-                                if ft.lower() == 'nat gas':
-                                    ft = 'Natural Gas'
-
-                                elif ft.lower() == 'cbm':
-                                    ft = 'Natural Gas'
-
-                                elif ft.lower() == "#2 oil":
-                                    ft = 'Diesel'
-
-                                elif ft.lower() == "#6 oil":
-                                    ft = 'Residual Fuel Oil'
-
-                                elif ft == 'natural gas':
-                                    ft = 'Natural Gas'
-
-                        else:
-                            if 'fired' in ft.lower():
-                                ft = ft.lower().split(' fired')[0]
-
-                            elif 'direct' in ft.lower():
-                                try:
-                                    ft = ft.lower().split('direct ')[1]
-
-                                except IndexError:
-                                    ft = None
-                                else:
-                                    if ft == 'ng':
-                                        ft = 'Natural Gas'
-
-                                    else:
-                                        pass
-
-                            elif ('and' in ft.lower()) | ('or' in ft.lower()):
-                                ft = ft.split(' ')[1]
-
-                            # Assume that "...Gas-Fired..." equipment refers to natural gas.
-                            elif ft.lower() == 'gas':
-                                ft = 'Natural Gas'
-
-                            elif ft.lower() == 'oil':
-                                ft = 'Residual Fuel Oil'
-
-                    else:
-                        if 'diesel' in ut.lower():
-                            ft = 'Diesel'
-
-                        elif ':' in ut: 
-
-                            try:
-                                x, y = ut.split(': ')
-
-                            except ValueError:
-                                ft = None
-
-                            else:
-
-                                if any([z in x for z in ['Distillate', 'Residual', 'Gas',
-                                                        'Liquid', 'Propane']]):
-                                    ft = x
-                                    ut = y
-
-                                elif any([z in y for z in ['Distillate', 'Residual', 'Gas',
-                                                        'Liquid', 'Propane']]):
-                                    ft = y
-                                    ut = x
-
-                                else:
-                                    ft = None
-
-                        else:
-                            ft = None
-
-            elif r['scc_level_three'] == 'Fuel Fired Equipment':
-
-                if r['sector'] == 'Industrial Processes - Chemical Manuf':
+        data = all_scc.assign(
+            part_a=parts.str[0].where(parts.str.len() == 2),
+            part_b=parts.str[1].where(parts.str.len() == 2),
+            fired_fuel=self.fired_fuel_type(all_scc.scc_level_four)
+            )
 
-                    try:
-                        ft = r['scc_level_four'].split(': ')[1]
-                        ut = r['scc_level_four'].split(': ')[0]
+        unit_type = pd.Series(None, index=all_scc.index, dtype=object)
+        fuel_type = pd.Series(None, index=all_scc.index, dtype=object)
 
-                    except IndexError:
-                        ft = None 
-                        ut = r['scc_level_four']
+        for level_one, level_rules in rules.items():
 
-                else:
+            # SCCs not yet matched by a rule
+            unmatched = data[data.scc_level_one == level_one]
 
-                    ft = r['scc_level_four'].split(': ')[0]
-                    ut = r['scc_level_four'].split(': ')[1]
-                    logging.info(f'Last fuel type is {fuel_types[-1]}\nLast unit type is {unit_types_detail[-1]} ')
+            for rule in level_rules:
+                mask = self.rule_mask(unmatched, rule)
 
-            # elif r['tier_1_description'] == 'Fuel Comb. Industrial':
-            #     ft = f'{r["tier_3_description"]} {"tier_2_description"}'
-            
-            # Cludge for catching technologies that use electricity
-            try:
-                fte = re.search(r'(elec)', ut.lower())
+                matched = unmatched[mask]
 
-            except AttributeError:
-                pass
+                unit_type.loc[matched.index] = self.fill_template(
+                    matched, rule.get('unit_type')
+                    )
 
-            else:
-                if fte:
-                    ft = 'electricity'
+                fuel_type.loc[matched.index] = self.fill_template(
+                    matched, rule.get('fuel_type')
+                    )
 
-                else:
-                    pass
+                unmatched = unmatched[~mask]
 
-            fuel_types.append(ft)
-            unit_types_detail.append(ut)
+        # Cludge for catching technologies that use electricity
+        electric = (all_scc.scc_level_one == 'Industrial Processes') & \
+            unit_type.str.contains('elec', case=False, na=False)
 
-        scc_ind.loc[:, 'unit_type'] = unit_types_detail
-        scc_ind.loc[:, 'fuel_type'] = fuel_types
+        fuel_type[electric] = 'electricity'
 
-        return scc_ind
+        all_scc = all_scc.assign(unit_type=unit_type, fuel_type=fuel_type)
 
+        return all_scc
 
     def main(self):
-        id_scc = SCC_ID()
-        id_scc_df = id_scc.build_id()
+        id_scc_df = self.build_id()
         os.makedirs('./scc', exist_ok=True)
         id_scc_df.to_csv('./scc/iden_scc.csv')
 
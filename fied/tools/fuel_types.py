@@ -0,0 +1,245 @@
+"""Fuel type harmonization shared by NEI and GHGRP
+
+Both data sources report fuel types as free text. Standard fuel types
+are defined by two YAML files:
+
+* tools/type_standardization.yml: exact mapping of reported fuel types
+  (mostly GHGRP) to standard fuel types;
+* nei/unit_conversions.yml (fuel_dict): regular expressions that
+  identify NEI/SCC fuel descriptions.
+
+Both are parsed only once per session, and mappings are applied to the
+unique values of a column and then mapped back to the full column.
+"""
+
+import functools
+import re
+from pathlib import Path
+
+import pandas as pd
+import yaml
+
+
+FIEDPATH = Path(__file__).parents[1]
+
+
+@functools.lru_cache(maxsize=None)
+def _load_type_standardization():
+    """Parse the fuel types (first document) of type_standardization.yml"""
+
+    with open(FIEDPATH / "tools" / "type_standardization.yml", "r") as file:
+        fuel_dict = next(yaml.safe_load_all(file))
+
+    return fuel_dict
+
+
+@functools.lru_cache(maxsize=None)
+def _load_nei_fuel_patterns():
+    """Parse fuel_dict from unit_conversions.yml"""
+
+    with open(FIEDPATH / "nei" / "unit_conversions.yml", "r") as file:
+        fuel_dict = yaml.safe_load(file)["fuel_dict"]
+
+    return fuel_dict
+
+
+class FuelTypeHarmonizer:
+    """
+    Maps reported fuel types to standard fuel types, using an
+    exact-match dictionary and, for values not found in it, a list of
+    compiled regular expressions.
+
+    Parameters
+    ----------
+    exact : dict, optional
+        Mapping of reported fuel type to standard fuel type.
+
+    patterns : dict, optional
+        Mapping of regular expression to standard fuel type, used as
+        fallback for values without an exact match.
+
+    keep_unmatched : bool; default is False
+        If True, values without any match are kept as is. Otherwise,
+        they are mapped to None.
+    """
+
+    def __init__(self, exact=None, patterns=None, keep_unmatched=False):
+
+        self._exact = dict(exact or {})
+
+        self._patterns = [
+            (k, re.compile(k), v) for k, v in (patterns or {}).items()
+            ]
+
+        self._keep_unmatched = keep_unmatched
+
+    def match_pattern(self, fuel):
+        """
+        Find the standard fuel type of a fuel from the regular
+        expressions.
+
+        Fuels with parentheses (e.g., 'distillate oil (diesel)') are
+        searched as literals within the expressions. If more than one
+        expression matches, the one containing the fuel itself is
+        preferred.
+
+        Parameters
+        ----------
+        fuel : str
+            Reported fuel type.
+
+        Returns
+        -------
+        fuel_std : str or None
+            Standard fuel type, or None if there is no match.
+        """
+
+        if '(' in fuel:
+            matches = [(k, v) for k, _, v in self._patterns if fuel in k]
+
+        else:
+            matches = [(k, v) for k, p, v in self._patterns if p.search(fuel)]
+
+        if not matches:
+            return None
+
+        if len(matches) > 1:
+            preferred = [v for k, v in matches if fuel in k]
+
+            if preferred:
+                return preferred[0]
+
+        return matches[0][1]
+
+    def lookup(self, fuel):
+        """
+        Standard fuel type of a single reported fuel type.
+
+        Parameters
+        ----------
+        fuel : str
+            Reported fuel type.
+
+        Returns
+        -------
+        fuel_std : str or None
+        """
+
+        try:
+            return self._exact[fuel]
+
+        except (KeyError, TypeError):
+            pass
+
+        fuel_std = None
+
+        if self._patterns and isinstance(fuel, str):
+            fuel_std = self.match_pattern(fuel)
+
+        if (fuel_std is None) and self._keep_unmatched:
+            fuel_std = fuel
+
+        return fuel_std
+
+    def build_map(self, values):
+        """
+        Mapping of unique reported fuel types to standard fuel types.
+
+        Parameters
+        ----------
+        values : iterable of str
+            Reported fuel types. Duplicates and nulls are ignored.
+
+        Returns
+        -------
+        fuel_map : dict
+        """
+
+        return {v: self.lookup(v) for v in pd.unique(pd.Series(values).dropna())}
+
+    def harmonize(self, fuels):
+        """
+        Standard fuel types of a column of reported fuel types.
+
+        Parameters
+        ----------
+        fuels : pandas.Series
+            Reported fuel types.
+
+        Returns
+        -------
+        fuels_std : pandas.Series
+            Standard fuel types, with the same index as fuels.
+        """
+
+        return fuels.map(self.build_map(fuels), na_action='ignore')
+
+
+@functools.lru_cache(maxsize=None)
+def get_fuel_type_harmonizer():
+    """
+    Harmonizer of reported fuel types (GHGRP and formatted NEI data)
+    to the standard fuel types in type_standardization.yml.
+    """
+
+    return FuelTypeHarmonizer(exact=_load_type_standardization())
+
+
+@functools.lru_cache(maxsize=None)
+def get_nei_fuel_harmonizer():
+    """
+    Harmonizer of NEI and SCC fuel descriptions using the regular
+    expressions of fuel_dict in unit_conversions.yml. Descriptions
+    without a match are kept as is.
+    """
+
+    return FuelTypeHarmonizer(
+        patterns=_load_nei_fuel_patterns(), keep_unmatched=True
+        )
+
+
+def load_fueltype_dict():
+    """
+    Mapping of reported fuel types to standard fuel types, from
+    type_standardization.yml.
+
+    Returns
+    -------
+    fuel_dict : dictionary
+        Dictionary of mappings between GHGRP fuel types and
+        generic fuel types that have been applied to NEI data.
+    """
+
+    return dict(_load_type_standardization())
+
+
+def harmonize_fuel_type(unit_data, fuel_type_column):
+    """
+    Applies fuel type mapping to fuel types reported under GHGRP
+    or NEI.
+
+    Parameters
+    ----------
+    unit_data : pandas.DataFrame
+        Energy estimates with unit information.
+
+    fuel_type_column : str
+        Name of column containing fuel types.
+
+    Returns
+    -------
+    unit_data : pandas.DataFrame
+        Energy estimates with unit information that now
+        have a standardized fuel type (fuelTypeStd).
+    """
+
+    unit_data.loc[:, 'fuelTypeStd'] = get_fuel_type_harmonizer().harmonize(
+        unit_data[fuel_type_column]
+        )
+
+    # drop any fuelTypes that are null
+    unit_data = unit_data.where(
+        unit_data[fuel_type_column] != 'None'
+        ).dropna(how='all')
+
+    return unit_data
@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+
+
+def _sorted_quantiles(values, groups, ngroups, q):
+    """
+    Linear-interpolated quantiles of values by group, using a single
+    sort of (group, value) pairs.
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        Valid (non-null) values.
+
+    groups : numpy.ndarray
+        Group code (0 to ngroups - 1) of each value.
+
+    ngroups : int
+        Number of groups.
+
+    q : list of float
+        Quantiles to calculate, between 0 and 1.
+
+    Returns
+    -------
+    result : numpy.ndarray
+        Array of shape (ngroups, len(q)). Groups without any value
+        are NaN.
+    """
+
+    order = np.lexsort((values, groups))
+    values = values[order]
+
+    counts = np.bincount(groups, minlength=ngroups)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+    result = np.full((ngroups, len(q)), np.nan)
+    has_values = counts > 0
+
+    if not has_values.any():
+        return result
+
+    starts = starts[has_values]
+    last = counts[has_values] - 1
+
+    for i, qi in enumerate(q):
+        # Same (linear) interpolation used by numpy and pandas
+        pos = qi * last
+        lo = np.floor(pos).astype(np.int64)
+        hi = np.ceil(pos).astype(np.int64)
+        frac = pos - lo
+        v_lo = values[starts + lo]
+        v_hi = values[starts + hi]
+        result[has_values, i] = v_lo + (v_hi - v_lo) * frac
+
+    return result
+
+
+def group_quantiles(df, by, columns, q=(0, 0.5, 0.75), labels=None,
+                    positive_only=False):
+    """
+    Calculate quantiles by group, pooling the values of several wide
+    columns, without melting the DataFrame.
+
+    For instance, with columns={'energy_MJ': ['energy_MJ_nei',
+    'energy_MJ_web']}, the quantiles of energy_MJ for each group are
+    based on the values of both energy_MJ_nei and energy_MJ_web, which
+    is equivalent to melting those columns and then calculating
+    the quantiles with a pandas groupby.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Data with group columns and value columns.
+
+    by : list of str
+        Columns to group by. Rows with null keys are ignored.
+
+    columns : dict
+        Mapping of output name to list of value columns pooled together.
+
+    q : sequence of float; default is (0, 0.5, 0.75)
+        Quantiles to calculate.
+
+    labels : sequence of str, optional
+        Suffix used for each quantile in output column names. Defaults
+        to the quantile value.
+
+    positive_only : bool; default is False
+        If True, only values > 0 are used.
+
+    Returns
+    -------
+    quantiles : pandas.DataFrame
+        Quantiles indexed by group, with columns named
+        '{output name}_{label}'. Groups without any valid value are
+        dropped.
+    """
+
+    if labels is None:
+        labels = [str(x) for x in q]
+
+    grouped = df.groupby(by, sort=True)
+    index = grouped.size().index
+    ngroups = len(index)
+
+    codes = grouped.ngroup().fillna(-1).to_numpy(dtype=np.int64)
+
+    results = {}
+
+    for name, value_cols in columns.items():
+
+        values = np.concatenate(
+            [df[c].to_numpy(dtype=float, na_value=np.nan) for c in value_cols]
+            )
+        groups = np.tile(codes, len(value_cols))
+
+        valid = (groups >= 0) & ~np.isnan(values)
+
+        if positive_only:
+            valid &= values > 0
+
+        quants = _sorted_quantiles(
+            values[valid], groups[valid], ngroups, list(q)
+            )
+
+        for i, label in enumerate(labels):
+            results[f'{name}_{label}'] = quants[:, i]
+
+    quantiles = pd.DataFrame(results, index=index)
+
+    quantiles.dropna(how='all', inplace=True)
+
+    return quantiles
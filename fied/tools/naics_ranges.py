@@ -0,0 +1,130 @@
+"""Expansion of NAICS range expressions used by Census tables
+
+Census tables (e.g., the Quarterly Survey of Plant Capacity) aggregate
+NAICS codes in expressions such as:
+
+* '3131-3': NAICS 3131 to 3133;
+* '3161, 2, 9': NAICS 3161, 3162, and 3169;
+* '3341, 4-6': NAICS 3341, 3344, 3345, and 3346.
+
+The first item of an expression is a complete code, or a range of
+codes; later items replace the last digits of the first code. All
+expressions are parsed at once into a mapping table, which expands
+data with a single join.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def expand_naics_ranges(naics):
+    """
+    Map NAICS range expressions to the NAICS codes they include.
+
+    Parameters
+    ----------
+    naics : array-like
+        NAICS codes and range expressions. Values that are not strings
+        with ',' or '-' are not expressions and are ignored.
+
+    Returns
+    -------
+    mapping : pandas.DataFrame
+        Expressions (source_naics) and the NAICS codes (naics) they
+        include, in order.
+    """
+
+    source = pd.Series(pd.unique(np.asarray(naics, dtype=object)))
+
+    source = source[
+        source.map(lambda x: isinstance(x, str)) &
+        source.astype(str).str.contains('[,-]')
+        ]
+
+    if source.empty:
+        return pd.DataFrame({
+            'source_naics': pd.Series([], dtype=object),
+            'naics': pd.Series([], dtype='int64')
+            })
+
+    items = source.str.split(',').explode().str.strip()
+
+    items = items.rename_axis('expression').reset_index(name='item')
+
+    items['position'] = items.groupby('expression').cumcount()
+
+    items[['start', 'end']] = items.item.str.split(
+        '-', n=1, expand=True
+        ).reindex(columns=[0, 1]).to_numpy()
+
+    items['end'] = items.end.fillna(items.start).str.strip()
+    items['start'] = items.start.str.strip()
+
+    width = items.end.str.len()
+
+    # First code of each expression, of which later items replace the
+    # last digits
+    first = items.start.where(items.position == 0).groupby(
+        items.expression
+        ).transform('first')
+
+    items['prefix'] = [f[:len(f) - w] for f, w in zip(first, width)]
+
+    items['start'] = [s[len(s) - w:] for s, w in zip(items.start, width)]
+
+    count = items.end.astype(int) - items.start.astype(int) + 1
+
+    codes = items.loc[items.index.repeat(count.clip(lower=0))]
+
+    offset = codes.groupby(level=0).cumcount()
+
+    suffix = codes.start.astype(int) + offset.to_numpy()
+
+    mapping = pd.DataFrame({
+        'source_naics': source.loc[codes.expression].to_numpy(),
+        'naics': [
+            int(p + str(s).zfill(w)) for p, s, w in
+            zip(codes.prefix, suffix, codes.end.str.len())
+            ]
+        })
+
+    return mapping.drop_duplicates(ignore_index=True)
+
+
+def expand_naics_rows(df, column='NAICS', exclude=()):
+    """
+    Expand rows of data with NAICS range expressions into a row for each
+    NAICS code included.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Data with a column of NAICS codes and range expressions.
+
+    column : str; default is 'NAICS'
+        Column of NAICS codes.
+
+    exclude : list of str, optional
+        Expressions that are kept as is (e.g., '31-33').
+
+    Returns
+    -------
+    df : pandas.DataFrame
+        Expanded data, with the index reset.
+    """
+
+    mapping = expand_naics_ranges(df[column][~df[column].isin(exclude)])
+
+    mapping = mapping.set_index('source_naics').naics
+
+    df = df.reset_index(drop=True)
+
+    expanded = df[column].isin(mapping.index)
+
+    rows = df[expanded].join(mapping, on=column)
+
+    rows[column] = rows.pop('naics')
+
+    df = pd.concat([df[~expanded], rows], axis=0, ignore_index=True)
+
+    return df
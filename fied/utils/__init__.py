@@ -1 +1,6 @@
 from .mod import expect_pandas, expect_polars
+from .debug import (
+    configure_debug_artifacts,
+    debug_artifacts_enabled,
+    save_debug_artifact,
+)
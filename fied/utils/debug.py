@@ -0,0 +1,105 @@
+"""Opt-in sink for intermediate (debug) artifacts
+
+Some stages of the FIED pipeline are useful to inspect while developing
+or troubleshooting, but serializing those intermediate frames on every
+production run is expensive. This module centralizes those dumps: by
+default nothing is written, and once a directory is configured for the
+run, every artifact is saved there as Parquet.
+
+Example
+-------
+>>> from fied.utils import configure_debug_artifacts, save_debug_artifact
+>>> configure_debug_artifacts("./fied_debug")
+>>> save_debug_artifact(df, "nei_check_med_update")
+"""
+
+import logging
+from pathlib import Path
+
+import pandas as pd
+import polars as pl
+import pyarrow as pa
+
+
+module_logger = logging.getLogger(__name__)
+
+_DEBUG_DIR = None
+
+
+def configure_debug_artifacts(path=None):
+    """Enable or disable the debug artifacts for the current run
+
+    Parameters
+    ----------
+    path : str or pathlib.Path, optional
+        Directory where the artifacts are saved. It is created if it
+        does not exist. If None (default), debug artifacts are
+        disabled.
+    """
+    global _DEBUG_DIR
+
+    if path is None:
+        module_logger.debug("Debug artifacts disabled")
+        _DEBUG_DIR = None
+        return
+
+    _DEBUG_DIR = Path(path)
+    _DEBUG_DIR.mkdir(parents=True, exist_ok=True)
+    module_logger.info(f"Saving debug artifacts to {_DEBUG_DIR}")
+
+
+def debug_artifacts_enabled():
+    """Check if debug artifacts are saved in the current run"""
+    return _DEBUG_DIR is not None
+
+
+def _stringify_objects(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast object columns to string
+
+    Intermediate frames often carry columns with mixed types (e.g.
+    numeric IDs read as text in some rows), which Arrow can't
+    serialize as is.
+    """
+    columns = df.select_dtypes(include="object").columns
+    return df.astype({c: "string" for c in columns})
+
+
+def save_debug_artifact(df, name: str):
+    """Save an intermediate DataFrame, if debug artifacts are enabled
+
+    Parameters
+    ----------
+    df : pandas.DataFrame or polars.DataFrame
+        Data to be saved.
+
+    name : str
+        Artifact name, used as the file name (without extension).
+
+    Returns
+    -------
+    filename : pathlib.Path or None
+        Path of the saved artifact, or None if nothing was saved.
+    """
+    if _DEBUG_DIR is None:
+        return None
+
+    filename = _DEBUG_DIR / f"{name}.parquet"
+    module_logger.debug(f"Saving debug artifact {filename}")
+
+    if isinstance(df, pl.DataFrame):
+        df.write_parquet(filename)
+        return filename
+
+    try:
+        df.to_parquet(filename)
+    except (pa.ArrowException, ValueError):
+        try:
+            _stringify_objects(df).to_parquet(filename)
+        except (pa.ArrowException, ValueError) as e:
+            # A debug dump must never break a production run
+            module_logger.warning(
+                f"Could not save debug artifact {name}: {e}"
+            )
+            return None
+
+    return filename
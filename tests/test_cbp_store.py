@@ -0,0 +1,73 @@
+import zipfile
+
+import polars as pl
+
+from fied.datasets import cbp
+
+
+def load_cbp(year):
+    """County CBP data, as published"""
+    return pl.DataFrame({
+        'FIPSTATE': [1, 1, 6, 6],
+        'FIPSCTY': [1, 1, 37, 999],
+        'NAICS': ['------', '311111', '3111//', '322121'],
+        'EMP': [100, 20, 50, 30],
+        'EST': [10, 2, 5, 3],
+        'N1_4': ['3', 'N', '1', '2'],
+        'N1000': [0, 1, 0, 0],
+        })
+
+
+def test_scan_cbp(tmp_path):
+    lf = cbp.scan_cbp([2018, 2022], store=tmp_path, loader=load_cbp)
+
+    assert (tmp_path / 'year=2022' / 'part-0.parquet').exists()
+
+    data = lf.collect()
+
+    assert len(data) == 8
+    assert data.schema['n1_4'] == pl.Int32
+    assert data.schema['n1000'] == pl.Int32
+    assert data.filter(pl.col('naics') == '311111')['n1_4'].null_count() == 2
+    assert data['naics'].null_count() == 2
+    assert sorted(data['county_fips'].unique()) == ['01001', '06037', '06999']
+
+    # Stored years are not loaded again
+    def fail(year):
+        raise AssertionError('CBP loaded again')
+
+    data = cbp.scan_cbp(
+        2022, naics_prefix=['311'], states=[6, '01'], store=tmp_path,
+        loader=fail
+        ).collect()
+
+    assert sorted(data['naics'].to_list()) == ['3111', '311111']
+    assert data['year'].unique().to_list() == [2022]
+
+    data = cbp.scan_cbp(
+        [2018, 2022], naics_prefix='3', states=['06'], store=tmp_path,
+        loader=fail
+        ).collect()
+
+    assert data['naics'].to_list() == ['3111', '322121'] * 2
+
+
+def test_scan_cbp_unregistered_year(tmp_path, monkeypatch):
+    fzname = tmp_path / 'cbp16co.zip'
+
+    with zipfile.ZipFile(fzname, 'w') as zf:
+        zf.writestr('cbp16co.txt', load_cbp(2016).write_csv())
+
+    urls = []
+
+    def retrieve(url, **_kwargs):
+        urls.append(url)
+        return str(fzname)
+
+    monkeypatch.setattr(cbp.pooch, 'retrieve', retrieve)
+
+    data = cbp.scan_cbp(2016, store=tmp_path / 'store').collect()
+
+    assert urls == [cbp.CBP_DATA_URL + '2016/cbp16co.zip']
+    assert len(data) == 4
+    assert data['year'].unique().to_list() == [2016]
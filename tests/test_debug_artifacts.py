@@ -0,0 +1,32 @@
+import pandas as pd
+import polars as pl
+
+from fied.utils import (
+    configure_debug_artifacts,
+    debug_artifacts_enabled,
+    save_debug_artifact,
+)
+
+
+def test_disabled_by_default(tmp_path):
+    configure_debug_artifacts(None)
+
+    assert debug_artifacts_enabled() is False
+    assert save_debug_artifact(pd.DataFrame({"a": [1]}), "test") is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_save_parquet(tmp_path):
+    configure_debug_artifacts(tmp_path / "debug")
+
+    try:
+        df = pd.DataFrame({"a": [1, 2], "b": ["x", 3]})
+        fname = save_debug_artifact(df, "mixed")
+        assert fname == tmp_path / "debug" / "mixed.parquet"
+        assert pd.read_parquet(fname).shape == (2, 2)
+
+        fname = save_debug_artifact(pl.DataFrame({"a": [1, 2]}), "pl")
+        assert pl.read_parquet(fname).shape == (2, 1)
+
+    finally:
+        configure_debug_artifacts(None)
@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+
+from fied.ghgrp import energy_uncertainty
+from fied.ghgrp.ghgrp_fac_unit import GHGRP_unit_char
+from fied.ghgrp.heat_rate_uncertainty import FuelUncertainty
+
+
+def test_relative_uncertainty():
+    index = pd.MultiIndex.from_tuples(
+        [(2015, 'Coal'), (2015, 'Natural Gas')],
+        names=['reporting_year', 'fuel_type']
+        )
+    hhv = pd.DataFrame({'mean': [20, 1], 'sample_std': [0.6, 0.01]}, index=index)
+    cc = pd.DataFrame({'mean': [70], 'sample_std': [2.8]}, index=index[:1])
+
+    rel_std = energy_uncertainty.relative_uncertainty(hhv=hhv, cc=cc)
+
+    np.testing.assert_allclose(rel_std.values, [0.05, 0.01])
+    assert rel_std.index.names == ['REPORTING_YEAR', 'FUEL_TYPE']
+
+    assert energy_uncertainty.relative_uncertainty().empty
+
+
+def test_sample_percentiles():
+    energy = np.array([10., 20., 30., 5.])
+    keys = ['Coal', 'Coal', 'Natural Gas', 'Coal']
+    groups = [2, 1, 1, 0]
+
+    # No uncertainty: sums by group
+    np.testing.assert_allclose(
+        energy_uncertainty.sample_percentiles(
+            energy, np.zeros(4), keys, groups, percentiles=(5, 95)
+            ),
+        [[5, 5], [50, 50], [10, 10]]
+        )
+
+    rel_std = np.array([0.2, 0.2, 0.1, 0.2])
+
+    serial = energy_uncertainty.sample_percentiles(
+        energy, rel_std, keys, groups, n_samples=20000
+        )
+
+    parallel = energy_uncertainty.sample_percentiles(
+        energy, rel_std, keys, groups, n_samples=20000, chunk_size=1,
+        workers=2
+        )
+
+    np.testing.assert_allclose(serial, parallel)
+
+    # Lognormal with a mean of 1 (coal factors are shared by groups 0 and 2)
+    sigma = np.sqrt(np.log1p(0.2**2))
+    np.testing.assert_allclose(
+        serial[[0, 2], 1] / [5, 10], np.exp(-sigma**2 / 2), rtol=0.01
+        )
+    np.testing.assert_allclose(serial[0] / 5, serial[2] / 10)
+    assert serial[1, 0] < 50 < serial[1, 2]
+
+    assert energy_uncertainty.percentile_columns('energyMJ', (2.5, 50)) == [
+        'energyMJp2.5', 'energyMJp50'
+        ]
+
+
+def test_unit_energy_percentiles():
+    # Other fuels have no fuel type, nor relative uncertainty
+    ghgrp_df = pd.DataFrame({
+        'REPORTING_YEAR': [2017, 2017],
+        'UNIT_NAME': ['B1', 'B2'],
+        'FUEL_TYPE': ['Wood', None],
+        'FUEL_TYPE_FINAL': ['Wood', 'Wood'],
+        'TJ_TOTAL': [1., 1.],
+        'ENERGY_REL_STD': [0.2, np.nan],
+        })
+
+    unit_char = GHGRP_unit_char.__new__(GHGRP_unit_char)
+
+    energy_pctl = unit_char.calc_energy_percentiles(ghgrp_df, ['UNIT_NAME'])
+
+    assert energy_pctl.columns.tolist() == [
+        'energyMJp5', 'energyMJp50', 'energyMJp95'
+        ]
+
+    # Sampled with the relative uncertainty of its (year, fuel type)
+    assert energy_pctl.energyMJp5[0] < 10**6 < energy_pctl.energyMJp95[0]
+    np.testing.assert_allclose(energy_pctl.loc[1].values, 10**6)
+
+
+def test_percentiles_by_number_of_records(tmp_path):
+    rng = np.random.default_rng(0)
+
+    # HHVs of units with a relative standard deviation of 0.1
+    widths = []
+
+    for n in [50, 5000]:
+        data = pd.DataFrame({
+            'reporting_year': 2015, 'fuel_type': 'Coal',
+            'high_heat_value': rng.normal(20, 2, n),
+            })
+
+        (tmp_path / str(n)).mkdir()
+
+        hhv = FuelUncertainty.tier_bootstrap(
+            data, 'high_heat_value', 'hhv', iterations=200, workers=1,
+            uncert_dir=tmp_path / str(n)
+            )
+
+        rel_std = energy_uncertainty.relative_uncertainty(hhv=hhv)
+
+        p5, p95 = energy_uncertainty.sample_percentiles(
+            [1.], rel_std.values, ['Coal'], percentiles=(5, 95),
+            n_samples=20000
+            )[0]
+
+        widths.append(p95 - p5)
+
+    # The spread of a unit's estimate does not shrink with more records
+    np.testing.assert_allclose(widths, 2 * 1.645 * 0.1, rtol=0.15)
@@ -0,0 +1,28 @@
+import pandas as pd
+
+from fied.frs.frs_extraction import FRS
+
+
+def test_format_program_csv():
+    data = pd.DataFrame({
+        'REGISTRY_ID': [1, 1, 1, 2, 2, 3, 4],
+        'PGM_SYS_ACRNM': ['EIS', 'EIS', 'EIS', 'E-GGRT', 'EIS', 'TRIS', 'EIS'],
+        'PGM_SYS_ID': ['a', 'b', 'c', 'g1', 'e2', 't1', 'x'],
+        'SMALL_BUS_IND': ['N', 'N', 'N', 'Y', 'Y', 'N', 'N']
+        })
+
+    data = FRS().format_program_csv(data, ['EIS', 'E-GGRT', 'TRIS'])
+    data.set_index('REGISTRY_ID', inplace=True)
+
+    assert data.columns.tolist() == [
+        'SMALL_BUS_IND',
+        'PGM_SYS_ID_EIS', 'PGM_SYS_ID_EIS_additional',
+        'PGM_SYS_ID_E-GGRT', 'PGM_SYS_ID_E-GGRT_additional',
+        'PGM_SYS_ID_TRIS', 'PGM_SYS_ID_TRIS_additional'
+        ]
+    assert data.loc[1, 'PGM_SYS_ID_EIS'] == 'a'
+    assert data.loc[1, 'PGM_SYS_ID_EIS_additional'] == 'b, c'
+    assert data.loc[2, 'PGM_SYS_ID_E-GGRT'] == 'g1'
+    assert data.loc[3, 'PGM_SYS_ID_TRIS'] == 't1'
+    assert bool(data.loc[2, 'SMALL_BUS_IND'])
+    assert data.PGM_SYS_ID_EIS_additional.notnull().sum() == 1
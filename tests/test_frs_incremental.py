@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fied import datasets
+from fied.frs.frs_extraction import FRS
+
+
+def write_frs_files(path, program, naics, facility):
+    frs = FRS()
+    fnames = []
+
+    for name, data in zip(['PROGRAM', 'NAICS', 'FACILITY'],
+                          [program, naics, facility]):
+        data = pd.DataFrame(data)
+        data = data.reindex(columns=frs.names_columns[name])
+        fname = path / f'NATIONAL_{name}_FILE.CSV'
+        data.to_csv(fname, index=False)
+        fnames.append(str(fname))
+
+    return fnames
+
+
+@pytest.fixture
+def frs_files(tmp_path, monkeypatch):
+    raw_dir = tmp_path / 'raw'
+    raw_dir.mkdir()
+
+    program = {
+        'REGISTRY_ID': [1, 2, 3, 4],
+        'PGM_SYS_ACRNM': ['EIS', 'E-GGRT', 'EIS', 'EIS'],
+        'PGM_SYS_ID': ['e1', 'g2', 'e3', 'e4'],
+        'SMALL_BUS_IND': ['N', 'N', 'Y', 'N'],
+        }
+    naics = {
+        'REGISTRY_ID': [1, 2, 3, 4, 1],
+        'NAICS_CODE': [311111, 325110, 331110, 541110, 311119],
+        'PGM_SYS_ACRNM': ['EIS', 'E-GGRT', 'EIS', 'EIS', 'EIS'],
+        }
+    facility = {
+        'REGISTRY_ID': [1, 2, 3, 4],
+        'LATITUDE83': [40.0, 41.0, 42.0, 43.0],
+        'LONGITUDE83': [-100.0, -101.0, -102.0, -103.0],
+        }
+
+    def update(**kwargs):
+        fnames = write_frs_files(
+            raw_dir, kwargs.get('program', program),
+            kwargs.get('naics', naics), kwargs.get('facility', facility)
+            )
+        monkeypatch.setattr(datasets, 'fetch_frs', lambda **_kwargs: fnames)
+
+    update()
+
+    return update, program, naics, facility
+
+
+def test_import_format_frs_incremental(tmp_path, frs_files):
+    update, program, naics, facility = frs_files
+    snapshot = tmp_path / 'snapshot'
+
+    first_data, changes = FRS().import_format_frs_incremental(snapshot)
+    data = first_data
+
+    # Registry ID 4 is not an industrial facility
+    assert sorted(data.index) == [1, 2, 3]
+    assert sorted(changes['inserted'].index) == [1, 2, 3]
+    assert changes['updated'].empty
+    assert changes['deleted'].empty
+
+    # Move facility 2, drop facility 3, add facility 5
+    facility = {k: v[:2] + [v[3]] for k, v in facility.items()}
+    facility['LATITUDE83'][1] = 45.0
+    facility['REGISTRY_ID'].append(5)
+    facility['LATITUDE83'].append(44.0)
+    facility['LONGITUDE83'].append(-104.0)
+    naics = {k: v + [v[0]] for k, v in naics.items()}
+    naics['REGISTRY_ID'][-1] = 5
+    update(facility=facility, naics=naics)
+
+    data, changes = FRS().import_format_frs_incremental(snapshot)
+
+    assert changes['inserted'].index.tolist() == [5]
+    assert changes['updated'].index.tolist() == [2]
+    assert changes['updated'].loc[2, 'latitude'] == 45.0
+    assert changes['deleted'].tolist() == [3]
+
+    full_data = FRS().import_format_frs()
+
+    # Facility 1 (unchanged, read from the snapshot) has additional NAICS
+    assert isinstance(data.loc[1, 'naicsCodeAdditional'], list)
+
+    # Written the same as data of a full run
+    assert data.sort_index().to_csv() == full_data.sort_index().to_csv()
+
+    updated = FRS.apply_frs_changes(first_data, changes)
+
+    assert sorted(updated.index) == [1, 2, 5]
+    assert updated.loc[2, 'latitude'] == 45.0
+
+
+def test_hash_registry_rows_missing_value():
+    data = pd.DataFrame({
+        'REGISTRY_ID': [1, 2],
+        'NAICS_CODE': [311111, 325110],
+        'LATITUDE83': [40.0, 41.5],
+        })
+
+    # A new row with a blank NAICS code makes the column float
+    new_data = pd.concat([data, pd.DataFrame({
+        'REGISTRY_ID': [3], 'NAICS_CODE': [np.nan], 'LATITUDE83': [42.0]
+        })], ignore_index=True)
+
+    assert new_data.NAICS_CODE.dtype == 'float64'
+
+    old_hash = FRS.hash_registry_rows(data)
+    new_hash = FRS.hash_registry_rows(new_data)
+
+    assert new_hash.loc[[1, 2]].tolist() == old_hash.loc[[1, 2]].tolist()
+
+    diff = FRS.diff_registry_hashes(new_hash, old_hash)
+
+    assert diff['inserted'].tolist() == [3]
+    assert diff['updated'].empty
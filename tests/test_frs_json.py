@@ -0,0 +1,64 @@
+import gzip
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fied.frs.frs_extraction import FRS
+
+
+@pytest.fixture
+def frs_data():
+    return pd.DataFrame({
+        'REGISTRY_ID': [110000001, 110000002, 110000003],
+        'CITY_NAME': ['GOLDEN', 'DENVER', None],
+        'POSTAL_CODE': [80401.0, np.nan, 80202.0],
+        'LATITUDE83': [39.74, 39.73, np.nan],
+        'NAICS_CODE': ['325110', 311111.0, 331110],
+        'NAICS_CODE_additional': [[324110, 325120], None, [331111]],
+        })
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_frs_json_round_trip(tmp_path, frs_data, workers):
+    frs = FRS()
+
+    records = frs.build_frs_json(
+        frs_data, save_path=tmp_path, ret=True, chunksize=2, workers=workers
+        )
+
+    fname = tmp_path / 'found_ind_data.ndjson.gz'
+
+    # One JSON object per line
+    with gzip.open(fname, 'rt') as f:
+        assert len(f.read().splitlines()) == 3
+
+    assert records[0] == {
+        'REGISTRY_ID': 110000001,
+        'site': {'CITY_NAME': 'GOLDEN', 'POSTAL_CODE': 80401},
+        'facility': {
+            'LATITUDE83': 39.74, 'NAICS_CODE_additional': [324110, 325120],
+            'NAICS_CODE': 325110
+            },
+        }
+
+    chunks = list(FRS.iter_foundational_json(fname, chunksize=2))
+
+    assert [len(c) for c in chunks] == [2, 1]
+
+    data = pd.concat(chunks, axis=0)
+
+    assert data.index.tolist() == frs_data.REGISTRY_ID.tolist()
+    assert data.CITY_NAME.tolist() == ['GOLDEN', 'DENVER', None]
+    assert data.NAICS_CODE.tolist() == [325110, 311111, 331110]
+    assert data.NAICS_CODE_additional.tolist() == \
+        [[324110, 325120], None, [331111]]
+
+    for c in ['POSTAL_CODE', 'LATITUDE83']:
+        pd.testing.assert_series_equal(
+            data[c].astype(float), frs_data.set_index('REGISTRY_ID')[c]
+            )
+
+    pd.testing.assert_frame_equal(
+        FRS.load_foundational_json(fname, chunksize=2), data
+        )
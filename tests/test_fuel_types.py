@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from fied.tools.fuel_types import (
+    get_fuel_type_harmonizer,
+    get_nei_fuel_harmonizer,
+    harmonize_fuel_type,
+)
+
+
+def test_nei_fuel_patterns():
+    fuels = pd.Series([
+        'natural gas', 'distillate oil (diesel)', 'residual oil',
+        'bituminous coal', 'petroleum coke', 'sawdust', np.nan,
+        'natural gas'
+        ])
+
+    result = get_nei_fuel_harmonizer().harmonize(fuels)
+
+    assert result.tolist()[:6] == [
+        'natural_gas', 'distillate_oil', 'residual_oil', 'bituminous',
+        'pet_coke', 'sawdust'
+        ]
+    assert np.isnan(result[6])
+    assert result[7] == 'natural_gas'
+
+
+def test_harmonize_fuel_type():
+    df = pd.DataFrame({
+        'fuelType': ['Natural Gas (Weighted U.S. Average)', 'Bituminous',
+                     'Unknown fuel', 'None'],
+        'energyMJ': [1., 2., 3., 4.]
+        })
+
+    df = harmonize_fuel_type(df, 'fuelType')
+
+    assert len(df) == 3
+    assert df.fuelTypeStd[:2].tolist() == ['naturalGas', 'coal']
+    assert df.fuelTypeStd.isnull()[2]
+
+
+def test_harmonizer_is_cached():
+    assert get_fuel_type_harmonizer() is get_fuel_type_harmonizer()
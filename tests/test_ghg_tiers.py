@@ -0,0 +1,104 @@
+import pandas as pd
+import pytest
+
+from fied.ghgrp import ghg_tiers
+from fied.ghgrp.ghgrp_store import GHGRPStore
+
+
+def tier_records(table, year):
+    """Monthly tier records (as returned by the API) of one unit"""
+
+    records = pd.DataFrame({
+        'FACILITY_ID': ['1', '1', '1'],
+        'REPORTING_YEAR': [str(year)] * 3,
+        'FUEL_TYPE': ['Bituminous'] * 3,
+        'UNIT_NAME': ['B1'] * 3,
+        'MONTH': ['January', 'January', 'February'],
+        'FUEL_COMBUSTED': ['10', '30', '20'],
+        })
+
+    if table == 'C_T2EQC2AMONTHLYINPUTS':
+        records['HIGH_HEAT_VALUE'] = ['20', '24', '26']
+        records['HIGH_HEAT_VALUE_UOM'] = 'mmBtu/short ton'
+
+    elif table == 'C_T2EQC2CMONTHLYINPUTS':
+        records = records.rename(columns={'FUEL_COMBUSTED': 'MASS_OF_STEAM'})
+        records['BOILER_RATIO_B'] = ['1', '1', '2']
+
+    elif table == 'C_T3EQC3C8MONTHLYINPUTS':
+        records['CARBON_CONTENT'] = ['0.7', '0.7', '0.8']
+
+    else:
+        records = records.iloc[0:0]
+
+    return records
+
+
+@pytest.fixture
+def tier_energy(tmp_path, monkeypatch):
+    calls = []
+
+    def fetch(table, year):
+        calls.append((table, year))
+        return tier_records(table, year)
+
+    monkeypatch.setattr(ghg_tiers, '_fetch_tier_records', fetch)
+    monkeypatch.setattr(
+        ghg_tiers.TierEnergy, 'tier_store',
+        GHGRPStore(tmp_path, schemas=ghg_tiers.TierEnergy.tier_schemas)
+        )
+    monkeypatch.setattr(ghg_tiers.TierEnergy, '_tier_wa_cache', {})
+
+    return calls
+
+
+def test_tier_table_wa(tier_energy):
+    tiers = ghg_tiers.TierEnergy(years=[2015, 2016])
+
+    hhv = tiers.t2hhv_data_annual.loc[(1, 2015, 'Bituminous', 'B1')]
+
+    # Monthly means (January: 20 of fuel at 22), weighted by fuel
+    assert hhv.high_heat_value_wa == pytest.approx((20 * 22 + 20 * 26) / 40)
+    assert hhv.energy_mmbtu == pytest.approx(10 * 20 + 30 * 24 + 20 * 26)
+    assert hhv.fuel_combusted == 60
+
+    assert tiers.t2boiler_data_annual.boiler_ratio_b_wa.tolist() == \
+        pytest.approx([(20 * 1 + 20 * 2) / 40] * 2)
+
+    t3 = tiers.t3_data_annual
+    assert t3.carbon_content_wa.tolist() == pytest.approx([0.75] * 2)
+
+    assert tiers.t2hhv_data_annual.index.get_level_values(
+        'REPORTING_YEAR'
+        ).tolist() == [2015, 2016]
+
+    # Cached by year
+    n_calls = len(tier_energy)
+    ghg_tiers.TierEnergy(years=[2016])
+    assert len(tier_energy) == n_calls
+
+
+def test_tier_table_wa_before_2014(tier_energy):
+    tiers = ghg_tiers.TierEnergy(years=[2012])
+
+    assert tiers.t2hhv_data_annual.empty
+    assert tiers.t3_data_annual.empty
+    assert not tier_energy
+
+
+def test_tier_bootstrap_workers(tier_energy, monkeypatch):
+    workers = []
+
+    def tier_bootstrap(data, value_col, data_abbrev, **kwargs):
+        workers.append(kwargs['workers'])
+        return pd.DataFrame()
+
+    monkeypatch.setattr(
+        ghg_tiers.hr_uncert.FuelUncertainty, 'tier_bootstrap', tier_bootstrap
+        )
+
+    tiers = ghg_tiers.TierEnergy(years=[2015], calc_uncert=True, workers=1)
+
+    # Years of a time series run in parallel bootstrap in one process
+    assert workers == [1] * 4
+    assert sorted(tiers.tier_uncertainty) == ['br', 'cc', 'hhv', 'mw']
@@ -0,0 +1,176 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fied.ghgrp import ghg_tiers
+
+
+# Outputs of the previous (per fuel category) tier calculations on the
+# synthetic subpart C records of subpart_c
+RECORDED = Path(__file__).parent / 'ghgrp_tier_energy_synthetic.csv'
+
+NG = 'Natural Gas (Weighted U.S. Average)'
+
+TIER_COLUMNS = {
+    'tier1': 'TIER1_CO2_COMBUSTION_EMISSIONS',
+    'tier2': 'TIER2_CO2_COMBUSTION_EMISSIONS',
+    'tier3': 'TIER3_CO2_COMBUSTION_EMISSIONS',
+    'tier4': 'T4CH4COMBUSTIONEMISSIONS',
+    }
+
+
+def subpart_c():
+    """
+    Synthetic subpart C records (random emissions, labelled as reporting
+    year 2016) covering the paths of each tier
+    """
+
+    rows = [
+        # tier, facility, unit, FUEL_TYPE, FUEL_TYPE_OTHER, FUEL_TYPE_BLEND
+        ('tier1', 1, 'B1', NG, None, None),
+        ('tier1', 1, 'B2', None, 'Fuel Gas', None),
+        ('tier1', 2, 'B3', None, None, 'Propane'),
+        ('tier1', 2, 'B4', 'Bituminous', None, 'Petroleum Coke'),
+        ('tier1', 3, 'B5', 'Mystery', None, None),
+        ('tier2', 4, 'K1', 'Bituminous', None, None),
+        ('tier2', 4, 'K2', 'Bituminous', None, None),
+        ('tier2', 5, 'K3', 'Bituminous', None, None),
+        ('tier2', 5, 'K4', 'Subbituminous', None, None),
+        ('tier2', 5, 'K5', None, 'Wood and Wood Residuals (dry basis)', None),
+        ('tier2', 6, 'K6', 'Mystery', None, None),
+        ('tier3', 7, 'H1', NG, None, None),
+        ('tier3', 7, 'H2', NG, None, None),
+        ('tier3', 8, 'H3', 'Blast Furnace Gas', None, None),
+        ('tier3', 8, 'H4', None, None, 'Coke Oven Gas'),
+        ('tier4', 9, 'T1', 'Bituminous', None, None),
+        ('tier4', 9, 'T2', NG, None, None),
+        ('tier4', 9, 'T3', None, 'Wood and Wood Residuals', None),
+        ]
+
+    data = pd.DataFrame(rows, columns=[
+        'tier', 'FACILITY_ID', 'UNIT_NAME', 'FUEL_TYPE', 'FUEL_TYPE_OTHER',
+        'FUEL_TYPE_BLEND'
+        ])
+
+    rng = np.random.default_rng(2016)
+
+    data['REPORTING_YEAR'] = 2016
+    data['FACILITY_NAME'] = 'Facility ' + data.FACILITY_ID.astype(str)
+    data['UNIT_TYPE'] = 'OCS (Other combustion source)'
+    data['MTCO2e_TOTAL'] = rng.uniform(1, 100, len(data)).round(3)
+
+    for tier, c in TIER_COLUMNS.items():
+        data[c] = np.where(
+            data.tier == tier, rng.uniform(10, 1000, len(data)).round(3),
+            np.nan
+            )
+
+    data['ANNUAL_HEAT_INPUT'] = np.where(data.UNIT_NAME == 'T1', 5000., np.nan)
+    data['TIER3_EQ_C5_FUEL_QTY'] = np.where(data.UNIT_NAME == 'H3', 2e6, np.nan)
+    data['TIER3_EQ_C8_HHV_GAS'] = np.where(data.UNIT_NAME == 'H3', 9e-5, np.nan)
+
+    return data.drop(columns='tier')
+
+
+def tier_annual():
+    """Annual tier 2 and tier 3 data"""
+
+    index = ['FACILITY_ID', 'REPORTING_YEAR', 'FUEL_TYPE', 'UNIT_NAME']
+
+    t2hhv = pd.DataFrame([
+        (4, 2016, 'Bituminous', 'K1', 1200., 50., 24.),
+        (4, 2016, NG, 'X9', 515., 5e5, 0.00103),
+        ], columns=index + ['energy_mmbtu', 'fuel_combusted',
+                            'high_heat_value_wa']).set_index(index)
+
+    t2boiler = pd.DataFrame([
+        (10, 2016, 'Tires', 'Z1', 10., 2.),
+        ], columns=index + ['energy_mmbtu', 'boiler_ratio_b_wa']).set_index(index)
+
+    t3 = pd.DataFrame([
+        (7, 2016, NG, 'H1', 1030., 1e6, 0.7, 18.),
+        ], columns=index + ['energy_mmbtu', 'fuel_combusted',
+                            'carbon_content_wa', 'molecular_weight_wa']
+        ).set_index(index)
+
+    return {'t2_hhv': t2hhv, 't2_boiler': t2boiler, 't3': t3}
+
+
+def std_efs():
+    """Standard emission factors, as formatted by GHGRP"""
+
+    efs = pd.read_csv(
+        Path(ghg_tiers.__file__).parents[1] / 'data' / 'GHGRP' / 'EPA_FuelEFs.csv',
+        index_col=['Fuel_Type']
+        )
+
+    efs.index.name = 'FUEL_TYPE'
+
+    return efs[~efs.index.duplicated()]
+
+
+def tier_energy(monkeypatch):
+    annual = tier_annual()
+
+    monkeypatch.setattr(
+        ghg_tiers.TierEnergy, 'tier_table_wa', lambda _self, t: annual[t]
+        )
+
+    return ghg_tiers.TierEnergy(years=[2016], std_efs=std_efs())
+
+
+def sort_energy(energy):
+    """Energy estimates in a comparable order"""
+
+    columns = ['FACILITY_ID', 'UNIT_NAME', 'FUEL_TYPE', 'FUEL_TYPE_OTHER',
+               'FUEL_TYPE_BLEND', 'energy_mmbtu']
+
+    energy = energy.reindex(columns=columns)
+
+    energy = energy.astype({
+        c: object for c in ['FUEL_TYPE', 'FUEL_TYPE_OTHER', 'FUEL_TYPE_BLEND']
+        })
+
+    energy = energy.where(energy.notnull(), None)
+
+    return energy.sort_values(
+        columns, na_position='first', key=lambda x: x.astype(str)
+        ).reset_index(drop=True)
+
+
+@pytest.mark.parametrize('tier', list(TIER_COLUMNS))
+def test_tier_parity(monkeypatch, tier):
+    tiers = tier_energy(monkeypatch)
+
+    energy = sort_energy(getattr(tiers, f'{tier}_calc')(subpart_c()))
+
+    recorded = pd.read_csv(RECORDED).query("tier == @tier").drop(columns='tier')
+    recorded = sort_energy(recorded)
+
+    pd.testing.assert_frame_equal(
+        energy.drop(columns='energy_mmbtu'),
+        recorded.drop(columns='energy_mmbtu'),
+        check_dtype=False
+        )
+
+    np.testing.assert_allclose(
+        energy.energy_mmbtu.astype(float), recorded.energy_mmbtu.astype(float),
+        rtol=1e-9
+        )
+
+
+def test_calc_all_tiers(monkeypatch):
+    tiers = tier_energy(monkeypatch)
+
+    # Index of subpart C data is not used by calc_all_tiers
+    energy = tiers.calc_all_tiers(subpart_c().set_index('UNIT_NAME', drop=False))
+
+    recorded = pd.read_csv(RECORDED)
+
+    assert len(energy) == len(recorded)
+
+    np.testing.assert_allclose(
+        energy.MMBtu_TOTAL.sum(), recorded.energy_mmbtu.sum(), rtol=1e-9
+        )
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from fied.ghgrp.corrections import apply_corrections, load_corrections
+
+
+def test_apply_corrections():
+    data = pd.DataFrame({
+        'FACILITY_ID': [1001143, 1001143, 1005675, 1000415, 1000229, 1000229, 1001892],
+        'REPORTING_YEAR': [2014, 2015, 2014, 2012, 2011, 2011, 2013],
+        'FUEL_TYPE': ['Natural Gas', 'Natural Gas', 'Coal', 'Bituminous',
+                      'Wood and Wood Residuals', 'Bituminous',
+                      'Wood and Wood Residuals (dry basis)'],
+        'T4CH4COMBUSTIONEMISSIONS': [5000., 5000., np.nan, 10., 7.2, 7.2, 7.2],
+        'T4N2OCOMBUSTIONEMISSIONS': [2000., 2000., np.nan, 10., 1., 1., 1.],
+        'TIER4_CH4_EMISSIONS_CO2E': [1., 1., np.nan, 10., 1., 1., 1.],
+        'TIER4_N2O_EMISSIONS_CO2E': [1., 1., np.nan, 10., 1., 1., 1.],
+        'ANNUAL_HEAT_INPUT': [100., 100., np.nan, 1., 1., 1., 1.],
+        'TIER2_CH4_COMBUSTION_EMISSIONS': [np.nan, np.nan, 2., np.nan, np.nan, np.nan, np.nan],
+        'TIER2_CH4_EMISSIONS_CO2E': [np.nan, np.nan, 1., np.nan, np.nan, np.nan, np.nan],
+        'TIER2_N2O_COMBUSTION_EMISSIONS': [np.nan, np.nan, 3., np.nan, np.nan, np.nan, np.nan],
+        'TIER2_N2O_EMISSIONS_CO2E': [np.nan, np.nan, 1., np.nan, np.nan, np.nan, np.nan],
+        })
+
+    corrections = load_corrections().query("subpart == 'subpartC'")
+
+    data = apply_corrections(data, corrections)
+
+    np.testing.assert_allclose(
+        data.T4CH4COMBUSTIONEMISSIONS,
+        [0.005, 5000, np.nan, 1, 1.9, 7.2, 1.9]
+        )
+    np.testing.assert_allclose(
+        data.T4N2OCOMBUSTIONEMISSIONS, [2, 2000, np.nan, 1, 1, 1, 1]
+        )
+    np.testing.assert_allclose(
+        data.TIER4_N2O_EMISSIONS_CO2E, [1, 1, np.nan, 1, 1, 1, 1]
+        )
+    assert data.ANNUAL_HEAT_INPUT.isnull().tolist() == [
+        True, False, True, False, False, False, False
+        ]
+    np.testing.assert_allclose(
+        data.TIER2_CH4_EMISSIONS_CO2E[2], 2 * 25.135135
+        )
+    assert data.TIER2_N2O_EMISSIONS_CO2E[2] == 900
+
+
+def test_corrections_registry():
+    corrections = load_corrections()
+
+    assert set(corrections.operation) <= {'derive', 'multiply', 'set_null'}
+    assert corrections.facility_id.notnull().all()
+    assert not corrections.duplicated().any()
+    assert (corrections.query("operation == 'derive'").source.notnull()).all()
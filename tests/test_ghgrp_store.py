@@ -0,0 +1,92 @@
+import json
+
+import pandas as pd
+
+from fied.ghgrp.ghgrp_store import GHGRPStore, table_schema
+
+
+def test_ghgrp_store(tmp_path):
+    calls = []
+
+    def loader(table, year):
+        calls.append((table, year))
+        return pd.DataFrame({
+            'FACILITY_ID': ['1001', '1002'],
+            'REPORTING_YEAR': [str(year)] * 2,
+            'FUEL_TYPE': ['Natural Gas', None],
+            'ANNUAL_HEAT_INPUT': ['1.5', None],
+            'UNIT_NAME': ['CP-1', 1],
+            })
+
+    store = GHGRPStore(tmp_path, workers=2)
+
+    data = store.read(
+        'C_FUEL_LEVEL_INFORMATION', [2015, 2016],
+        columns=['ANNUAL_HEAT_INPUT', 'FACILITY_ID', 'REPORTING_YEAR', 'MISSING'],
+        loader=loader
+        )
+
+    assert sorted(calls) == [
+        ('C_FUEL_LEVEL_INFORMATION', 2015), ('C_FUEL_LEVEL_INFORMATION', 2016)
+        ]
+    # Table order, missing columns ignored
+    assert list(data.columns) == [
+        'FACILITY_ID', 'REPORTING_YEAR', 'ANNUAL_HEAT_INPUT'
+        ]
+    assert data.REPORTING_YEAR.tolist() == [2015, 2015, 2016, 2016]
+    assert pd.api.types.is_integer_dtype(data.FACILITY_ID)
+    assert pd.api.types.is_float_dtype(data.ANNUAL_HEAT_INPUT)
+
+    manifest = json.loads((tmp_path / 'manifest.json').read_text())
+    entry = manifest['C_FUEL_LEVEL_INFORMATION']['2016']
+    assert entry['file'] == 'C_FUEL_LEVEL_INFORMATION/year=2016/part-0.parquet'
+    assert entry['rows'] == 2
+
+    # Stored years are not loaded again
+    data = store.read('C_FUEL_LEVEL_INFORMATION', [2016], loader=loader)
+    assert len(calls) == 2
+    assert data.UNIT_NAME.tolist() == ['CP-1', '1']
+    assert data.FUEL_TYPE.isnull().tolist() == [False, True]
+
+
+def test_ghgrp_store_schema(tmp_path):
+    table = 'C_FUEL_LEVEL_INFORMATION'
+
+    def loader(table, year):
+        data = pd.DataFrame({
+            'FACILITY_ID': ['1001', '1002'],
+            'REPORTING_YEAR': [str(year)] * 2,
+            'FUEL_TYPE_OTHER': [None, None],
+            'ANNUAL_HEAT_INPUT': ['1.5', 'n/a'],
+            'OTHER': [None, None],
+            })
+
+        # Columns all null in 2015 have values in 2016
+        if year == 2016:
+            data['FUEL_TYPE_OTHER'] = ['Tires', None]
+            data['OTHER'] = ['x', None]
+
+        return data
+
+    schema = table_schema(
+        ['FACILITY_ID', 'REPORTING_YEAR', 'FUEL_TYPE_OTHER',
+         'ANNUAL_HEAT_INPUT', 'TIER1_CO2_COMBUSTION_EMISSIONS'],
+        integer=['FACILITY_ID', 'REPORTING_YEAR'], text=['FUEL_TYPE_OTHER']
+        )
+
+    # Partition saved before the schema was set
+    GHGRPStore(tmp_path).read(table, [2015], loader=loader)
+
+    store = GHGRPStore(tmp_path, schemas={table: schema})
+    data = store.read(table, [2015, 2016], loader=loader)
+
+    manifest = json.loads((tmp_path / 'manifest.json').read_text())
+    columns = [manifest[table][y]['columns'] for y in ['2015', '2016']]
+
+    assert columns[0] == columns[1]
+    assert columns[0] == {**schema, 'OTHER': 'string'}
+
+    assert data.FACILITY_ID.tolist() == [1001, 1002] * 2
+    assert data.ANNUAL_HEAT_INPUT.isnull().tolist() == [False, True] * 2
+    assert data.TIER1_CO2_COMBUSTION_EMISSIONS.isnull().all()
+    assert data.FUEL_TYPE_OTHER.tolist()[2] == 'Tires'
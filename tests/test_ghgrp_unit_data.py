@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+
+from fied import datasets
+from fied.datasets import mod
+
+
+ROWS = [
+    ["Emissions by unit and fuel type", None, None, None, None],
+    [None, None, None, None, None],
+    ["Facility Id ", "Reporting Year", "Unit Name",
+     "Unit Maximum Rated Heat Input (mmBTU/hr)", "Primary NAICS Code"],
+    [1000001.0, 2017.0, "Boiler 1", 250.5, 311221.0],
+    [1000001.0, 2018.0, 1.0, "", 311221.0],
+    [1000002.0, 2018.0, "CP-2", 10.0, 325110.0],
+]
+
+
+@pytest.fixture
+def unit_data_rows(tmp_path, monkeypatch):
+    fname = tmp_path / "unit_data.xlsb"
+    fname.write_bytes(b"not a real workbook")
+    monkeypatch.setattr(mod, "fetch_emission", lambda: str(fname))
+
+    calls = []
+
+    def read_rows(f):
+        calls.append(f)
+        return ROWS
+
+    monkeypatch.setattr(mod, "_read_unit_data_rows", read_rows)
+
+    return calls
+
+
+def test_unit_data_types(unit_data_rows):
+    df = datasets.fetch_ghgrp_unit_data()
+
+    assert df.columns[0] == "Facility Id"
+    assert len(df) == 3
+    assert df["Reporting Year"].dtype == "Int64"
+    assert df["Primary NAICS Code"].tolist() == [311221, 311221, 325110]
+    assert df["Unit Name"].tolist() == ["Boiler 1", "1", "CP-2"]
+    assert df["Unit Maximum Rated Heat Input (mmBTU/hr)"].dtype == "float64"
+    assert pd.isna(df.loc[1, "Unit Maximum Rated Heat Input (mmBTU/hr)"])
+
+
+def test_fetch_ghgrp_unit_data(unit_data_rows):
+    df = datasets.fetch_ghgrp_unit_data(
+        years=[2018], columns=["Facility Id", "Unit Name"]
+        )
+    assert df.columns.tolist() == ["Facility Id", "Unit Name"]
+    assert df["Unit Name"].tolist() == ["1", "CP-2"]
+
+    # The xlsb is parsed only once
+    df = datasets.fetch_ghgrp_unit_data()
+    assert len(df) == 3
+    assert len(unit_data_rows) == 1
@@ -0,0 +1,20 @@
+import pandas as pd
+
+from fied.ghgrp.ghgrp_fac_unit import GHGRP_unit_char
+
+
+def test_identify_unit_type():
+    names = pd.Series([
+        'Boiler 1', 'GP-1 Boilers / Afterburners', 'Furnace 2', 'HTR-101',
+        'Hot Water Heater', 'RICE engine', 'Furn dryer', 'Comfort heater',
+        'Space Heater 3', 'RTO 1', 'Misc', None
+        ], index=range(10, 22))
+
+    unit_types = GHGRP_unit_char.identify_unit_type(names)
+
+    assert unit_types.index.equals(names.index)
+    assert unit_types.tolist()[:9] == [
+        'boiler', 'boiler', 'furnace', 'heater', 'water heater', 'engine',
+        'dryer', 'space heater', 'space heater'
+        ]
+    assert unit_types.iloc[9:].isnull().all()
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+from fied.tools.group_quantiles import group_quantiles
+
+
+def melt_quantiles(df, by, columns, q):
+    """Reference implementation, melting the value columns."""
+    melted = pd.concat(
+        [pd.melt(df[by + v], id_vars=by, value_vars=v, value_name=k)
+         for k, v in columns.items()],
+        axis=0, sort=True
+        )
+    melted = melted.query(
+        ' | '.join(f'{k} > 0' for k in columns)
+        ).groupby(by)[list(columns)].quantile(q)
+
+    return melted.unstack()
+
+
+def test_group_quantiles_matches_melt():
+    rng = np.random.default_rng(42)
+    n = 500
+
+    df = pd.DataFrame({
+        'facility': rng.integers(0, 20, n),
+        'fuel': rng.choice(['coal', 'natural_gas', 'diesel'], n),
+        'energy_nei': rng.lognormal(size=n),
+        'energy_web': rng.lognormal(size=n),
+        'mass_nei': rng.normal(size=n),
+        'mass_web': rng.lognormal(size=n),
+        })
+
+    df.loc[rng.random(n) < 0.3, 'energy_nei'] = np.nan
+    df.loc[rng.random(n) < 0.3, 'energy_web'] = np.nan
+    df.loc[rng.random(n) < 0.5, 'mass_web'] = np.nan
+
+    columns = {
+        'energy': ['energy_nei', 'energy_web'],
+        'mass': ['mass_nei', 'mass_web']
+        }
+    q = [0, 0.5, 0.75]
+
+    result = group_quantiles(
+        df, by=['facility', 'fuel'], columns=columns, q=q,
+        labels=['q0', 'q2', 'q3'], positive_only=True
+        )
+
+    expected = melt_quantiles(df, ['facility', 'fuel'], columns, q)
+
+    assert len(result) == len(expected)
+
+    for k in columns:
+        for label, qi in zip(['q0', 'q2', 'q3'], q):
+            np.testing.assert_allclose(
+                result[f'{k}_{label}'].values,
+                expected[(k, qi)].values
+                )
+
+
+def test_group_quantiles_null_keys():
+    df = pd.DataFrame({
+        'unit': [1, 1, 2, np.nan],
+        'value': [1., 3., np.nan, 5.]
+        })
+
+    result = group_quantiles(df, by=['unit'], columns={'v': ['value']},
+                             q=[0.5], labels=['q2'])
+
+    assert result.index.tolist() == [1]
+    assert result.loc[1, 'v_q2'] == 2
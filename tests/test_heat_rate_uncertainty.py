@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from fied.ghgrp.heat_rate_uncertainty import FuelUncertainty
+
+
+def test_bootstrap():
+    data = np.random.default_rng(1).normal(10, 2, size=400)
+
+    mean, std = FuelUncertainty.bootstrap(data, iterations=4000, seed=3)
+
+    assert abs(mean - data.mean()) < 0.05
+    assert abs(std - data.std() / np.sqrt(len(data))) < 0.01
+
+    # Chunking does not change the resamples
+    assert FuelUncertainty.bootstrap(
+        data, iterations=4000, seed=3, max_samples=1000
+        ) == (mean, std)
+
+    assert np.isnan(FuelUncertainty.bootstrap([], seed=3)).all()
+
+
+def test_tier_bootstrap(tmp_path):
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame({
+        'reporting_year': np.repeat([2015, 2016], 60),
+        'fuel_type': np.tile(np.repeat(['Coal', 'Natural Gas'], 30), 2),
+        'high_heat_value': rng.uniform(0, 1, 120),
+        })
+
+    (tmp_path / 'serial').mkdir()
+
+    serial = FuelUncertainty.tier_bootstrap(
+        data, 'high_heat_value', 'hhv', iterations=500, workers=1,
+        uncert_dir=tmp_path / 'serial'
+        )
+
+    parallel = FuelUncertainty.tier_bootstrap(
+        data, 'high_heat_value', 'hhv', iterations=500, workers=2,
+        uncert_dir=tmp_path
+        )
+
+    pd.testing.assert_frame_equal(serial, parallel)
+    assert len(parallel) == 4
+
+    # Saved results are reused
+    pd.testing.assert_frame_equal(
+        FuelUncertainty.tier_bootstrap(
+            data, 'high_heat_value', 'hhv', uncert_dir=tmp_path
+            ),
+        parallel, check_exact=False
+        )
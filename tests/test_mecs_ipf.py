@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from fied.energy.mecs_ipf_IPH import IPF
+
+
+@pytest.fixture
+def ipf_inputs():
+    rng = np.random.default_rng(42)
+
+    target = rng.gamma(1.0, 10.0, size=(5, 12, 6))
+
+    # Industry without energy use
+    target[1, 3, :] = 0
+
+    seeds = target * rng.uniform(0.5, 1.5, size=target.shape)
+
+    # Seed that already fits its totals
+    seeds[4] = target[4]
+
+    return seeds, target.sum(axis=2), target.sum(axis=1)
+
+
+@pytest.mark.filterwarnings("ignore:'where' used without 'out'")
+def test_calc_ipf3D(ipf_inputs):
+    seeds, cols, rows = ipf_inputs
+
+    fitted = IPF.calc_ipf3D(seeds, cols, rows)
+
+    np.testing.assert_allclose(fitted.sum(axis=2), cols, atol=1e-9)
+    np.testing.assert_allclose(fitted.sum(axis=1), rows, atol=1e-9)
+    np.testing.assert_allclose(fitted[4], seeds[4])
+    assert (fitted[1, 3, :] == 0).all()
+
+    for i in [0, 2]:
+        np.testing.assert_allclose(
+            fitted[i],
+            IPF.calc_ipf2D(seeds[i], cols[i][:, np.newaxis],
+                           rows[i][np.newaxis, :]),
+            atol=1e-9
+            )
+
+    # Seeds are not modified
+    assert not np.allclose(seeds[0], fitted[0])
+
+
+def test_calc_ipf3D_workers(ipf_inputs):
+    seeds, cols, rows = ipf_inputs
+
+    np.testing.assert_allclose(
+        IPF.calc_ipf3D(seeds, cols, rows, workers=2),
+        IPF.calc_ipf3D(seeds, cols, rows)
+        )
@@ -0,0 +1,56 @@
+import pandas as pd
+
+from fied.qpc.census_qpc import QPC
+from fied.tools.naics_ranges import expand_naics_ranges, expand_naics_rows
+
+
+def test_expand_naics_ranges():
+    mapping = expand_naics_ranges(
+        ['3131-3', '3161, 2, 9', '3341, 4-6', '311221, 22-24', 3116, None,
+         '3131-3']
+        )
+
+    expanded = mapping.groupby('source_naics', sort=False).naics.apply(list)
+
+    assert expanded.to_dict() == {
+        '3131-3': [3131, 3132, 3133],
+        '3161, 2, 9': [3161, 3162, 3169],
+        '3341, 4-6': [3341, 3344, 3345, 3346],
+        '311221, 22-24': [311221, 311222, 311223, 311224],
+        }
+
+
+def test_expand_naics_ranges_no_expressions():
+    for naics in [[], [3116, '3117', None]]:
+        mapping = expand_naics_ranges(naics)
+
+        assert mapping.empty
+        assert mapping.columns.tolist() == ['source_naics', 'naics']
+
+    df = pd.DataFrame({'NAICS': ['31-33', 3116], 'value': [1., 2.]})
+
+    for data in [df, df.iloc[1:], df.iloc[:0]]:
+        expanded = expand_naics_rows(data, exclude=['31-33'])
+
+        pd.testing.assert_frame_equal(
+            expanded, data.reset_index(drop=True)
+            )
+
+
+def test_format_naics():
+    qpc_data = pd.DataFrame({
+        'NAICS': ['31-33', 3116, '3131-3', '3161, 2, 9'],
+        'Q': ['q1', 'q1', 'q1', 'q2'],
+        'Weekly_op_hours': [80., 90., 100., 110.],
+        })
+
+    formatted = QPC.format_naics(qpc_data)
+
+    assert formatted.NAICS.tolist() == [
+        '31-33', 3116, 3131, 3132, 3133, 3161, 3162, 3169
+        ]
+
+    assert formatted.Weekly_op_hours.tolist() == \
+        [80., 90.] + [100.] * 3 + [110.] * 3
+
+    assert (formatted.Q == 'q2').sum() == 3
@@ -0,0 +1,21 @@
+import pandas as pd
+
+from fied.frs.naics_selection import NAICS_Identification
+
+
+def test_assign_all_naics():
+    data = pd.DataFrame({
+        'REGISTRY_ID': [1, 1, 1, 2, 3, 3, 4],
+        'NAICS_CODE': [325, 311, 325, 221, 212, 331, 311],
+        'PGM_SYS_ACRNM': ['TRIS', 'E-GGRT', 'RCRAINFO', 'EIS', 'EIS',
+                          'E-GGRT', None],
+        })
+
+    all_naics_id = NAICS_Identification().assign_all_naics(data)
+
+    assert all_naics_id.REGISTRY_ID.tolist() == [1, 2, 3]
+    # Most reporting programs first, then program preference for ties
+    assert all_naics_id.NAICS_CODE.tolist() == [325, 221, 331]
+    assert all_naics_id.NAICS_CODE_additional[0] == [311]
+    assert pd.isna(all_naics_id.NAICS_CODE_additional[1])
+    assert all_naics_id.NAICS_CODE_additional[2] == [212]
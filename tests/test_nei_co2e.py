@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fied.nei.nei_EF_calculations import NEI
+
+
+@pytest.fixture
+def nei_data():
+    """NEI emissions of two units, one of which reports GHGs"""
+
+    ids = {'eis_facility_id': 1, 'unit_type_final': 'Boiler',
+           'fuel_type': 'natural_gas'}
+
+    data = pd.DataFrame([
+        {**ids, 'eis_unit_id': 10, 'pollutant_code': 'CO2',
+         'total_emissions': 1000},
+        {**ids, 'eis_unit_id': 10, 'pollutant_code': 'CH4',
+         'total_emissions': 1},
+        {**ids, 'eis_unit_id': 10, 'pollutant_code': 'N2O',
+         'total_emissions': 0.1},
+        {**ids, 'eis_unit_id': 20, 'pollutant_code': 'NOX',
+         'total_emissions': 5},
+        ])
+
+    data['emissions_uom'] = 'TON'
+    data['process_description'] = 'Boiler'
+
+    return data
+
+
+def test_calc_co2e(nei_data):
+    co2e = NEI().calc_co2e(nei_data.iloc[:3], ['AR4', 'AR6'])
+
+    assert co2e.index.tolist() == [0, 1, 2]
+
+    np.testing.assert_allclose(
+        co2e.AR4, [1000 * 0.907, 25 * 0.907, 298 * 0.1 * 0.907]
+        )
+    np.testing.assert_allclose(
+        co2e.AR6, [1000 * 0.907, 29.8 * 0.907, 273 * 0.1 * 0.907]
+        )
+
+
+def test_alt_gwp(nei_data):
+    nei = NEI()
+
+    ghgs = nei.extract_ghg_emissions(nei_data, alt_gwp=['AR5', 'AR6'])
+
+    assert ghgs.ghgsTonneCO2e_AR6.iloc[0] == pytest.approx(
+        (1000 + 29.8 + 27.3) * 0.907
+        )
+    assert ghgs.ghgsTonneCO2eQ2.iloc[0] == pytest.approx(
+        (1000 + 25 + 29.8) * 0.907
+        )
+
+    units = pd.DataFrame({
+        'eis_facility_id': [1, 1], 'eis_unit_id': [10, 20],
+        'unit_type_final': 'Boiler', 'fuel_type': 'natural_gas',
+        'energy_MJ_q0': [1e6, 2e6], 'energy_MJ_q2': [2e6, 4e6],
+        'energy_MJ_q3': [3e6, 6e6],
+        })
+
+    units = nei.merge_fill_ghg_emissions(ghgs, units)
+
+    # Reported emissions are kept, others are estimated from energy use
+    assert units.ghgsTonneCO2e_AR5.iloc[0] == pytest.approx(
+        (1000 + 28 + 26.5) * 0.907
+        )
+
+    # kg CO2e/MJ of natural gas (see nei/unit_conversions.yml)
+    ef_co2e = 4e6 * 0.05034 / 1000
+
+    for c in ['ghgsTonneCO2eQ2', 'ghgsTonneCO2e_AR5', 'ghgsTonneCO2e_AR6']:
+        assert units[c].iloc[1] == pytest.approx(ef_co2e)
+
+    assert units[
+        ['ghgsTonneCO2e_AR5', 'ghgsTonneCO2e_AR6']
+        ].notnull().all(axis=None)
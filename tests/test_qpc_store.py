@@ -0,0 +1,62 @@
+import pandas as pd
+
+from fied.qpc.census_qpc import QPC
+from fied.qpc.qpc_store import QPCStore
+
+
+def load_workbook(year, quarter):
+    """Quarter of QPC records, as reported"""
+
+    n = int(quarter[1])
+
+    return pd.DataFrame({
+        'NAICS': ['31-33', 3111, '3131-3', 3221],
+        'Description': ['Manufacturing', 'Animal food', 'Textile mills',
+                        'Pulp mills'],
+        'Utilization Rate': [75, 70, 'S', 80],
+        'UR_Standard Error': [1, 2, 3, 4],
+        'Weekly_op_hours': [90, 80 + n, 'S' if n == 2 else 100, 'D'],
+        'Hours_Standard Error': [1, 2, 3, 'D'],
+        'Q': quarter,
+        'Year': year,
+        })
+
+
+def test_qpc_store(tmp_path):
+    store = QPCStore(tmp_path, workers=2)
+
+    data = store.read([2018, 2019], loader=load_workbook)
+
+    assert (tmp_path / 'year=2019' / 'part-0.parquet').exists()
+    assert len(data) == 2 * 4 * 4
+    assert data.Year.unique().tolist() == [2018, 2019]
+    assert data.NAICS.tolist()[:4] == ['31-33', '3111', '3131-3', '3221']
+    assert pd.api.types.is_float_dtype(data.Weekly_op_hours)
+    assert data.Weekly_op_hours_flag.dropna().unique().tolist() == ['D', 'S']
+
+    # Stored years are not parsed again
+    def fail(year, quarter):
+        raise AssertionError('Workbook parsed again')
+
+    data = QPCStore(tmp_path, workers=1).read(2019, naics='311', loader=fail)
+
+    assert data.Weekly_op_hours.tolist() == [81., 82., 83., 84.]
+
+
+def test_get_qpc_data(tmp_path):
+    store = QPCStore(tmp_path, workers=1)
+    store.build([2018], loader=load_workbook)
+
+    qpc_data = QPC(store=store).get_qpc_data(2018)
+
+    # Withheld estimates are dropped and ranges expanded
+    assert sorted(qpc_data.NAICS.unique()) == [3111, 3131, 3132, 3133]
+
+    hours = qpc_data.set_index(['NAICS', 'Q']).Weekly_op_hours
+
+    assert hours[(3132, 'q1')] == 100
+    # Interpolated between the q1 and q3 rows of the expanded range
+    assert hours[(3131, 'q2')] == 100
+    assert hours[(3111, 'q2')] == 82
+
+    assert (qpc_data['Utilization Rate'] == 0).sum() == 12
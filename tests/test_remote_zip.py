@@ -0,0 +1,170 @@
+import functools
+import http.server
+import os
+import random
+import re
+import struct
+import threading
+import zipfile
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from fied.datasets import remote_zip
+
+
+class RangeHandler(http.server.SimpleHTTPRequestHandler):
+    """Static file server with single-range support (RFC 7233)"""
+
+    requested = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        match = re.fullmatch(r"bytes=(\d*)-(\d*)", self.headers.get("Range", ""))
+        path = self.translate_path(self.path)
+
+        if match is None or not os.path.isfile(path):
+            return super().do_GET()
+
+        size = os.path.getsize(path)
+        start, end = match.groups()
+        if start == "":
+            start, end = max(size - int(end), 0), size - 1
+        else:
+            start, end = int(start), min(int(end or size - 1), size - 1)
+
+        self.requested.append((start, end))
+
+        with open(path, "rb") as f:
+            f.seek(start)
+            data = f.read(end - start + 1)
+
+        self.send_response(206)
+        self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def archive(tmp_path):
+    """ZIP with stored, deflated, and deflate64 members"""
+    rng = random.Random(0)
+    content = {
+        "stored.csv": b"a,b\n1,2\n",
+        "deflated.csv": b"x,y\n" + b"10,20\n" * 1000,
+        "mixed.csv": b"scc,n\n10100101,1.5\n2801X00000,x\n30500311,\n",
+        # Random text has no long matches, so its deflate stream is also a
+        # valid deflate64 stream
+        "deflated64.csv": "".join(
+            rng.choice("abcdefghij,\n") for _ in range(50000)
+        ).encode(),
+    }
+
+    fname = tmp_path / "www" / "archive.zip"
+    fname.parent.mkdir()
+
+    with zipfile.ZipFile(fname, "w") as z:
+        # Large member that should never be downloaded
+        z.writestr("skipped.bin", rng.randbytes(500000), zipfile.ZIP_STORED)
+        z.writestr("stored.csv", content["stored.csv"], zipfile.ZIP_STORED)
+        for name in ["deflated.csv", "mixed.csv", "deflated64.csv"]:
+            z.writestr(name, content[name], zipfile.ZIP_DEFLATED)
+
+    # Flag deflated64.csv as deflate64 (method 9)
+    data = bytearray(fname.read_bytes())
+    with zipfile.ZipFile(fname) as z:
+        info = z.getinfo("deflated64.csv")
+    struct.pack_into("<H", data, info.header_offset + 8, 9)
+    cd = data.rfind(b"PK\x01\x02")
+    struct.pack_into("<H", data, cd + 10, 9)
+    fname.write_bytes(bytes(data))
+
+    return fname, content
+
+
+def serve(directory, handler):
+    handler = functools.partial(handler, directory=str(directory))
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    return server
+
+
+@pytest.mark.parametrize("ranges", [True, False])
+def test_fetch_zip_members(tmp_path, archive, ranges):
+    fname, content = archive
+    handler = RangeHandler if ranges else http.server.SimpleHTTPRequestHandler
+    server = serve(fname.parent, handler)
+    RangeHandler.requested = []
+
+    url = f"http://127.0.0.1:{server.server_port}/{fname.name}"
+    members = ["deflated64.csv", "stored.csv"]
+
+    try:
+        fnames = remote_zip.fetch_zip_members(
+            url, members, tmp_path / "cache" / "archive.zip.unzip"
+        )
+    finally:
+        server.shutdown()
+
+    assert [os.path.basename(f) for f in fnames] == members
+    for f, m in zip(fnames, members):
+        with open(f, "rb") as fh:
+            assert fh.read() == content[m]
+
+    if ranges:
+        # Only the tail (central directory) and requested members, not
+        # the 500 kB of skipped.bin
+        fetched = sum(end - start + 1 for start, end in RangeHandler.requested)
+        assert 0 < fetched < 200000
+
+    # Cached members are not fetched again (the server is down)
+    assert remote_zip.fetch_zip_members(
+        url, members, tmp_path / "cache" / "archive.zip.unzip"
+    ) == fnames
+
+
+def test_fetch_zip_members_parquet(tmp_path, archive):
+    fname, content = archive
+    server = serve(fname.parent, RangeHandler)
+
+    url = f"http://127.0.0.1:{server.server_port}/{fname.name}"
+
+    try:
+        fnames = remote_zip.fetch_zip_members_parquet(
+            url, ["deflated.csv", "stored.csv", "mixed.csv"],
+            tmp_path / "cache",
+            column_types={"x": "float64", "scc": "int64", "n": "float64"},
+            workers=2,
+        )
+
+        # Values of key columns are never read as nulls
+        with pytest.raises(ValueError, match="scc.*2801X00000"):
+            remote_zip.fetch_zip_members_parquet(
+                url, ["mixed.csv"], tmp_path / "keys",
+                column_types={"scc": "int64"}, key_columns=["scc"],
+            )
+    finally:
+        server.shutdown()
+
+    assert [os.path.basename(f) for f in fnames] == [
+        "deflated.parquet", "stored.parquet", "mixed.parquet"
+    ]
+
+    deflated = pq.read_table(fnames[0])
+    assert deflated.schema.field("x").type == pa.float64()
+    assert deflated.schema.field("y").type == pa.string()
+    assert deflated.num_rows == 1000
+    assert pq.read_table(fnames[1]).column("a").to_pylist() == ["1"]
+
+    # Values that don't match a type only affect their column
+    mixed = pq.read_table(fnames[2])
+    assert mixed.schema.field("scc").type == pa.int64()
+    assert mixed.column("scc").to_pylist() == [10100101, None, 30500311]
+    assert mixed.column("n").to_pylist() == [1.5, None, None]
+
+    assert not list((tmp_path / "keys").glob("mixed.*"))
@@ -0,0 +1,111 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fied.scc import scc_hierarchy
+from fied.scc.scc_unit_id import SCC_ID
+
+
+IDEN_SCC = Path(__file__).parents[1] / 'fied' / 'scc' / 'iden_scc.csv'
+
+
+@pytest.fixture
+def iden_scc():
+    return pd.read_csv(IDEN_SCC, index_col=0)
+
+
+def test_identify(iden_scc):
+    all_scc = iden_scc.drop(columns=['unit_type', 'fuel_type'])
+
+    scc = SCC_ID(cache_dir='.').identify(all_scc)
+
+    # All engine SCCs have unit and fuel types, e.g., emission points
+    # such as 'Turbine: Exhaust'
+    engines = iden_scc.scc_level_one == 'Internal Combustion Engines'
+
+    assert scc[engines].unit_type.notnull().all()
+    assert scc[engines].fuel_type.notnull().all()
+
+    pd.testing.assert_frame_equal(
+        scc[['unit_type', 'fuel_type']].astype(object),
+        iden_scc[['unit_type', 'fuel_type']].astype(object)
+        )
+
+def test_fired_fuel_type():
+    descriptions = pd.Series([
+        'Natural Gas-fired Dryer',
+        'Gas-fired Kiln',
+        'Direct ng-fired Oven',
+        'Oil-fired Heater',
+        'Furnace: CBM',
+        'Electric Furnace',
+        ])
+
+    pd.testing.assert_series_equal(
+        SCC_ID.fired_fuel_type(descriptions).astype(object),
+        pd.Series(['Natural Gas', 'Natural Gas', 'Natural Gas',
+                   'Residual Fuel Oil', 'Natural Gas', np.nan], dtype=object),
+        check_names=False
+        )
+
+
+def test_build_id_cache(iden_scc, tmp_path, monkeypatch):
+    all_scc = iden_scc.drop(columns=['unit_type', 'fuel_type']).head(200)
+
+    monkeypatch.setattr(SCC_ID, 'load_complete_scc', lambda _self: all_scc)
+
+    scc = SCC_ID(cache_dir=tmp_path).build_id()
+
+    assert SCC_ID(cache_dir=tmp_path).cache_path().exists()
+
+    def fail(self):
+        raise AssertionError('SCCs are downloaded again')
+
+    monkeypatch.setattr(SCC_ID, 'load_complete_scc', fail)
+
+    cached = SCC_ID(cache_dir=tmp_path).build_id()
+
+    pd.testing.assert_frame_equal(
+        cached[['SCC', 'unit_type', 'fuel_type']].astype(object),
+        scc[['SCC', 'unit_type', 'fuel_type']].astype(object)
+        )
+
+
+def test_scc_hierarchy(iden_scc, monkeypatch):
+    hierarchy = scc_hierarchy.SCCHierarchy(iden_scc)
+
+    scc = iden_scc.iloc[10]
+
+    assert hierarchy.get(scc.SCC) == scc[hierarchy.levels].to_dict()
+    assert hierarchy.get(str(scc.SCC)) == hierarchy.get(scc.SCC)
+    assert hierarchy.get(1) is None
+    assert 'not an SCC' not in hierarchy
+
+    sccs = [scc.SCC, 1, iden_scc.SCC.iloc[-1], scc.SCC, None]
+
+    levels = hierarchy.lookup(sccs)
+
+    assert levels.SCC.tolist() == sccs
+    assert levels.scc_level_four.isnull().tolist() == [
+        False, True, False, False, True
+        ]
+    assert levels.scc_level_four[[0, 2, 3]].tolist() == [
+        scc.scc_level_four, iden_scc.scc_level_four.iloc[-1],
+        scc.scc_level_four
+        ]
+
+    # scc_query_split uses the hierarchy instead of EPA SCC Web Services
+    monkeypatch.setattr(
+        scc_hierarchy, 'load_scc_hierarchy', lambda: hierarchy
+        )
+
+    assert SCC_ID.scc_query_split(scc.SCC) == {
+        'scc level one': scc.scc_level_one,
+        'scc level two': scc.scc_level_two,
+        'scc level three': scc.scc_level_three,
+        'scc level four': scc.scc_level_four,
+        }
+
+    assert SCC_ID.scc_query_split(1) is None